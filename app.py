@@ -1,5 +1,6 @@
 from flask import Flask
 from src.routes import gameBP
+from src.responseCodec import FastJSONProvider
 from config import Config
 import os
 
@@ -12,6 +13,10 @@ app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 # Config 적용 (Secret Key 등)
 app.config.from_object(Config)
 
+# jsonify 직렬화: orjson 이 설치되어 있으면 사용 (FAST_JSON = False 면 Flask 기본 공급자)
+if getattr(Config, 'FAST_JSON', True):
+    app.json = FastJSONProvider(app)
+
 # Blueprint 등록
 app.register_blueprint(gameBP)
 
@@ -0,0 +1,49 @@
+import random
+import time
+
+def percentile(sortedValues, p):
+    if not sortedValues: return 0.0
+    idx = min(len(sortedValues) - 1, int(round(p / 100 * (len(sortedValues) - 1))))
+    return sortedValues[idx]
+
+def summarize(samples):
+    """초 단위 지연 목록 -> ms 단위 p50/p99/mean."""
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50) * 1000,
+        "p99": percentile(values, 99) * 1000,
+        "mean": (sum(values) / len(values) * 1000) if values else 0.0
+    }
+
+def printTable(title, rows, columns):
+    print(f"\n=== {title} ===")
+    widths = [max(len(c), *(len(fmt(r.get(c))) for r in rows)) if rows else len(c) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  ".join(fmt(r.get(c)).ljust(w) for c, w in zip(columns, widths)))
+
+def fmt(value):
+    if isinstance(value, float): return f"{value:.3f}"
+    return str(value) if value is not None else "-"
+
+
+class LatencyBackend:
+    """저장소 호출마다 latency(±jitter) 초를 지연시켜 원격 DB 왕복을 흉내낸다."""
+
+    CALLS = ('get', 'set', 'update', 'delete', 'push', 'pushMany', 'list', 'query', 'compareAndUpdate')
+
+    def __init__(self, backend, latency=0.0, jitter=0.0):
+        self.backend = backend
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name not in self.CALLS or not (self.latency or self.jitter): return attr
+        def delayed(*args, **kwargs):
+            self.calls += 1
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+            return attr(*args, **kwargs)
+        return delayed
@@ -0,0 +1,110 @@
+import copy
+import json
+import time
+from src.gameEngine import GameEngine
+from src.catalogLoader import GameData
+from bench.common import summarize, printTable
+
+# 엔진 단독 마이크로 벤치마크 (DB/HTTP 없이 processAction 과 응답 직렬화 비용만 측정)
+#   python -m bench.engineBench --iterations 2000 --scales 1,10,100
+
+
+def scaleCatalog(engine, factor):
+    # 아이템/적 데이터를 factor 배로 복제해 카탈로그 크기에 따른 비용을 본다
+    if factor <= 1: return
+    data = engine.current
+    items, enemies = dict(data.items), dict(data.enemies)
+    for table in (items, enemies):
+        for key, value in list(table.items()):
+            for i in range(1, factor):
+                table[f"{key}_x{i}"] = copy.deepcopy(value)
+    engine.current = GameData(data.locations, items, enemies, data.systemMsgs, data.lore)
+
+
+def makeScenarios(engine):
+    base = engine.initNewPlayer()
+    base['username'] = 'bench'
+    base['heart_fragments'] = 10000
+    consumable = next((k for k, v in engine.items.items() if v.get('type') == 'consumable'), None)
+    weapon = next((k for k, v in engine.items.items() if v.get('type') == 'weapon' and v.get('power', 0) > 1), None)
+    start = base['currentLocation']
+    moveTarget = (engine.locations.get(start, {}).get('connectedTo') or [start])[0]
+    searchLoc = next((k for k, v in engine.locations.items() if v.get('searchable') and v.get('spawnList')), start)
+    enemyId = next(iter(engine.enemies))
+
+    def variant(**changes):
+        userData = copy.deepcopy(base)
+        for key, value in changes.items():
+            userData[key] = value
+        return userData
+
+    weaponId = f"{weapon}:bench"
+    inCombat = variant()
+    engine.startCombat(inCombat, enemyId)
+    inCombat['hp'] = inCombat['maxHp'] = 100000
+    return [
+        ("move", variant(), ("move", moveTarget)),
+        ("search", variant(currentLocation=searchLoc), ("search", None)),
+        ("attack", inCombat, ("attack", None)),
+        ("upgrade", variant(), ("upgrade", "upgrades_atk")),
+        ("useItem", variant(inventory={consumable: 5}), ("useItem", consumable)),
+        ("upgradeWeapon", variant(inventory={weaponId: 1, **{k: 50 for k in engine.materialKeys}},
+                                  weapon_levels={weaponId: 0}), ("upgradeWeapon", weaponId)),
+        ("revive", variant(status='dead', hp=0), ("revive", "fragment")),
+        ("batch x10", variant(currentLocation=searchLoc), [("search", None)] * 10),
+    ]
+
+
+def runScenarios(engine, iterations, scale):
+    rows = []
+    for name, userData, action in makeScenarios(engine):
+        copies = [copy.deepcopy(userData) for _ in range(iterations)]
+        actionTimes, serializeTimes, sizes = [], [], []
+        for doc in copies:
+            started = time.perf_counter()
+            if isinstance(action, list):
+                payload = engine.processBatch(doc, action)
+            else:
+                payload = engine.processAction(doc, *action)
+            mid = time.perf_counter()
+            body = json.dumps(payload, ensure_ascii=False)
+            done = time.perf_counter()
+            actionTimes.append(mid - started)
+            serializeTimes.append(done - mid)
+            sizes.append(len(body.encode('utf-8')))
+        a, s = summarize(actionTimes), summarize(serializeTimes)
+        rows.append({"scale": scale, "action": name, "p50 ms": a['p50'], "p99 ms": a['p99'],
+                     "json p50 ms": s['p50'], "json p99 ms": s['p99'], "bytes": sum(sizes) // len(sizes)})
+    return rows
+
+
+def runCatalog(engine, scale, iterations=20):
+    times = []
+    data = engine.current
+    for _ in range(iterations):
+        started = time.perf_counter()
+        GameData(data.locations, data.items, data.enemies, data.systemMsgs, data.lore)
+        times.append(time.perf_counter() - started)
+    stats = summarize(times)
+    return {"scale": scale, "items": len(data.items), "enemies": len(data.enemies),
+            "build p50 ms": stats['p50'], "catalog bytes": len(data.catalogJson.encode('utf-8'))}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GREY CITY 엔진 마이크로 벤치마크")
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--scales', default="1,10,100", help="카탈로그 복제 배수 목록")
+    args = parser.parse_args()
+
+    actionRows, catalogRows = [], []
+    for scale in [int(s) for s in args.scales.split(',')]:
+        engine = GameEngine()
+        scaleCatalog(engine, scale)
+        actionRows.extend(runScenarios(engine, args.iterations, scale))
+        catalogRows.append(runCatalog(engine, scale))
+
+    printTable("processAction / getGameResponse", actionRows,
+               ["scale", "action", "p50 ms", "p99 ms", "json p50 ms", "json p99 ms", "bytes"])
+    printTable("catalog", catalogRows, ["scale", "items", "enemies", "build p50 ms", "catalog bytes"])
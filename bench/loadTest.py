@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from bench.common import LatencyBackend, summarize, printTable
+
+# HTTP 부하 테스트. 앱을 메모리 저장소로 띄우고, 저장소 호출마다 지연을 주입한 뒤
+# 여러 가상 유저가 로그인 -> 로드 -> 이동/탐색/전투/부활 시나리오를 동시에 수행한다.
+#   python -m bench.loadTest --users 50 --workers 16 --actions 100 --latency 20
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, step, seconds, size, ok):
+        with self.lock:
+            entry = self.samples.setdefault(step, {"times": [], "bytes": 0, "errors": 0})
+            entry['times'].append(seconds)
+            entry['bytes'] += size
+            if not ok: entry['errors'] += 1
+
+
+def timedCall(http, recorder, step, method, url, **kwargs):
+    started = time.perf_counter()
+    try:
+        res = http.request(method, url, timeout=30, **kwargs)
+    except requests.RequestException:
+        recorder.add(step, time.perf_counter() - started, 0, False)
+        return None
+    # 전송된 바이트(압축 후)를 기록한다
+    size = int(res.headers.get('Content-Length') or len(res.content))
+    recorder.add(step, time.perf_counter() - started, size, res.status_code < 400)
+    return res
+
+
+def nextAction(state, rng):
+    userData = state['userData']
+    if userData['status'] == 'dead':
+        target = 'fragment' if userData.get('heart_fragments', 0) >= userData['level'] * 5 else 'reset'
+        return 'revive', {"type": "revive", "target": target}
+    if userData['status'] == 'combat':
+        return 'attack', {"type": "attack", "target": None}
+    connected = state.get('connectedLocations') or []
+    if connected and rng.random() < 0.3:
+        return 'move', {"type": "move", "target": rng.choice(connected)['id']}
+    return 'search', {"type": "search", "target": None}
+
+
+def runSession(baseUrl, username, password, actions, recorder, seed, encoding=None):
+    rng = random.Random(seed)
+    http = requests.Session()
+    if encoding: http.headers['Accept-Encoding'] = encoding
+    res = timedCall(http, recorder, 'login', 'POST', f"{baseUrl}/api/login_local",
+                    json={"username": username, "password": password})
+    if res is None or not res.ok or not res.json().get('success'): return
+    res = timedCall(http, recorder, 'loadGame', 'POST', f"{baseUrl}/api/loadGame")
+    if res is None or not res.ok: return
+    state = res.json()
+    timedCall(http, recorder, 'catalog', 'GET', f"{baseUrl}/api/catalog?v={state.get('catalogVersion')}")
+    for _ in range(actions):
+        step, payload = nextAction(state, rng)
+        payload['logAfter'] = state.get('logCursor')
+        res = timedCall(http, recorder, step, 'POST', f"{baseUrl}/api/action", json=payload)
+        if res is None or not res.ok: return
+        state = res.json()
+
+
+def seedUsers(routes, count, password):
+    accounts = []
+    for i in range(count):
+        username, userId = f"bench_{i:04d}", f"gc-bench-{i:04d}"
+        routes.fbManager.registerUserAuth(username, routes.passwordHasher.hash(password).result(), userId)
+        userData = routes.gameEngine.initNewPlayer()
+        userData['username'] = username
+        routes.create_player(userId, userData)
+        accounts.append(username)
+    return accounts
+
+
+if __name__ == '__main__':
+    import argparse
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    parser = argparse.ArgumentParser(description="GREY CITY HTTP 부하 테스트")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=16, help="동시에 돌아가는 가상 유저 수")
+    parser.add_argument('--actions', type=int, default=100, help="세션당 행동 수")
+    parser.add_argument('--latency', type=float, default=20, help="저장소 호출당 지연 (ms)")
+    parser.add_argument('--jitter', type=float, default=5, help="지연 편차 (ms)")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--encoding', default=None, help="Accept-Encoding 헤더 (예: identity, gzip, br)")
+    args = parser.parse_args()
+
+    # 앱을 불러오기 전에 저장소를 메모리로 바꿔 실제 DB 에 접속하지 않게 한다
+    from config import Config
+    Config.STORAGE_BACKEND = 'memory'
+    from app import app
+    import src.routes as routes
+
+    password = "bench-password"
+    accounts = seedUsers(routes, args.users, password)
+    # 지표 래퍼(InstrumentedBackend) 안쪽에 지연을 넣어 /metrics 의 저장소 지연에도 반영되게 한다
+    storage = LatencyBackend(routes.fbManager.backend.backend, args.latency / 1000, args.jitter / 1000)
+    routes.fbManager.backend.backend = storage
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs): pass
+
+    server = make_server('127.0.0.1', args.port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    baseUrl = f"http://127.0.0.1:{args.port}"
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for i, username in enumerate(accounts):
+            pool.submit(runSession, baseUrl, username, password, args.actions, recorder, args.seed + i, args.encoding)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    routes.playerCache.flush()
+
+    rows, total = [], 0
+    for step, entry in sorted(recorder.samples.items()):
+        stats = summarize(entry['times'])
+        total += stats['count']
+        rows.append({"step": step, "count": stats['count'], "p50 ms": stats['p50'], "p99 ms": stats['p99'],
+                     "mean ms": stats['mean'], "bytes/resp": entry['bytes'] // max(1, stats['count']),
+                     "errors": entry['errors']})
+    printTable(f"HTTP ({args.workers} workers, {args.latency}±{args.jitter} ms storage latency)", rows,
+               ["step", "count", "p50 ms", "p99 ms", "mean ms", "bytes/resp", "errors"])
+    print(f"\n>>> {total} requests in {elapsed:.2f}s = {total / elapsed:.1f} req/s "
+          f"({storage.calls} storage calls)")
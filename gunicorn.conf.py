@@ -0,0 +1,24 @@
+import os
+import sys
+
+# gunicorn 설정 (작업 디렉터리의 이 파일을 gunicorn 이 자동으로 읽는다)
+#   SERVING_MODE = 'sync'   : 기본 동기 워커. 요청 하나가 DB/SMTP/Discord 대기 동안 워커 하나를 점유한다.
+#                             /api/stream(SSE)은 204 로 거절되고 클라이언트는 ?after= 폴링을 쓴다.
+#   SERVING_MODE = 'gevent' : 협력형 워커 (requirements-optional.txt 의 gevent 필요). 같은 gameBP 라우트가 그린렛으로 실행되고,
+#                             소켓 대기 중에는 다른 요청으로 양보하므로 유휴 SSE 연결을 수천 개 들고 있을 수 있다.
+#                             STORAGE_BACKEND = 'firebase_rest' 와 함께 쓰면 DB 호출도 워커 공유 커넥션 풀을 탄다.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import Config
+
+if getattr(Config, 'SERVING_MODE', 'sync') == 'gevent':
+    worker_class = 'gevent'
+    # 워커 하나가 동시에 처리하는 최대 연결 수 (SSE 유휴 연결 포함)
+    worker_connections = getattr(Config, 'GEVENT_WORKER_CONNECTIONS', 2000)
+    # monkey patch 가 앱 import 보다 먼저 적용되어야 하므로 preload 하지 않는다
+    preload_app = False
+
+
+def on_starting(server):
+    # write-behind 는 워커 메모리에 확정된 행동을 쌓아 두므로 워커가 여럿이면 서로의 기록을 덮어쓸 수 있다
+    if getattr(Config, 'PLAYER_WRITE_BEHIND', False) and server.cfg.workers > 1:
+        raise RuntimeError("PLAYER_WRITE_BEHIND 는 단일 워커 전용입니다 (workers=1 로 실행하거나 끄십시오)")
@@ -0,0 +1,46 @@
+import os
+import threading
+import time
+
+class BackgroundLoop:
+    """interval 초마다 fn() 을 호출하는 워커 프로세스 단위 데몬 스레드.
+
+    - 스레드는 ensureStarted() 가 처음 불릴 때 띄운다. gunicorn 이 fork 한 워커에는 부모의 스레드가
+      따라오지 않으므로 import 시점이 아니라 첫 사용 시점에 워커마다 새로 띄우게 된다.
+    - fork 후 처음 띄울 때 onFork() 를 먼저 호출한다 (부모에게서 복사된 상태 정리용).
+    - fn 의 예외는 출력만 하고 다음 주기에 계속 호출한다.
+    - interval=None 은 fn 이 스스로 대기하는 경우(큐 get 등)로, 쉬지 않고 바로 다시 호출한다.
+    """
+
+    def __init__(self, name, interval, fn, onFork=None):
+        # 0 이하 주기는 fn 이 대기하지 않으면 CPU 를 태우므로 받지 않는다
+        if interval is not None and interval <= 0:
+            raise ValueError(f"{name}: interval must be positive, got {interval}")
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.onFork = onFork
+        self.pid = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def running(self):
+        return self.pid == os.getpid() and self.thread is not None and self.thread.is_alive()
+
+    def ensureStarted(self):
+        if self.running(): return
+        with self.lock:
+            if self.running(): return
+            forked = self.pid is not None and self.pid != os.getpid()
+            self.pid = os.getpid()
+            if forked and self.onFork: self.onFork()
+            self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            if self.interval is not None: time.sleep(self.interval)
+            try:
+                self.fn()
+            except Exception as e:
+                print(f"{self.name} Error: {e}")
@@ -0,0 +1,257 @@
+import random
+import numpy as np
+
+# 밸런스 조정용 오프라인 시뮬레이터. 서버 런타임에는 쓰이지 않는다 (numpy 필요).
+#   python -m src.balanceSim --enemy mutated_rat --level 3 --weapon iron_pipe
+#   python -m src.balanceSim --location 2f_shop_3 --hours 5 --check
+
+ACTIONS_PER_HOUR = 600   # 가정: 평균 6초에 한 번 행동
+MAX_TURNS = 500
+
+
+def buildPlayer(engine, level=1, weaponKey=None, weaponLevel=0, upgrades=None):
+    """엔진 규칙(checkLevelUp, upgrade, getTotalStats)을 그대로 거쳐 시뮬레이션용 플레이어를 만든다."""
+    userData = engine.initNewPlayer()
+    while userData['level'] < level:
+        userData['exp'] = userData['maxExp']
+        engine.checkLevelUp(userData)
+    for stat, count in (upgrades or {}).items():
+        for _ in range(count):
+            userData['heart_fragments'] = 5 + userData['upgrades'].get(stat, 0) * 2
+            engine.processAction(userData, 'upgrade', stat)
+    if weaponKey:
+        weaponId = f"{weaponKey}:sim"
+        engine.addItem(userData, weaponId)
+        userData['equipment']['weapon'] = weaponId
+        userData['weapon_levels'][weaponId] = weaponLevel
+    userData['hp'] = userData['maxHp']
+    userData['logs'] = []
+    return userData
+
+
+def damageRange(attack):
+    # random.randint(int(a*0.8), int(a*1.2)) 와 같은 닫힌 구간
+    return int(attack * 0.8), int(attack * 1.2)
+
+
+def rollFragments(rng, grade, size):
+    frag = rng.integers(1, 4, size=size)
+    if grade >= 3: frag = frag + rng.integers(2, 6, size=size)
+    return frag
+
+
+def simulateFights(engine, userData, enemyId, n=100000, seed=None, maxTurns=MAX_TURNS):
+    """한 플레이어가 같은 적과 n 번 싸울 때의 결과를 한꺼번에 계산한다 (공격만 선택, 도주 없음).
+
+    반환: winRate, 승리 시 평균 턴 수(time-to-kill), 평균 잔여 HP, 전투당 기대 조각 수.
+    """
+    rng = np.random.default_rng(seed)
+    enemy = engine.enemies[enemyId]
+    atkLo, atkHi = damageRange(engine.getTotalStats(userData)['attack'])
+    eLo, eHi = damageRange(enemy['attack'])
+    evasion = userData.get('upgrades', {}).get('upgrades_evasion', 0) * 0.001
+
+    playerHp = np.full(n, userData['hp'], dtype=np.int64)
+    enemyHp = np.full(n, enemy['hp'], dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    won = np.zeros(n, dtype=bool)
+    active = np.arange(n)
+
+    for turn in range(1, maxTurns + 1):
+        if not active.size: break
+        enemyHp[active] -= rng.integers(atkLo, atkHi + 1, size=active.size)
+        killed = enemyHp[active] <= 0
+        won[active[killed]] = True
+        turns[active[killed]] = turn
+        active = active[~killed]
+
+        hit = rng.random(active.size) >= evasion
+        playerHp[active] -= np.where(hit, rng.integers(eLo, eHi + 1, size=active.size), 0)
+        dead = playerHp[active] <= 0
+        turns[active[dead]] = turn
+        active = active[~dead]
+
+    wins = int(won.sum())
+    fragments = rollFragments(rng, enemy.get('grade', 1), wins).sum() if wins else 0
+    return {
+        "enemy": enemyId, "fights": n,
+        "winRate": wins / n,
+        "turnsToKill": float(turns[won].mean()) if wins else None,
+        "hpLeft": float(np.maximum(playerHp[won], 0).mean()) if wins else None,
+        "fragmentsPerFight": float(fragments) / n,
+        "expPerFight": enemy.get('exp', 0) * wins / n
+    }
+
+
+def simulateProgression(engine, locId, players=10000, hours=1, seed=None, weaponKey=None, weaponLevel=0,
+                        actionsPerHour=ACTIONS_PER_HOUR):
+    """players 명이 한 지역에서 탐색/전투만 반복할 때의 성장을 행동 단위로 진행한다.
+
+    - 탐색: 1% 조각(1~3), 아니면 20% 로 spawnList 적 조우 (processAction 'search' 와 같은 순서)
+    - 전투: 공격만 선택. 사망 시 조각으로 부활, 조각이 부족하면 초기화 부활.
+    - 소모품/쪽지/아이템 획득은 모델링하지 않는다.
+    반환: 시간별 평균 레벨, 시간당 조각/경험치, 시간당 사망 수.
+    """
+    rng = np.random.default_rng(seed)
+    loc = engine.locations[locId]
+    spawnList = [e for e in loc.get('spawnList', []) if e in engine.enemies]
+    base = buildPlayer(engine, 1, weaponKey, weaponLevel)
+    weaponBonus = engine.getTotalStats(base)['attack'] - base['attack']
+
+    eHp = np.array([engine.enemies[e]['hp'] for e in spawnList] or [0], dtype=np.int64)
+    eAtk = np.array([engine.enemies[e]['attack'] for e in spawnList] or [0], dtype=np.int64)
+    eExp = np.array([engine.enemies[e].get('exp', 0) for e in spawnList] or [0], dtype=np.int64)
+    eGrade = np.array([engine.enemies[e].get('grade', 1) for e in spawnList] or [1], dtype=np.int64)
+
+    level = np.ones(players, dtype=np.int64)
+    exp = np.zeros(players, dtype=np.int64)
+    maxExp = np.full(players, base['maxExp'], dtype=np.int64)
+    maxHp = np.full(players, base['maxHp'], dtype=np.int64)
+    hp = maxHp.copy()
+    attack = np.full(players, base['attack'], dtype=np.int64)
+    frags = np.zeros(players, dtype=np.int64)
+    inCombat = np.zeros(players, dtype=bool)
+    enemyIdx = np.zeros(players, dtype=np.int64)
+    enemyHp = np.zeros(players, dtype=np.int64)
+
+    totals = {"fragments": 0, "exp": 0, "deaths": 0, "resets": 0}
+    levelByHour = []
+    for step in range(1, hours * actionsPerHour + 1):
+        # --- 탐색 ---
+        searching = np.flatnonzero(~inCombat)
+        if searching.size and loc.get('searchable', False):
+            fragHit = rng.random(searching.size) < 0.01
+            amount = rng.integers(1, 4, size=searching.size)
+            frags[searching[fragHit]] += amount[fragHit]
+            totals['fragments'] += int(amount[fragHit].sum())
+            if spawnList:
+                spawn = ~fragHit & (rng.random(searching.size) < 0.2)
+                who = searching[spawn]
+                enemyIdx[who] = rng.integers(0, len(spawnList), size=who.size)
+                enemyHp[who] = eHp[enemyIdx[who]]
+                inCombat[who] = True
+
+        # --- 전투 (이번 행동 이전에 시작된 전투만) ---
+        fighting = np.flatnonzero(inCombat)
+        fighting = fighting[~np.isin(fighting, searching)] if searching.size else fighting
+        if fighting.size:
+            atk = attack[fighting] + weaponBonus
+            lo, hi = (atk * 0.8).astype(np.int64), (atk * 1.2).astype(np.int64)
+            enemyHp[fighting] -= rng.integers(lo, hi + 1)
+            killed = enemyHp[fighting] <= 0
+
+            winners = fighting[killed]
+            if winners.size:
+                idx = enemyIdx[winners]
+                gained = rng.integers(1, 4, size=winners.size) + np.where(eGrade[idx] >= 3, rng.integers(2, 6, size=winners.size), 0)
+                frags[winners] += gained
+                exp[winners] += eExp[idx]
+                totals['fragments'] += int(gained.sum())
+                totals['exp'] += int(eExp[idx].sum())
+                inCombat[winners] = False
+                # checkLevelUp 과 같은 규칙을 여러 번 레벨업할 수 있도록 반복 적용
+                while True:
+                    up = winners[exp[winners] >= maxExp[winners]]
+                    if not up.size: break
+                    exp[up] -= maxExp[up]
+                    level[up] += 1
+                    maxExp[up] = (maxExp[up] * 1.2).astype(np.int64)
+                    maxHp[up] += 10
+                    hp[up] = maxHp[up]
+                    attack[up] += 2
+
+            hitBy = fighting[~killed]
+            if hitBy.size:
+                eA = eAtk[enemyIdx[hitBy]]
+                hp[hitBy] -= rng.integers((eA * 0.8).astype(np.int64), (eA * 1.2).astype(np.int64) + 1)
+                dead = hitBy[hp[hitBy] <= 0]
+                if dead.size:
+                    totals['deaths'] += int(dead.size)
+                    inCombat[dead] = False
+                    cost = level[dead] * 5
+                    paid = frags[dead] >= cost
+                    revived, reset = dead[paid], dead[~paid]
+                    frags[revived] -= cost[paid]
+                    hp[revived] = (maxHp[revived] * 0.8).astype(np.int64)
+                    totals['resets'] += int(reset.size)
+                    level[reset], exp[reset], maxExp[reset] = 1, 0, base['maxExp']
+                    maxHp[reset], attack[reset], frags[reset] = base['maxHp'], base['attack'], 0
+                    hp[reset] = maxHp[reset]
+
+        if step % actionsPerHour == 0:
+            levelByHour.append(float(level.mean()))
+
+    playerHours = players * hours
+    return {
+        "location": locId, "players": players, "hours": hours,
+        "meanLevelByHour": levelByHour,
+        "fragmentsPerHour": totals['fragments'] / playerHours,
+        "expPerHour": totals['exp'] / playerHours,
+        "deathsPerHour": totals['deaths'] / playerHours,
+        "resetsPerHour": totals['resets'] / playerHours
+    }
+
+
+def scalarFights(engine, userData, enemyId, n=2000, seed=None):
+    """같은 조건의 전투를 실제 processAction('attack') 으로 n 번 돌린다 (교차 검증용)."""
+    random.seed(seed)
+    wins, turnsSum = 0, 0
+    for _ in range(n):
+        player = {**userData, 'upgrades': dict(userData['upgrades']), 'equipment': dict(userData['equipment']),
+                  'inventory': dict(userData['inventory']), 'weapon_levels': dict(userData['weapon_levels']), 'logs': []}
+        engine.startCombat(player, enemyId)
+        turns = 0
+        while player['status'] == 'combat' and turns < MAX_TURNS:
+            engine.processAction(player, 'attack', None)
+            turns += 1
+        if player['status'] == 'normal':
+            wins += 1
+            turnsSum += turns
+    return {"winRate": wins / n, "turnsToKill": turnsSum / wins if wins else None}
+
+
+def crossCheck(engine, userData, enemyId, n=2000, seed=0, tolerance=0.05):
+    """벡터화 결과가 스칼라 엔진과 허용 오차 안에서 일치하는지 확인한다. 불일치 목록을 반환."""
+    vec = simulateFights(engine, userData, enemyId, n=n * 20, seed=seed)
+    ref = scalarFights(engine, userData, enemyId, n=n, seed=seed)
+    problems = []
+    if abs(vec['winRate'] - ref['winRate']) > tolerance:
+        problems.append(f"{enemyId}: winRate {vec['winRate']:.3f} vs engine {ref['winRate']:.3f}")
+    if vec['turnsToKill'] and ref['turnsToKill'] and abs(vec['turnsToKill'] - ref['turnsToKill']) > max(0.5, ref['turnsToKill'] * tolerance):
+        problems.append(f"{enemyId}: turnsToKill {vec['turnsToKill']:.2f} vs engine {ref['turnsToKill']:.2f}")
+    return problems
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from src.gameEngine import GameEngine
+
+    parser = argparse.ArgumentParser(description="GREY CITY 밸런스 시뮬레이터")
+    parser.add_argument('--enemy', help="특정 적만 시뮬레이션 (기본: 전체)")
+    parser.add_argument('--location', help="지역 성장 시뮬레이션")
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--weapon')
+    parser.add_argument('--weapon-level', type=int, default=0)
+    parser.add_argument('--fights', type=int, default=100000)
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--hours', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help="스칼라 엔진과 교차 검증")
+    args = parser.parse_args()
+
+    engine = GameEngine()
+    player = buildPlayer(engine, args.level, args.weapon, args.weapon_level)
+    enemyIds = [args.enemy] if args.enemy else list(engine.enemies)
+
+    if args.location:
+        print(json.dumps(simulateProgression(engine, args.location, args.players, args.hours, args.seed,
+                                             args.weapon, args.weapon_level), ensure_ascii=False, indent=2))
+    else:
+        for enemyId in enemyIds:
+            print(json.dumps(simulateFights(engine, player, enemyId, args.fights, args.seed), ensure_ascii=False))
+
+    if args.check:
+        problems = [p for enemyId in enemyIds for p in crossCheck(engine, player, enemyId, seed=args.seed)]
+        print("\n".join(problems) if problems else ">>> Cross-check OK")
+        if problems: raise SystemExit(1)
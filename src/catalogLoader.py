@@ -0,0 +1,181 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from src.messageTemplates import compileMessages
+
+# 프로젝트 루트의 data/ (실행 위치와 무관하게 찾는다)
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# GameData 속성 이름 -> 파일 이름
+DATA_FILES = {
+    'locations': 'locations.json',
+    'items': 'items.json',
+    'enemies': 'enemies.json',
+    'systemMsgs': 'system.json',
+    'lore': 'lore.json',
+}
+
+class GameData:
+    """한 시점의 게임 데이터 스냅샷과 그로부터 미리 계산한 색인.
+
+    만들어진 뒤에는 속성을 바꿀 수 없다. 데이터가 바뀌면 새 스냅샷을 만들어 통째로 교체한다.
+    """
+
+    def __init__(self, locations, items, enemies, systemMsgs, lore):
+        self.locations = locations
+        self.items = items
+        self.enemies = enemies
+        self.systemMsgs = systemMsgs
+        self.lore = lore
+        self.messages = compileMessages(systemMsgs)
+        self.buildCatalog()
+        self.buildIndexes()
+        self.loadedAt = time.time()
+        self.frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, 'frozen', False):
+            raise AttributeError("GameData snapshot is read-only")
+        object.__setattr__(self, name, value)
+
+    def buildCatalog(self):
+        self.catalog = {
+            "allLocations": self.locations,
+            "itemData": self.items,
+            "enemyData": self.enemies
+        }
+        self.catalogJson = json.dumps(self.catalog, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        self.catalogVersion = hashlib.sha256(self.catalogJson.encode('utf-8')).hexdigest()[:16]
+
+    def buildIndexes(self):
+        self.materialKeys = [k for k, v in self.items.items() if v.get('type') == 'material']
+
+        loreByLocation = {}
+        for note_id, note in self.lore.items():
+            if note.get('dropLoc'):
+                loreByLocation.setdefault(note['dropLoc'], []).append((note_id, note))
+        self.loreByLocation = loreByLocation
+
+        # 지역별 드롭 테이블: 일반 아이템은 누적 가중치로 미리 계산하고,
+        # 플레이어별로 제외될 수 있는 important 아이템만 따로 둔다
+        dropTables = {}
+        for locId in self.locations:
+            regular, important = [], []
+            for k, v in self.items.items():
+                if v.get('type') == 'currency': continue
+                drop_locs = v.get('dropLocation', [])
+                if drop_locs and locId not in drop_locs: continue
+                weight = v.get('dropRate', 1.0)
+                if weight <= 0: continue
+                (important if v.get('type') == 'important' else regular).append((k, weight))
+            dropTables[locId] = {
+                "keys": [k for k, _ in regular],
+                "cumWeights": list(itertools.accumulate(w for _, w in regular)),
+                "important": important
+            }
+        self.dropTables = dropTables
+
+
+# 항목이 {id: dict} 여야 하는 파일과, 항목 안에서 타입이 정해진 필드
+ENTRY_FILES = ('locations', 'items', 'enemies', 'lore')
+LIST_FIELDS = {'locations': ('connectedTo', 'spawnList'), 'items': ('dropLocation',)}  # id 문자열 리스트
+NUMBER_FIELDS = {
+    'locations': ('spawnRate', 'itemChance'),
+    'items': ('power', 'heal', 'dropRate'),
+    'enemies': ('hp', 'maxHp', 'attack', 'exp', 'grade'),
+    'lore': ('chance',),
+}
+STRING_FIELDS = {'locations': ('requiresKey',), 'items': ('type',), 'lore': ('dropLoc',)}
+
+def isNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def findStructureProblems(raw):
+    problems = []
+    for attr, fileName in DATA_FILES.items():
+        if not isinstance(raw[attr], dict):
+            problems.append(f"{fileName}: top level must be an object")
+            raw[attr] = {}
+    for attr in ENTRY_FILES:
+        for entryId, entry in raw[attr].items():
+            if not isinstance(entry, dict):
+                problems.append(f"{attr}.{entryId}: entry must be an object, got {type(entry).__name__}")
+                continue
+            for field in LIST_FIELDS.get(attr, ()):
+                if field in entry and not (isinstance(entry[field], list) and all(isinstance(v, str) for v in entry[field])):
+                    problems.append(f"{attr}.{entryId}.{field}: must be a list of ids")
+            for field in NUMBER_FIELDS.get(attr, ()):
+                if entry.get(field) is not None and not isNumber(entry[field]):
+                    problems.append(f"{attr}.{entryId}.{field}: must be a number, got {type(entry[field]).__name__}")
+            for field in STRING_FIELDS.get(attr, ()):
+                if entry.get(field) is not None and not isinstance(entry[field], str):
+                    problems.append(f"{attr}.{entryId}.{field}: must be a string, got {type(entry[field]).__name__}")
+    return problems
+
+
+def findReferenceProblems(raw, requiredLocations=()):
+    locations, items, enemies, lore = raw['locations'], raw['items'], raw['enemies'], raw['lore']
+    problems = []
+    for locId in requiredLocations:
+        if locId not in locations:
+            problems.append(f"locations: required location '{locId}' is missing")
+    for locId, loc in locations.items():
+        for target in loc.get('connectedTo', []):
+            if target not in locations:
+                problems.append(f"locations.{locId}.connectedTo: unknown location '{target}'")
+        for enemyId in loc.get('spawnList', []):
+            if enemyId not in enemies:
+                problems.append(f"locations.{locId}.spawnList: unknown enemy '{enemyId}'")
+        if loc.get('requiresKey') and loc['requiresKey'] not in items:
+            problems.append(f"locations.{locId}.requiresKey: unknown item '{loc['requiresKey']}'")
+    for itemKey, item in items.items():
+        for locId in item.get('dropLocation', []):
+            if locId not in locations:
+                problems.append(f"items.{itemKey}.dropLocation: unknown location '{locId}'")
+    for noteId, note in lore.items():
+        if note.get('dropLoc') and note['dropLoc'] not in locations:
+            problems.append(f"lore.{noteId}.dropLoc: unknown location '{note['dropLoc']}'")
+    return problems
+
+
+def loadGameData(dataDir=DEFAULT_DATA_DIR, requiredLocations=()):
+    """data/ 의 JSON 을 읽고 교차 참조를 검증해 GameData 를 만든다.
+
+    JSON/구조 오류, 잘못된 참조, system.json 문구 오류를 모두 모아 ValueError 로 보고한다.
+    """
+    raw, problems = {}, []
+    for attr, fileName in DATA_FILES.items():
+        path = os.path.join(dataDir, fileName)
+        if not os.path.exists(path):
+            raw[attr] = {}
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw[attr] = json.load(f)
+        except (OSError, ValueError) as e:
+            problems.append(f"{fileName}: {e}")
+            raw[attr] = {}
+    problems.extend(findStructureProblems(raw))
+    try:
+        if not problems:
+            problems.extend(findReferenceProblems(raw, requiredLocations))
+        if not problems:
+            return GameData(**raw)
+    except (AttributeError, TypeError, KeyError) as e:
+        # 위 검사에서 걸러지지 않은 필드 타입 오류
+        problems.append(f"{type(e).__name__}: {e}")
+    raise ValueError("Invalid game data:\n  " + "\n  ".join(problems))
+
+
+def dataStamp(dataDir=DEFAULT_DATA_DIR):
+    # 변경 감지용: 각 파일의 (수정 시각, 크기)
+    stamp = []
+    for fileName in DATA_FILES.values():
+        try:
+            st = os.stat(os.path.join(dataDir, fileName))
+            stamp.append((fileName, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((fileName, None, None))
+    return tuple(stamp)
@@ -0,0 +1,87 @@
+import queue
+import threading
+
+class EventHub:
+    """공지/개인 메세지를 접속 중인 세션에 밀어주는 워커 단위 fan-out 허브.
+
+    저장소의 notices 경로는 워커당 한 번, messages/{userId} 는 그 유저가 이 워커에 접속해 있는 동안만
+    구독한다 (다른 유저들의 메세지 이력을 받지 않도록). 새 항목이 들어오면 구독 중인 SSE 스트림의 큐에 나눠 담는다.
+    """
+
+    def __init__(self, fbManager, queueSize=100):
+        self.fbManager = fbManager
+        self.queueSize = queueSize
+        self.subscribers = {}       # userId -> set(queue.Queue)
+        self.messageListeners = {}  # userId -> listen() 반환값 (여는 중이면 None)
+        self.lock = threading.Lock()
+        self.startLock = threading.Lock()
+        self.started = False
+
+    def start(self):
+        # 공지 리스너는 이 프로세스의 첫 구독 때 연다. 실패하면 started 를 남기지 않아 다음 구독에서 다시 시도한다
+        if self.started: return
+        with self.startLock:
+            if self.started: return
+            try:
+                self.fbManager.backend.listen('notices', self.onNotice)
+                self.started = True
+            except Exception as e:
+                print(f"EventHub Listen Error: {e}")
+
+    def subscribe(self, userId):
+        self.start()
+        q = queue.Queue(maxsize=self.queueSize)
+        with self.lock:
+            self.subscribers.setdefault(userId, set()).add(q)
+            opening = userId not in self.messageListeners
+            if opening: self.messageListeners[userId] = None
+        if opening: self.listenMessages(userId)
+        return q
+
+    def listenMessages(self, userId):
+        try:
+            listener = self.fbManager.backend.listen(f'messages/{userId}', lambda key, data: self.onMessage(userId, key, data))
+        except Exception as e:
+            print(f"EventHub Listen Error (User: {userId}): {e}")
+            listener = None
+        with self.lock:
+            # 여는 동안 모두 나갔거나 실패했다면 정리해서 다음 구독 때 다시 연다
+            if listener is not None and userId in self.subscribers:
+                self.messageListeners[userId] = listener
+                return
+            self.messageListeners.pop(userId, None)
+        if listener is not None: listener.close()
+
+    def unsubscribe(self, userId, q):
+        listener = None
+        with self.lock:
+            queues = self.subscribers.get(userId)
+            if queues:
+                queues.discard(q)
+                if not queues:
+                    del self.subscribers[userId]
+                    # 여는 중(None)이면 listenMessages 가 정리한다
+                    listener = self.messageListeners.get(userId)
+                    if listener is not None: del self.messageListeners[userId]
+        if listener is not None: listener.close()
+
+    def publish(self, event, data, userId=None):
+        with self.lock:
+            if userId is None:
+                targets = [q for queues in self.subscribers.values() for q in queues]
+            else:
+                targets = list(self.subscribers.get(userId, ()))
+        for q in targets:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # 소비하지 못하는 느린 클라이언트는 이벤트를 버린다 (다음 조회 때 따라잡음)
+                pass
+
+    def onNotice(self, key, data):
+        if '/' in key: return
+        self.publish('notice', {key: data})
+
+    def onMessage(self, userId, key, data):
+        if '/' in key: return
+        self.publish('message', {key: data}, userId=userId)
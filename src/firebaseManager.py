@@ -1,56 +1,113 @@
-import firebase_admin
-from firebase_admin import credentials, db
+import base64
+import json
+import time
+from src.storageBackend import createBackend, revisionNumber
+from src.metrics import InstrumentedBackend, instrumentMethods
 from config import Config
 
+# 관리자 목록용 경량 색인(user_index/{userId})에 복제되는 필드
+USER_INDEX_FIELDS = ('username', 'email', 'level', 'status', 'banned_until', 'force_logout')
+USER_LIST_FIELDS = ('username', 'level', 'status', 'banned_until')
+
+@instrumentMethods
 class FirebaseManager:
-    def __init__(self):
-        self.initializeFirebase()
-
-    def initializeFirebase(self):
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(Config.FIREBASE_KEY_PATH)
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': Config.FIREBASE_DB_URL
-            })
-            print(">>> Firebase Connected")
+    def __init__(self, backend=None):
+        # Config.STORAGE_BACKEND 로 Firebase / 내장 SQLite 저장소를 선택
+        # 모든 저장소 호출은 지연/크기/오류 지표를 남긴다 (src/metrics.py)
+        self.backend = InstrumentedBackend(backend or createBackend(Config))
+        self.userIndexCache = None
+        self.userIndexCachedAt = 0
+        self.userIndexTTL = getattr(Config, 'USER_INDEX_CACHE_TTL', 10)
+        self.noticeCache = None
+        self.noticeCachedAt = 0
+        self.noticeTTL = getattr(Config, 'NOTICE_CACHE_TTL', 10)
+        self.noticeCacheSize = getattr(Config, 'NOTICE_CACHE_SIZE', 101)
+
+    def buildUserIndexEntry(self, data):
+        return {k: data[k] for k in USER_INDEX_FIELDS if data.get(k) is not None}
 
     def getUserData(self, userId):
         try:
-            ref = db.reference(f'users/{userId}')
-            return ref.get()
+            return self.backend.get(f'users/{userId}')
         except Exception as e:
             print(f"Firebase GET Error (User: {userId}): {e}")
             return None
 
-    def updateUserData(self, userId, data):
-        try:
-            ref = db.reference(f'users/{userId}')
-            ref.update(data)
-        except Exception as e:
-            print(f"Firebase UPDATE Error (User: {userId}): {e}")
+    @staticmethod
+    def userFieldPaths(userId, updates):
+        # 유저 문서 하위 경로 + 색인 필드를 루트 기준 다중 경로로 변환
+        paths = {f'users/{userId}/{k}': v for k, v in updates.items()}
+        for k, v in updates.items():
+            if k in USER_INDEX_FIELDS:
+                paths[f'user_index/{userId}/{k}'] = v
+        return paths
 
-    def setUserData(self, userId, data):
+    def userDocumentPaths(self, userId, data):
+        # 문서 전체 + 색인 항목 (revision 은 setUserData 가 저장된 값에서 정한다)
+        return {
+            f'users/{userId}': data,
+            f'user_index/{userId}': self.buildUserIndexEntry(data) if data else None
+        }
+
+    @staticmethod
+    def userDeletionPaths(userId, username=None):
+        paths = {
+            f'users/{userId}': None, f'user_index/{userId}': None, f'user_auth_index/{userId}': None,
+            f'messages/{userId}': None, f'read_cursors/{userId}': None,
+            f'player_logs/{userId}': None
+        }
+        if username:
+            paths[f'user_auth/{username}'] = None
+        return paths
+
+    def patchUserData(self, userId, updates):
+        # updates 의 키는 유저 문서 기준 상대 경로 (예: 'hp', 'inventory/potion', 'upgrades/upgrades_atk')
         try:
-            ref = db.reference(f'users/{userId}')
-            ref.set(data)
+            self.backend.update('', self.userFieldPaths(userId, updates))
+            return True
         except Exception as e:
-            print(f"Firebase SET Error (User: {userId}): {e}")
-        
-    def deleteUserData(self, userId):
+            print(f"Firebase PATCH Error (User: {userId}): {e}")
+            return False
+
+    def casUserData(self, userId, expectedRevision, updates):
+        """문서 revision 이 expectedRevision 일 때만 updates(상대 경로)를 기록하고 revision 을 1 올린다.
+
+        반환: True(기록됨), False(다른 쓰기가 먼저 반영됨), None(저장소 오류)
+        """
         try:
-            ref = db.reference(f'users/{userId}')
-            ref.delete()
+            # revision 비교 + 문서/색인 변경분을 한 번의 다중 경로 쓰기로 반영
+            paths = self.userFieldPaths(userId, updates)
+            paths[f'users/{userId}/revision'] = revisionNumber(expectedRevision) + 1
+            return self.backend.compareAndUpdate('', f'users/{userId}/revision', expectedRevision, paths)
         except Exception as e:
-            print(f"Firebase DELETE Error (User: {userId}): {e}")
+            print(f"Firebase CAS Error (User: {userId}): {e}")
+            return None
 
-    # --- 인증 관련 메서드 ---
+    def setUserData(self, userId, data, extraPaths=None, attempts=5):
+        """문서 전체를 덮어쓴다 (extraPaths 는 함께 기록할 루트 기준 경로).
 
+        revision 은 호출자가 넘긴 값이 아니라 저장된 값 + 1 로 정하고 같은 CAS 로 기록하므로
+        초기화 뒤에도 계속 증가하며, 이전 문서를 읽은 다른 워커 캐시의 CAS 는 실패한다.
+        """
+        try:
+            for attempt in range(attempts):
+                stored = self.backend.get(f'users/{userId}/revision')
+                data['revision'] = revisionNumber(stored) + 1
+                paths = self.userDocumentPaths(userId, data)
+                if extraPaths: paths.update(extraPaths)
+                if self.backend.compareAndUpdate('', f'users/{userId}/revision', stored, paths):
+                    return True
+                time.sleep(0.05 * (attempt + 1))
+            print(f"Firebase SET Conflict (User: {userId}): revision kept changing")
+        except Exception as e:
+            print(f"Firebase SET Error (User: {userId}): {e}")
+        return False
+        
     def getAuthData(self, username):
         try:
             # 안전성을 위해 str 캐스팅 및 예외 처리
             safe_username = str(username)
-            ref = db.reference(f'user_auth/{safe_username}')
-            return ref.get()
+            return self.backend.get(f'user_auth/{safe_username}')
         except Exception as e:
             # Firebase 허용되지 않은 키(. $ # [ ] /) 등이 강제 주입될 경우 크래시 방지
             print(f"Firebase Auth GET Error: Invalid key accessed.")
@@ -59,65 +116,264 @@ class FirebaseManager:
     def registerUserAuth(self, username, passwordHash, userId):
         try:
             safe_username = str(username)
-            ref = db.reference(f'user_auth/{safe_username}')
-            ref.set({
-                "password": passwordHash,
-                "userId": userId
+            # 인증 정보와 userId -> username 역색인을 한 번의 다중 경로 쓰기로 기록
+            self.backend.update('', {
+                f'user_auth/{safe_username}': {
+                    "password": passwordHash,
+                    "userId": userId
+                },
+                f'user_auth_index/{userId}': safe_username
             })
         except Exception as e:
             print(f"Firebase Auth SET Error: {e}")
 
-    def deleteAuthData(self, username):
+    def updatePasswordHash(self, username, passwordHash):
         try:
-            safe_username = str(username)
-            ref = db.reference(f'user_auth/{safe_username}')
-            ref.delete()
+            self.backend.update('', {f'user_auth/{str(username)}/password': passwordHash})
         except Exception as e:
-            print(f"Firebase Auth DELETE Error: {e}")
+            print(f"Firebase Auth UPDATE Error: {e}")
 
-    def getAllUsers(self):
+    def rebuildAuthIndex(self):
+        # 역색인 도입 이전에 가입한 계정을 위한 1회성 마이그레이션 (`python -m src.migrations`)
         try:
-            users_ref = db.reference('users')
-            return users_ref.get() or {}
+            all_auth = self.backend.get('user_auth') or {}
+            updates = {f'user_auth_index/{data["userId"]}': username
+                       for username, data in all_auth.items() if isinstance(data, dict) and data.get('userId')}
+            if updates:
+                self.backend.update('', updates)
+            return len(updates)
         except Exception as e:
-            print(f"GetAllUsers Error: {e}")
-            return {}
+            print(f"Firebase Auth Index Error: {e}")
+            return 0
+
+    def getUserIndex(self, fresh=False):
+        # 색인 도입 이전 계정의 항목은 `python -m src.migrations` 가 채운다 (backfillUserIndex)
+        now = time.time()
+        if fresh or self.userIndexCache is None or now - self.userIndexCachedAt > self.userIndexTTL:
+            self.userIndexCache, self.userIndexCachedAt = self.backend.get('user_index') or {}, now
+        return self.userIndexCache
+
+    def listUsers(self, search='', sort='username', order='asc', cursor=None, limit=50):
+        """관리자 목록 한 페이지. cursor 는 직전 페이지 마지막 항목의 (정렬값, userId) 이다."""
+        try:
+            index = self.getUserIndex()
+        except Exception as e:
+            print(f"ListUsers Error: {e}")
+            return {"users": [], "total": 0, "nextCursor": None}
+
+        now = time.time()
+        def sortKey(item):
+            userId, entry = item
+            if sort == 'level': value = int(entry.get('level') or 1)
+            elif sort == 'banned': value = entry.get('banned_until', 0) if entry.get('banned_until', 0) > now else 0
+            else: value = str(entry.get('username') or '').lower()
+            return (value, userId)
+
+        needle = (search or '').strip().lower()
+        rows = []
+        for userId, entry in index.items():
+            if not isinstance(entry, dict): continue
+            if needle and needle not in userId.lower() \
+                    and needle not in str(entry.get('username') or '').lower() \
+                    and needle not in str(entry.get('email') or '').lower():
+                continue
+            rows.append((sortKey((userId, entry)), userId, entry))
+
+        reverse = order == 'desc'
+        rows.sort(key=lambda r: r[0], reverse=reverse)
+
+        if cursor:
+            try:
+                after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode()).decode()))
+                rows_after = [r for r in rows if (r[0] < after if reverse else r[0] > after)]
+            except Exception:
+                rows_after = rows
+        else:
+            rows_after = rows
+
+        page = rows_after[:limit]
+        nextCursor = None
+        if len(rows_after) > limit:
+            nextCursor = base64.urlsafe_b64encode(json.dumps(list(page[-1][0])).encode()).decode()
+
+        users = [dict({"id": userId}, **{k: entry.get(k) for k in USER_LIST_FIELDS}) for _, userId, entry in page]
+        return {"users": users, "total": len(rows), "nextCursor": nextCursor}
 
     def deleteUserComplete(self, user_id):
         try:
-            db.reference(f'users/{user_id}').delete()
-            
-            auth_ref = db.reference('auth')
-            all_auth = auth_ref.get() or {}
-            for username, data in all_auth.items():
-                if data.get('userId') == user_id:
-                    db.reference(f'auth/{username}').delete()
-                    break
+            # 역색인(없으면 문서의 username)으로 로그인 정보를 찾아 유저 데이터/인증 정보/색인을 한 번에 삭제
+            # username 이 없으면 로컬 로그인 정보가 없는 계정(Discord)이다
+            username = self.getAuthUsername(user_id)
+            self.backend.update('', self.userDeletionPaths(user_id, username))
             return True
         except Exception as e:
             print(f"Delete User Complete Error: {e}")
             return False
         
+    def getUserIndexEntries(self, userIds, pointReads=10):
+        # 몇 명뿐이면 항목별로, 많으면 색인 전체를 한 번 새로 읽는다. 반환: {userId: 색인 항목} (없는 유저 제외)
+        entries = {}
+        if len(userIds) > pointReads:
+            index = self.getUserIndex(fresh=True) or {}
+            entries = {userId: index[userId] for userId in userIds if userId in index}
+        else:
+            for userId in userIds:
+                try:
+                    entry = self.backend.get(f'user_index/{userId}')
+                except Exception as e:
+                    print(f"Firebase Index GET Error (User: {userId}): {e}")
+                    continue
+                if entry is not None: entries[userId] = entry
+        # 색인에 없는 유저(색인 도입 이전 계정)는 문서로 확인하고 색인 항목을 채워 둔다
+        for userId in userIds:
+            if userId in entries: continue
+            try:
+                data = self.backend.get(f'users/{userId}')
+                if not isinstance(data, dict): continue
+                entries[userId] = self.buildUserIndexEntry(data)
+                self.backend.set(f'user_index/{userId}', entries[userId] or None)
+            except Exception as e:
+                print(f"Firebase Index Backfill Error (User: {userId}): {e}")
+        return entries
+
+    def getAuthUsername(self, userId):
+        # userId -> 로그인 username (역색인이 없는 이전 계정은 문서의 username 이 같은 userId 의 인증 정보인지 확인)
+        username = self.backend.get(f'user_auth_index/{userId}')
+        if username: return username
+        username = self.backend.get(f'users/{userId}/username')
+        if not isinstance(username, str) or not username: return None
+        return username if self.backend.get(f'user_auth/{username}/userId') == userId else None
+
+    def getAuthUsernames(self, userIds):
+        # 대상 유저의 역색인 항목만 하나씩 읽는다. 반환: {userId: username 또는 None}
+        usernames = {}
+        for userId in userIds:
+            try:
+                usernames[userId] = self.getAuthUsername(userId)
+            except Exception as e:
+                print(f"Firebase Auth Index GET Error (User: {userId}): {e}")
+                usernames[userId] = None
+        return usernames
+
+    def bulkUpdate(self, pathsByUser, chunkSize=100):
+        """{userId: 루트 기준 다중 경로} 를 chunkSize 명씩 묶어 한 번의 update 로 기록한다.
+
+        반환: {userId: 기록 성공 여부} (청크 하나가 실패해도 나머지 청크는 계속 기록)
+        """
+        results = {}
+        userIds = list(pathsByUser)
+        for i in range(0, len(userIds), chunkSize):
+            chunk = userIds[i:i + chunkSize]
+            paths = {}
+            for userId in chunk:
+                paths.update(pathsByUser[userId])
+            try:
+                if paths: self.backend.update('', paths)
+                ok = True
+            except Exception as e:
+                print(f"Firebase Bulk Update Error ({len(chunk)} users): {e}")
+                ok = False
+            results.update({userId: ok for userId in chunk})
+        if results: self.userIndexCache = None
+        return results
+
+    def sendPrivateMessages(self, userIds, data, chunkSize=100):
+        # 여러 유저에게 같은 메세지를 push 키로 추가 (청크당 한 번의 쓰기). 반환: {userId: 성공 여부}
+        results = {}
+        for i in range(0, len(userIds), chunkSize):
+            chunk = userIds[i:i + chunkSize]
+            try:
+                self.backend.pushMany('messages', {userId: data for userId in chunk})
+                ok = True
+            except Exception as e:
+                print(f"Firebase Bulk Message Error ({len(chunk)} users): {e}")
+                ok = False
+            results.update({userId: ok for userId in chunk})
+        return results
+
     def sendGlobalNotice(self, data):
             try:
-                db.reference('notices').push(data)
+                self.backend.push('notices', data)
+                self.noticeCache = None
             except Exception as e:
                 print(f"Firebase Notice Error: {e}")
 
-    def getGlobalNotices(self):
+    def sendPrivateMessage(self, userId, data):
+        try:
+            self.backend.push(f'messages/{userId}', data)
+        except Exception as e:
+            print(f"Firebase Message Error: {e}")
+
+    def queryGlobalNotices(self, after=None, before=None, limit=20):
+        # 모든 요청이 공유하는 최신 공지 한 페이지(noticeCacheSize 개)만 워커 단위로 짧게 캐시한다.
+        # 캐시 범위 안에서 답할 수 있는 요청(첫 페이지, 최근 키 이후 폴링)은 캐시를 자르고,
+        # 더 오래된 구간은 메시지처럼 저장소 범위 조회로 가져온다
+        try:
+            now = time.time()
+            if self.noticeCache is None or now - self.noticeCachedAt > self.noticeTTL:
+                self.noticeCache = self.backend.query('notices', limit=self.noticeCacheSize)
+                self.noticeCachedAt = now
+            cache = self.noticeCache
+            # 캐시가 가득 차 있지 않으면 전체 이력이므로 모든 범위를 캐시로 답할 수 있다
+            complete = len(cache) < self.noticeCacheSize
+            if before is None and limit < self.noticeCacheSize and (
+                    complete or after is None or (cache and after >= cache[0][0])):
+                items = [(k, v) for k, v in cache if after is None or k > after]
+            elif complete:
+                items = [(k, v) for k, v in cache
+                         if (after is None or k > after) and (before is None or k < before)]
+            else:
+                items = self.backend.query('notices', after=after, before=before, limit=limit + 1)
+            return self.slicePage(items, after, limit)
+        except Exception as e:
+            print(f"Firebase Notice Query Error: {e}")
+            return [], False
+
+    def queryPrivateMessages(self, userId, after=None, before=None, limit=20):
+        try:
+            items = self.backend.query(f'messages/{userId}', after=after, before=before, limit=limit + 1)
+            return self.slicePage(items, after, limit)
+        except Exception as e:
+            print(f"Firebase Message Query Error: {e}")
+            return [], False
+
+    @staticmethod
+    def slicePage(items, after, limit):
+        # after 가 없으면 최신 limit 개(더 오래된 항목 존재 여부), 있으면 그 다음 limit 개(더 새 항목 존재 여부)
+        hasMore = len(items) > limit
+        return (items[-limit:] if after is None else items[:limit]), hasMore
+
+    def getReadCursors(self, userId):
         try:
-            return db.reference('notices').get() or {}
+            return self.backend.get(f'read_cursors/{userId}') or {}
         except Exception:
             return {}
 
-    def sendPrivateMessage(self, userId, data):
+    def setReadCursor(self, userId, channel, key):
         try:
-            db.reference(f'messages/{userId}').push(data)
+            self.backend.update(f'read_cursors/{userId}', {channel: key})
         except Exception as e:
-            print(f"Firebase Message Error: {e}")
+            print(f"Firebase Read Cursor Error: {e}")
 
-    def getPrivateMessages(self, userId):
+    def getPlayerLogs(self, userId, limit):
+        # 최근 limit 줄: 키 오름차순 (key, 문장) 리스트
         try:
-            return db.reference(f'messages/{userId}').get() or {}
-        except Exception:
-            return {}
\ No newline at end of file
+            return self.backend.query(f'player_logs/{userId}', limit=limit)
+        except Exception as e:
+            print(f"Firebase Player Log Query Error: {e}")
+            return []
+
+    def updatePlayerLogs(self, paths):
+        # {'userId/key': 문장 또는 None} 을 한 번의 다중 경로 쓰기로 반영
+        try:
+            self.backend.update('player_logs', paths)
+            return True
+        except Exception as e:
+            print(f"Firebase Player Log Update Error: {e}")
+            return False
+
+    def clearPlayerLogs(self, userId):
+        try:
+            self.backend.delete(f'player_logs/{userId}')
+        except Exception as e:
+            print(f"Firebase Player Log Clear Error: {e}")
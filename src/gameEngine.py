@@ -1,34 +1,168 @@
-import json
-import os
+import bisect
+import copy
+import functools
 import random
+import threading
 import uuid
+from src.catalogLoader import DEFAULT_DATA_DIR, loadGameData, dataStamp
+from src.migrations import SCHEMA_VERSION, migrateUserData
+from src.backgroundLoop import BackgroundLoop
+from src.metrics import registry as metrics
+
+LOG_LIMIT = 30
+# 로그는 플레이어 문서가 아닌 LogStream(player_logs/{userId}) 에 쌓인다.
+# userData['logs'] 에는 이번 요청에서 새로 생긴 줄만 담기며, 라우트가 저장 전에 떼어 간다.
+# 스트림의 저장소 정리도 밀려난 줄이 LOG_TRIM_BATCH 개 모일 때마다 한꺼번에 한다.
+LOG_TRIM_BATCH = 10
+# 하위 키 단위로 변경분을 기록하는 dict 필드
+NESTED_DELTA_FIELDS = ('inventory', 'upgrades', 'weapon_levels', 'equipment')
+# 지표 라벨로 쓰는 행동 종류 (그 외 값은 'other' 로 묶어 라벨 폭증을 막는다)
+ACTION_TYPES = ('move', 'search', 'attack', 'run', 'revive', 'useItem', 'discardItem', 'unequipItem',
+                'disassembleWeapon', 'upgradeWeapon', 'upgrade')
+
+PLAYER_DEFAULTS = {
+    "level": 1, "exp": 0, "maxExp": 100, "hp": 100, "maxHp": 100,
+    "attack": 10, "defense": 0, "heart_fragments": 0,
+    "currentLocation": "central_control_room",
+    "inventory": {}, "archive": [], "unlocked_places": [],
+    "upgrades": {"upgrades_atk": 0, "upgrades_hp": 0, "upgrades_evasion": 0},
+    "weapon_levels": {},
+    "equipment": {"weapon": None, "armor": None},
+    "status": "normal", "combatData": None
+}
+
+# 데이터 교체 후에도 반드시 있어야 하는 지역 (신규/초기화 플레이어 시작 위치)
+REQUIRED_LOCATIONS = (PLAYER_DEFAULTS['currentLocation'],)
+
+
+def snapshotAttr(name):
+    return property(lambda self: getattr(self.pinned.__dict__.get('snapshot') or self.current, name))
+
+def withSnapshot(fn):
+    # 한 번의 처리 동안 같은 GameData 스냅샷을 보도록 고정한다 (중첩 호출은 바깥 고정을 따름)
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if self.pinned.__dict__.get('snapshot') is not None:
+            return fn(self, *args, **kwargs)
+        self.pinned.snapshot = self.current
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            self.pinned.snapshot = None
+    return wrapper
 
 class GameEngine:
-    def __init__(self):
-        self.locations = self.loadJson('locations.json')
-        self.items = self.loadJson('items.json')
-        self.enemies = self.loadJson('enemies.json')
-        self.systemMsgs = self.loadJson('system.json')
-        self.lore = self.loadJson('lore.json')
-
-    def loadJson(self, fileName):
-        path = os.path.join('data', fileName)
-        if not os.path.exists(path): return {}
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    """게임 규칙. 정적 데이터(self.locations, self.items ...)는 현재 GameData 스냅샷에서 읽는다.
 
-    def getMsg(self, category, key, **kwargs):
+    reload() 는 새 스냅샷을 만든 뒤 참조 하나만 바꾸며, 처리 중인 요청은
+    시작할 때 고정한 스냅샷을 끝까지 사용한다 (withSnapshot).
+    """
+
+    def __init__(self, dataDir=None):
+        self.dataDir = dataDir or DEFAULT_DATA_DIR
+        self.current = loadGameData(self.dataDir, REQUIRED_LOCATIONS)
+        self.currentStamp = dataStamp(self.dataDir)
+        self.pinned = threading.local()
+        self.logCapture = threading.local()
+        self.reloadLock = threading.Lock()
+        self.reloadTicket = self.swappedTicket = 0
+        self.watchLock = threading.Lock()
+        self.watcher = None
+
+    @property
+    def data(self):
+        return self.pinned.__dict__.get('snapshot') or self.current
+
+    # self.items, self.dropTables 등은 현재 스냅샷의 같은 이름 속성을 읽는다
+    locations = snapshotAttr('locations')
+    items = snapshotAttr('items')
+    enemies = snapshotAttr('enemies')
+    lore = snapshotAttr('lore')
+    systemMsgs = snapshotAttr('systemMsgs')
+    messages = snapshotAttr('messages')
+    catalog = snapshotAttr('catalog')
+    catalogJson = snapshotAttr('catalogJson')
+    catalogVersion = snapshotAttr('catalogVersion')
+    materialKeys = snapshotAttr('materialKeys')
+    loreByLocation = snapshotAttr('loreByLocation')
+    dropTables = snapshotAttr('dropTables')
+
+    def reload(self):
+        """데이터를 다시 읽어 검증에 통과하면 교체한다. (교체 여부, 새 버전 또는 오류) 를 반환.
+
+        읽기와 검증은 잠금 밖에서 하고, 잠금은 참조 교체에만 쓴다.
+        """
+        with self.reloadLock:
+            self.reloadTicket += 1
+            ticket = self.reloadTicket
+        stamp = dataStamp(self.dataDir)
         try:
-            msg_list = self.systemMsgs.get(category, {}).get(key, [])
-            if not msg_list: return str(key)
-            template = random.choice(msg_list)
-            return template.format(**kwargs)
-        except Exception:
-            return str(key)
+            snapshot = loadGameData(self.dataDir, REQUIRED_LOCATIONS)
+        except ValueError as e:
+            snapshot, error = None, e
+        with self.reloadLock:
+            # 동시에 시작된 더 늦은 reload 가 이미 교체했다면 이 결과는 버린다
+            if ticket < self.swappedTicket:
+                return False, "superseded by a newer reload"
+            self.swappedTicket = ticket
+            self.currentStamp = stamp  # 실패해도 기록해 같은 오류를 반복해서 출력하지 않는다
+            if snapshot is not None: self.current = snapshot
+        if snapshot is None:
+            print(f"Game Data Reload Error: {error}")
+            return False, str(error)
+        print(f">>> Game data reloaded (catalog {snapshot.catalogVersion})")
+        return True, snapshot.catalogVersion
+
+    def startWatching(self, interval=5):
+        # 워커마다 data/ 감시 스레드를 하나씩 띄운다. 매 요청마다 불리므로 이미 돌고 있으면 잠금 없이 돌아간다
+        if not interval: return
+        if self.watcher is None:
+            with self.watchLock:
+                if self.watcher is None:
+                    self.watcher = BackgroundLoop('Game Data Watch', interval, self.checkForChanges)
+        self.watcher.ensureStarted()
+
+    def checkForChanges(self):
+        if dataStamp(self.dataDir) != self.currentStamp:
+            self.reload()
+
+    def rollDropItem(self, locId, inventory):
+        table = self.dropTables.get(locId)
+        if not table: return None
+        important = [(k, w) for k, w in table['important'] if k not in inventory]
+        regularTotal = table['cumWeights'][-1] if table['cumWeights'] else 0
+        total = regularTotal + sum(w for _, w in important)
+        if total <= 0: return None
+
+        roll = random.random() * total
+        if roll < regularTotal:
+            return table['keys'][bisect.bisect_right(table['cumWeights'], roll)]
+        roll -= regularTotal
+        for k, w in important:
+            if roll < w: return k
+            roll -= w
+        return important[-1][0]
+
+    def getMsg(self, category, key, **kwargs):
+        return self.messages[(category, key)].render(kwargs)
 
     def getBaseKey(self, itemKey):
         return itemKey.split(':')[0] if itemKey else None
 
+    # 인벤토리는 {itemKey: 개수} 형태의 multiset 이다.
+    # 소모품/재료는 기본 키로 개수가 쌓이고, 무기는 'base:uuid' 키가 개수 1로 들어간다.
+    def addItem(self, userData, itemKey, count=1):
+        inv = userData['inventory']
+        inv[itemKey] = inv.get(itemKey, 0) + count
+
+    def removeItem(self, userData, itemKey, count=1):
+        inv = userData['inventory']
+        have = inv.get(itemKey, 0)
+        if have < count: return False
+        if have == count: del inv[itemKey]
+        else: inv[itemKey] = have - count
+        return True
+
     def initNewPlayer(self):
         welcome_msg = self.getMsg('system', 'welcome')
         return {
@@ -37,7 +171,7 @@ class GameEngine:
             "attack": 10, "defense": 0,
             "heart_fragments": 0,
             "currentLocation": "central_control_room", 
-            "inventory": [],
+            "inventory": {},
             "archive": [],
             "unlocked_places": [],
             "upgrades": {"upgrades_atk": 0, "upgrades_hp": 0, "upgrades_evasion": 0},
@@ -45,50 +179,20 @@ class GameEngine:
             "equipment": {"weapon": None, "armor": None},
             "logs": [welcome_msg],
             "status": "normal",
-            "combatData": None
+            "combatData": None,
+            "schemaVersion": SCHEMA_VERSION
         }
 
+    def fillDefaults(self, userData):
+        # Firebase 는 빈 리스트/dict/None 을 저장하지 않으므로 빠진 필드만 채운다
+        for key, val in PLAYER_DEFAULTS.items():
+            if key not in userData: userData[key] = copy.deepcopy(val)
+
+    @withSnapshot
     def validateUserData(self, userData):
-        if 'heart_fragments' not in userData: userData['heart_fragments'] = 0
-        if 'unlocked_places' not in userData: userData['unlocked_places'] = []
-        if 'archive' not in userData: userData['archive'] = []
-        if 'upgrades' not in userData: userData['upgrades'] = {"upgrades_atk": 0, "upgrades_hp": 0, "upgrades_evasion": 0}
-        if 'weapon_levels' not in userData: userData['weapon_levels'] = {}
-            
-        defaults = {
-            "level": 1, "exp": 0, "maxExp": 100, "hp": 100, "maxHp": 100,
-            "attack": 10, "defense": 0, "currentLocation": "central_control_room",
-            "inventory": [], "archive": [], "unlocked_places": [],
-            "upgrades": {"upgrades_atk": 0, "upgrades_hp": 0, "upgrades_evasion": 0},
-            "weapon_levels": {},
-            "equipment": {"weapon": None, "armor": None}, "logs": [],
-            "status": "normal", "combatData": None
-        }
-        for key, val in defaults.items():
-            if key not in userData: userData[key] = val
-
-        new_inv = []
-        for itemKey in userData.get('inventory', []):
-            if ':' not in itemKey and itemKey in self.items and self.items[itemKey]['type'] == 'weapon':
-                unique_id = uuid.uuid4().hex[:8]
-                new_key = f"{itemKey}:{unique_id}"
-                new_inv.append(new_key)
-                if itemKey in userData.get('weapon_levels', {}):
-                    lvl = userData['weapon_levels'].pop(itemKey)
-                    userData['weapon_levels'][new_key] = lvl
-            else:
-                new_inv.append(itemKey)
-        userData['inventory'] = new_inv
-
-        eq_wpn = userData.get('equipment', {}).get('weapon')
-        if eq_wpn and ':' not in eq_wpn and eq_wpn in self.items:
-            unique_id = uuid.uuid4().hex[:8]
-            new_key = f"{eq_wpn}:{unique_id}"
-            userData['equipment']['weapon'] = new_key
-            if eq_wpn in userData.get('weapon_levels', {}):
-                lvl = userData['weapon_levels'].pop(eq_wpn)
-                userData['weapon_levels'][new_key] = lvl
-        
+        # 최신 스키마 문서는 기본값 채우기만 하고 마이그레이션은 건너뛴다
+        self.fillDefaults(userData)
+        migrateUserData(self, userData)
         if userData['currentLocation'] not in self.locations:
              userData['currentLocation'] = "central_control_room"
         return userData
@@ -115,11 +219,13 @@ class GameEngine:
             userData['attack'] += 2
             msg = self.getMsg('system', 'level_up', level=userData['level'])
             self.addLog(userData, msg)
+            metrics.inc('greycity_level_ups_total')
             leveled_up = True
         return leveled_up
 
+    @withSnapshot
     def getGameResponse(self, userData):
-        userData = self.validateUserData(userData)
+        # userData 는 이미 validateUserData 를 거친 문서여야 한다
         currentLocData = self.locations[userData['currentLocation']]
         connectedInfo = [{"id": locId, "name": self.locations[locId]['name']} for locId in currentLocData.get('connectedTo', []) if locId in self.locations]
         
@@ -132,12 +238,13 @@ class GameEngine:
         return {
             "userData": userData, "stats": self.getTotalStats(userData),
             "locationInfo": currentLocData, "connectedLocations": connectedInfo,
-            "allLocations": self.locations, "itemData": self.items,
-            "enemyData": self.enemies, "archiveData": archive_details
+            "catalogVersion": self.catalogVersion, "archiveData": archive_details
         }
 
+    @withSnapshot
     def processAction(self, userData, actionType, target):
         userData = self.validateUserData(userData)
+        metrics.inc('greycity_actions_total', {"type": actionType if actionType in ACTION_TYPES else 'other'})
         
         if actionType == "useItem": return self.processItemUsage(userData, target)
         if actionType == "discardItem": return self.processItemDiscard(userData, target)
@@ -147,12 +254,9 @@ class GameEngine:
             if target in userData['inventory']:
                 base_key = self.getBaseKey(target)
                 if base_key in self.items and self.items[base_key]['type'] == 'weapon':
-                    userData['inventory'].remove(target)
-                    materials = [k for k, v in self.items.items() if v.get('type') == 'material']
-                    if not materials:
-                        materials = ['scrap_metal']
-                    get_mat = random.choice(materials)
-                    userData['inventory'].append(get_mat)
+                    self.removeItem(userData, target)
+                    get_mat = random.choice(self.materialKeys or ['scrap_metal'])
+                    self.addItem(userData, get_mat)
                     
                     if target in userData['weapon_levels']:
                         del userData['weapon_levels'][target]
@@ -169,15 +273,18 @@ class GameEngine:
                 mat_needed = (lvl + 1) * 2
                 frag_needed = (lvl + 1) * 5
                 
-                materials_in_inv = [item for item in userData['inventory'] if self.items.get(self.getBaseKey(item), {}).get('type') == 'material']
+                inv = userData['inventory']
+                mat_count = sum(inv.get(k, 0) for k in self.materialKeys)
                 
-                if len(materials_in_inv) >= mat_needed and userData['heart_fragments'] >= frag_needed:
+                if mat_count >= mat_needed and userData['heart_fragments'] >= frag_needed:
                     userData['heart_fragments'] -= frag_needed
-                    for _ in range(mat_needed):
-                        for item in userData['inventory']:
-                            if self.items.get(self.getBaseKey(item), {}).get('type') == 'material':
-                                userData['inventory'].remove(item)
-                                break
+                    remaining = mat_needed
+                    for k in self.materialKeys:
+                        if not remaining: break
+                        used = min(inv.get(k, 0), remaining)
+                        if used:
+                            self.removeItem(userData, k, used)
+                            remaining -= used
                                 
                     userData['weapon_levels'][weaponId] = lvl + 1
                     msg = self.getMsg('item', 'upgrade_weapon', weaponName=self.items[base_key]['name'], level=lvl+1)
@@ -221,11 +328,11 @@ class GameEngine:
                     else: self.addLog(userData, self.getMsg('error', 'no_fragment', count=required_fragments))
                 elif target == 'kit':
                     if 'first_aid_kit' in userData['inventory']:
-                        userData['inventory'].remove('first_aid_kit')
+                        self.removeItem(userData, 'first_aid_kit')
                         self.executeRevive(userData)
                     else: self.addLog(userData, self.getMsg('error', 'no_kit'))
                 elif target == 'reset':
-                    if int(userData.get('heart_fragments', 0)) < required_fragments and 'first_aid_kit' not in userData.get('inventory', []):
+                    if int(userData.get('heart_fragments', 0)) < required_fragments and 'first_aid_kit' not in userData.get('inventory', {}):
                         self.executeResetRevive(userData)
                     else:
                         self.addLog(userData, self.getMsg('error', 'cannot_reset'))
@@ -255,7 +362,7 @@ class GameEngine:
                 if can_enter:
                     userData['currentLocation'] = target
                     message += self.getMsg('move', 'success', name=newLoc['name'])
-                    if newLoc.get('dangerLevel') != 'SAFE' and 'spawnList' in newLoc:
+                    if newLoc.get('dangerLevel') != 'SAFE' and newLoc.get('spawnList'):
                         if random.random() < newLoc.get('spawnRate', 0):
                             enemyId = random.choice(newLoc['spawnList'])
                             self.startCombat(userData, enemyId)
@@ -270,48 +377,59 @@ class GameEngine:
                     userData['heart_fragments'] += amount
                     message = self.getMsg('search', 'fragment_found', amount=amount)
                     event_happened = True
-                if not event_happened and 'spawnList' in currentLocData and random.random() < 0.2:
+                if not event_happened and currentLocData.get('spawnList') and random.random() < 0.2:
                     enemyId = random.choice(currentLocData['spawnList'])
                     self.startCombat(userData, enemyId)
                     message = self.getMsg('search', 'enemy_found', name=self.enemies[enemyId]['name'])
                     event_happened = True
                 if not event_happened:
-                    for note_id, note in self.lore.items():
-                        if note.get('dropLoc') == userData['currentLocation'] and note_id not in userData['archive']:
+                    for note_id, note in self.loreByLocation.get(userData['currentLocation'], []):
+                        if note_id not in userData['archive']:
                             if random.random() < note.get('chance', 0):
                                 userData['archive'].append(note_id)
                                 message = self.getMsg('search', 'note_found', title=note['title'])
                                 event_happened = True
                                 break
                 if not event_happened and random.random() < currentLocData.get('itemChance', 0):
-                    valid_items = []
-                    current_loc = userData['currentLocation']
-                    for k, v in self.items.items():
-                        if v.get('type') == 'currency': continue
-                        if v.get('type') == 'important' and k in userData.get('inventory', []): continue
-                        drop_locs = v.get('dropLocation', [])
-                        if drop_locs and current_loc not in drop_locs: continue
-                        valid_items.append(k)
-                    
-                    if valid_items:
-                        weights = [self.items[k].get('dropRate', 1.0) for k in valid_items]
-                        if sum(weights) > 0:
-                            foundItemKey = random.choices(valid_items, weights=weights, k=1)[0]
-                            if self.items[foundItemKey].get('type') == 'weapon':
-                                unique_id = uuid.uuid4().hex[:8]
-                                insert_key = f"{foundItemKey}:{unique_id}"
-                            else:
-                                insert_key = foundItemKey
-                                
-                            userData['inventory'].append(insert_key)
-                            message = self.getMsg('search', 'item_found', name=self.items[foundItemKey]['name'])
-                            event_happened = True
+                    foundItemKey = self.rollDropItem(userData['currentLocation'], userData.get('inventory', {}))
+                    if foundItemKey:
+                        if self.items[foundItemKey].get('type') == 'weapon':
+                            unique_id = uuid.uuid4().hex[:8]
+                            insert_key = f"{foundItemKey}:{unique_id}"
+                        else:
+                            insert_key = foundItemKey
+                            
+                        self.addItem(userData, insert_key)
+                        message = self.getMsg('search', 'item_found', name=self.items[foundItemKey]['name'])
+                        event_happened = True
                 
                 if not event_happened: message = self.getMsg('search', 'empty')
 
         self.addLog(userData, message)
         return self.getGameResponse(userData)
 
+    @withSnapshot
+    def processBatch(self, userData, actions):
+        """여러 행동을 순서대로 처리한다. 상태(normal/combat/dead)가 바뀌면 남은 행동은 건너뛴다."""
+        userData = self.validateUserData(userData)
+        steps, response, stoppedAt = [], None, None
+        for i, (actionType, target) in enumerate(actions):
+            prevStatus = userData.get('status')
+            self.logCapture.lines = []
+            try:
+                response = self.processAction(userData, actionType, target)
+            finally:
+                lines, self.logCapture.lines = self.logCapture.lines, None
+            userData = response['userData']
+            steps.append({"type": actionType, "target": target, "status": userData.get('status'), "logs": lines})
+            if userData.get('status') != prevStatus and i < len(actions) - 1:
+                stoppedAt = i
+                break
+        if response is None: response = self.getGameResponse(userData)
+        response['steps'] = steps
+        response['stoppedAt'] = stoppedAt
+        return response
+
     def processItemUsage(self, userData, itemKey):
         if itemKey not in userData['inventory']: return self.getGameResponse(userData)
         base_key = self.getBaseKey(itemKey)
@@ -319,19 +437,19 @@ class GameEngine:
         
         if base_key == 'first_aid_kit':
              userData['hp'] = min(userData['hp'] + item.get('heal', 80), userData['maxHp'])
-             userData['inventory'].remove(itemKey)
+             self.removeItem(userData, itemKey)
              msg = self.getMsg('item', 'use_first_aid', heal=item.get('heal', 80))
         elif item['type'] == 'consumable':
             userData['hp'] = min(userData['hp'] + item.get('heal', 0), userData['maxHp'])
-            userData['inventory'].remove(itemKey)
+            self.removeItem(userData, itemKey)
             msg = self.getMsg('item', 'use_consumable', name=item['name'], heal=item.get('heal', 0))
         elif item['type'] == 'weapon':
             currentWeapon = userData['equipment']['weapon']
             if currentWeapon == itemKey: msg = self.getMsg('item', 'already_equipped')
             else:
-                if currentWeapon: userData['inventory'].append(currentWeapon)
+                if currentWeapon: self.addItem(userData, currentWeapon)
                 userData['equipment']['weapon'], msg = itemKey, self.getMsg('item', 'equip_weapon', name=item['name'], power=item['power'])
-                userData['inventory'].remove(itemKey)
+                self.removeItem(userData, itemKey)
         elif item['type'] == 'important': 
             msg = self.getMsg('info', 'important_desc', name=item['name'])
         
@@ -341,7 +459,7 @@ class GameEngine:
     def processItemUnequip(self, userData, itemKey):
         if userData['equipment'].get('weapon') == itemKey:
             userData['equipment']['weapon'] = None
-            userData['inventory'].append(itemKey)
+            self.addItem(userData, itemKey)
             base_key = self.getBaseKey(itemKey)
             msg = self.getMsg('item', 'unequip', name=self.items[base_key]['name'])
             self.addLog(userData, msg)
@@ -355,7 +473,7 @@ class GameEngine:
                 return self.getGameResponse(userData)
                 
             msg = self.getMsg('item', 'discard', name=self.items[base_key]['name'])
-            userData['inventory'].remove(itemKey)
+            self.removeItem(userData, itemKey)
             self.addLog(userData, msg)
         return self.getGameResponse(userData)
 
@@ -376,6 +494,7 @@ class GameEngine:
 
     def startCombat(self, userData, enemyId):
         e = self.enemies[enemyId]
+        metrics.inc('greycity_combats_started_total')
         userData['status'], userData['combatData'] = 'combat', {"id": enemyId, "name": e['name'], "hp": e['hp'], "maxHp": e['maxHp'], "attack": e['attack']}
 
     def processCombat(self, userData, actionType, target):
@@ -409,11 +528,35 @@ class GameEngine:
                 userData['hp'] -= e_dmg
                 message = self.getMsg('combat', 'run_fail') + self.getMsg('combat', 'run_fail_dmg', dmg=e_dmg)
                 
-        if userData['hp'] <= 0: userData['hp'], userData['status'], message = 0, 'dead', message + self.getMsg('combat', 'player_dead')
+        if userData['hp'] <= 0:
+            userData['hp'], userData['status'], message = 0, 'dead', message + self.getMsg('combat', 'player_dead')
+            metrics.inc('greycity_deaths_total')
         self.addLog(userData, message)
         return self.getGameResponse(userData)
 
     def addLog(self, userData, text):
         if text:
-            userData.setdefault('logs', []).append(text)
-            if len(userData['logs']) > 30: userData['logs'].pop(0)
\ No newline at end of file
+            logs = userData.setdefault('logs', [])
+            logs.append(text)
+            captured = getattr(self.logCapture, 'lines', None)
+            if captured is not None: captured.append(text)
+            if len(logs) > LOG_LIMIT + LOG_TRIM_BATCH: del logs[:-LOG_LIMIT]
+
+    def diffUserData(self, before, after):
+        """before -> after 로 바뀐 필드만 담은 다중 경로 업데이트(상대 경로)를 만든다."""
+        before = before or {}
+        delta = {}
+        for key in before.keys() - after.keys():
+            delta[key] = None
+        for key, val in after.items():
+            old = before.get(key)
+            if key in before and old == val: continue
+            if key in NESTED_DELTA_FIELDS and isinstance(old, dict) and isinstance(val, dict):
+                for sub in old.keys() - val.keys():
+                    delta[f"{key}/{sub}"] = None
+                for sub, subVal in val.items():
+                    if old.get(sub) != subVal or sub not in old:
+                        delta[f"{key}/{sub}"] = subVal
+            else:
+                delta[key] = val
+        return delta
\ No newline at end of file
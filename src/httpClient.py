@@ -0,0 +1,82 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """연속 실패가 threshold 번 쌓이면 cooldown 동안 호출을 즉시 거부한다.
+
+    cooldown 이 지나면 한 번의 시험 호출을 허용하고(half-open), 성공하면 닫힌다.
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.openedAt = None
+        self.trialInFlight = False
+        self.lock = threading.Lock()
+
+    def before(self):
+        with self.lock:
+            if self.openedAt is None: return
+            if time.time() - self.openedAt < self.cooldown or self.trialInFlight:
+                raise CircuitOpenError("upstream temporarily unavailable")
+            self.trialInFlight = True
+
+    def success(self):
+        with self.lock:
+            self.failures, self.openedAt, self.trialInFlight = 0, None, False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trialInFlight = False
+            if self.failures >= self.threshold or self.openedAt is not None:
+                self.openedAt = time.time()
+
+
+class HttpClient:
+    """외부 API 호출용 공유 클라이언트 (커넥션 풀 + 타임아웃 + 재시도 + 서킷 브레이커).
+
+    POST 는 연결 단계 실패만 재시도한다 (OAuth code 처럼 한 번만 쓸 수 있는 요청 보호).
+    """
+
+    def __init__(self, baseUrl, connectTimeout=3, readTimeout=10, retries=2,
+                 poolSize=20, breakerThreshold=5, breakerCooldown=30):
+        self.baseUrl = baseUrl.rstrip('/')
+        self.timeout = (connectTimeout, readTimeout)
+        self.breaker = CircuitBreaker(breakerThreshold, breakerCooldown)
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=0.2, status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET']), raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, **kwargs):
+        self.breaker.before()
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = self.session.request(method, f"{self.baseUrl}{path}", **kwargs)
+        except requests.RequestException:
+            self.breaker.failure()
+            raise
+        if response.status_code >= 500:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
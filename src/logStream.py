@@ -0,0 +1,121 @@
+import atexit
+import threading
+from collections import OrderedDict, deque
+from src.backgroundLoop import BackgroundLoop
+from src.storageBackend import generatePushKey
+
+class LogStream:
+    """유저별 append-only 게임 로그 (player_logs/{userId}/{pushKey} -> 문장).
+
+    - 로그는 플레이어 문서에 두지 않으며, 한 행동의 새 줄만 키 하나씩 추가 기록된다.
+    - 워커 메모리에는 유저마다 최근 limit 줄을 deque 링으로 둔다.
+    - 링에서 밀려난 줄은 trimBatch 개가 모이면 저장소에서도 한 번에 지운다.
+    - 응답에는 클라이언트가 마지막으로 받은 키 이후의 줄만 싣는다 (since).
+    - writeBehind 이면 기록을 모아 flush 때 한 번의 다중 경로 쓰기로 보낸다.
+    - 다른 워커가 쓴 줄은 since(refresh=True) (loadGame) 때 저장소에서 다시 읽어 합친다.
+    """
+
+    def __init__(self, fbManager, limit=30, trimBatch=10, maxUsers=1000, writeBehind=True, flushInterval=5):
+        self.fbManager = fbManager
+        self.limit = limit
+        self.trimBatch = trimBatch
+        self.maxUsers = maxUsers
+        self.writeBehind = writeBehind
+        # userId -> {"lines": deque[(key, text)], "trim": [정리할 키], "floor": 링에서 마지막으로 밀려난 키}
+        self.rings = OrderedDict()
+        self.pending = {}           # 'userId/key' -> text 또는 None(삭제)
+        self.lock = threading.RLock()
+        self.flushLock = threading.Lock()
+        self.flusher = BackgroundLoop('LogStream Flush', flushInterval, self.flush)
+        atexit.register(self.flush)
+
+    def ring(self, userId, refresh=False):
+        with self.lock:
+            ring = self.rings.get(userId)
+            if ring is not None and not refresh:
+                self.rings.move_to_end(userId)
+                return ring
+
+        # 최근 limit 줄 + 정리 대상이 될 수 있는 여분까지 읽는다
+        stored = self.fbManager.getPlayerLogs(userId, self.limit + self.trimBatch)
+        with self.lock:
+            prefix = f"{userId}/"
+            unflushed = {k[len(prefix):]: v for k, v in self.pending.items() if k.startswith(prefix)}
+            merged = dict(stored)
+            for key, text in unflushed.items():
+                if text is None: merged.pop(key, None)
+                else: merged[key] = text
+            keys = sorted(merged)
+            # limit 줄을 꽉 채워 읽었다면 그보다 오래된 줄이 있었을 수 있다
+            if len(keys) > self.limit: floor = keys[-self.limit - 1]
+            elif len(keys) == self.limit: floor = keys[0]
+            else: floor = None
+            ring = {"lines": deque(((k, merged[k]) for k in keys[-self.limit:]), maxlen=self.limit),
+                    "trim": keys[:-self.limit] if len(keys) > self.limit else [], "floor": floor}
+            self.rings[userId] = ring
+            self.rings.move_to_end(userId)
+            while len(self.rings) > self.maxUsers:
+                self.rings.popitem(last=False)
+            return ring
+
+    def append(self, userId, lines):
+        if not lines: return
+        ring = self.ring(userId)
+        writes = {}
+        with self.lock:
+            for text in lines:
+                key = generatePushKey()
+                if len(ring['lines']) == ring['lines'].maxlen:
+                    ring['floor'] = ring['lines'][0][0]
+                    ring['trim'].append(ring['floor'])
+                ring['lines'].append((key, text))
+                writes[f"{userId}/{key}"] = text
+            if len(ring['trim']) >= self.trimBatch:
+                for oldKey in ring['trim']:
+                    writes[f"{userId}/{oldKey}"] = None
+                ring['trim'] = []
+            if self.writeBehind:
+                self.pending.update(writes)
+        if self.writeBehind:
+            self._ensureFlusher()
+        elif not self.fbManager.updatePlayerLogs(writes):
+            with self.lock:
+                self.pending.update(writes)
+            self._ensureFlusher()
+
+    def since(self, userId, after=None, refresh=False):
+        """after 이후의 줄을 (줄 목록, 전체 교체 여부, 마지막 키) 로 돌려준다.
+
+        after 가 없거나 링에서 이미 밀려난 줄보다 앞서면 빠진 줄이 있으므로 링 전체를 교체용으로 준다.
+        """
+        ring = self.ring(userId, refresh=refresh)
+        with self.lock:
+            lines, floor = list(ring['lines']), ring['floor']
+        if not isinstance(after, str) or (floor is not None and after < floor):
+            return lines, True, (lines[-1][0] if lines else None)
+        newer = [line for line in lines if line[0] > after]
+        return newer, False, (newer[-1][0] if newer else after)
+
+    def discard(self, userId):
+        # 워커 메모리의 링과 아직 쓰지 않은 줄만 버린다 (저장소는 그대로)
+        with self.lock:
+            self.rings.pop(userId, None)
+            prefix = f"{userId}/"
+            for k in [k for k in self.pending if k.startswith(prefix)]:
+                del self.pending[k]
+
+    def clear(self, userId):
+        self.discard(userId)
+        self.fbManager.clearPlayerLogs(userId)
+
+    def flush(self):
+        with self.flushLock:
+            with self.lock:
+                writes, self.pending = self.pending, {}
+            if writes and not self.fbManager.updatePlayerLogs(writes):
+                with self.lock:
+                    for k, v in writes.items():
+                        self.pending.setdefault(k, v)
+
+    def _ensureFlusher(self):
+        self.flusher.ensureStarted()
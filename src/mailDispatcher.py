@@ -0,0 +1,105 @@
+import queue
+import smtplib
+import time
+from email.mime.text import MIMEText
+from src.backgroundLoop import BackgroundLoop
+
+class MailDispatcher:
+    """요청 스레드 밖에서 메일을 보내는 백그라운드 발송기.
+
+    - 대기열은 queueSize 로 제한되며, 가득 차면 enqueue 가 False 를 반환한다.
+    - 인증된 SMTP 연결 하나를 재사용하고, idleTimeout 동안 쓰이지 않으면 닫는다.
+    - 발송 실패 시 연결을 새로 열어 maxRetries 번까지 지수 백오프로 재시도한다.
+    host/port/useTls 를 바꾸면 로컬 스텁 SMTP 서버로도 그대로 테스트할 수 있다.
+    """
+
+    def __init__(self, host, port, username=None, password=None, useTls=True,
+                 queueSize=100, maxRetries=3, backoff=1.0, idleTimeout=60, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.useTls = useTls
+        self.maxRetries = maxRetries
+        self.backoff = backoff
+        self.idleTimeout = idleTimeout
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=queueSize)
+        self.server = None
+        self.lastUsed = 0
+        # processNext 가 큐에서 대기하므로 주기 없이 돈다
+        self.worker = BackgroundLoop('MailDispatcher', None, self.processNext)
+        self.metrics = {"queued": 0, "sent": 0, "failed": 0, "retries": 0, "dropped": 0,
+                        "connects": 0, "lastError": None, "lastSendMs": None}
+
+    def enqueue(self, sender, recipient, subject, htmlContent):
+        msg = MIMEText(htmlContent, 'html', 'utf-8')
+        msg['Subject'] = subject
+        msg['From'] = sender
+        msg['To'] = recipient
+        try:
+            self.queue.put_nowait((sender, recipient, msg.as_string()))
+        except queue.Full:
+            self.metrics['dropped'] += 1
+            return False
+        self.metrics['queued'] += 1
+        self.ensureWorker()
+        return True
+
+    def getStats(self):
+        return dict(self.metrics, queueDepth=self.queue.qsize(), connected=self.server is not None)
+
+    def ensureWorker(self):
+        self.worker.ensureStarted()
+
+    def processNext(self):
+        try:
+            job = self.queue.get(timeout=self.idleTimeout)
+        except queue.Empty:
+            self.disconnect()
+            return
+        try:
+            self.deliver(*job)
+        finally:
+            self.queue.task_done()
+
+    def deliver(self, sender, recipient, payload):
+        for attempt in range(self.maxRetries + 1):
+            try:
+                started = time.time()
+                self.connection().sendmail(sender, recipient, payload)
+                self.lastUsed = time.time()
+                self.metrics['sent'] += 1
+                self.metrics['lastSendMs'] = int((self.lastUsed - started) * 1000)
+                return True
+            except Exception as e:
+                self.metrics['lastError'] = str(e)
+                self.disconnect()
+                if attempt < self.maxRetries:
+                    self.metrics['retries'] += 1
+                    time.sleep(self.backoff * (2 ** attempt))
+        self.metrics['failed'] += 1
+        print(f"Email error: {self.metrics['lastError']}")
+        return False
+
+    def connection(self):
+        if self.server is not None and time.time() - self.lastUsed > self.idleTimeout:
+            self.disconnect()
+        if self.server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.useTls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+            self.server = server
+            self.lastUsed = time.time()
+            self.metrics['connects'] += 1
+        return self.server
+
+    def disconnect(self):
+        if self.server is None: return
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+        self.server = None
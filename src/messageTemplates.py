@@ -0,0 +1,114 @@
+import random
+import string
+
+# getMsg 호출부가 넘기는 인자 목록. system.json 의 각 문구는 여기 선언된
+# 이름만 placeholder 로 사용할 수 있으며, 로딩 시점에 검증된다.
+MESSAGE_PARAMS = {
+    ('system', 'welcome'): (),
+    ('system', 'level_up'): ('level',),
+    ('error', 'locked'): ('keyName',),
+    ('error', 'no_fragment'): ('count',),
+    ('error', 'no_kit'): (),
+    ('error', 'cannot_discard'): (),
+    ('error', 'cannot_reset'): (),
+    ('error', 'upgrade_fail'): (),
+    ('info', 'revive_success'): ('hp',),
+    ('info', 'reset_revive'): (),
+    ('info', 'important_desc'): ('name',),
+    ('info', 'unlock_door'): ('keyName',),
+    ('info', 'upgrade_success'): ('stat',),
+    ('info', 'upgrades_atk'): (),
+    ('info', 'upgrades_mhp'): (),
+    ('info', 'upgrades_ivd'): (),
+    ('warning', 'boss_appear'): ('name',),
+    ('move', 'success'): ('name',),
+    ('move', 'fail'): (),
+    ('search', 'enemy_found'): ('name',),
+    ('search', 'item_found'): ('name',),
+    ('search', 'fragment_found'): ('amount',),
+    ('search', 'note_found'): ('title',),
+    ('search', 'empty'): (),
+    ('item', 'use_consumable'): ('name', 'heal'),
+    ('item', 'use_first_aid'): ('heal',),
+    ('item', 'equip_weapon'): ('name', 'power'),
+    ('item', 'already_equipped'): (),
+    ('item', 'discard'): ('name',),
+    ('item', 'unequip'): ('name',),
+    ('item', 'disassemble_weapon'): ('weaponName', 'matName'),
+    ('item', 'upgrade_weapon'): ('weaponName', 'level'),
+    ('combat', 'spawn'): ('name',),
+    ('combat', 'player_attack'): ('name', 'dmg', 'enemy_hp', 'enemy_max_hp'),
+    ('combat', 'enemy_attack'): ('name', 'dmg'),
+    ('combat', 'player_evade'): (),
+    ('combat', 'enemy_dead'): ('name', 'exp'),
+    ('combat', 'fragment_drop'): ('count',),
+    ('combat', 'run_success'): (),
+    ('combat', 'run_fail'): (),
+    ('combat', 'run_fail_dmg'): ('dmg',),
+    ('combat', 'player_dead'): (),
+}
+
+class MessageTemplate:
+    """미리 분해된 문구. render 는 문자열 조각과 인자를 이어붙이기만 한다."""
+
+    def __init__(self, text):
+        self.text = text
+        self.parts = []
+        self.fields = set()
+        for literal, field, spec, conv in string.Formatter().parse(text):
+            if literal:
+                self.parts.append((literal, None))
+            if field is not None:
+                if not field.isidentifier() or spec or conv:
+                    raise ValueError(f"unsupported placeholder '{{{field}}}' in: {text}")
+                self.parts.append((None, field))
+                self.fields.add(field)
+        self.parts = tuple(self.parts)
+        self.static = ''.join(literal for literal, _ in self.parts) if not self.fields else None
+
+    def render(self, kwargs):
+        if self.static is not None: return self.static
+        return ''.join(literal if field is None else str(kwargs[field]) for literal, field in self.parts)
+
+
+class MessageGroup:
+    def __init__(self, templates):
+        self.templates = tuple(templates)
+
+    def render(self, kwargs):
+        if len(self.templates) == 1: return self.templates[0].render(kwargs)
+        return random.choice(self.templates).render(kwargs)
+
+
+def compileMessages(systemMsgs):
+    """system.json 을 (category, key) -> MessageGroup 으로 컴파일한다.
+
+    누락된 키, 잘못된 placeholder 는 모두 모아 ValueError 로 보고한다.
+    """
+    compiled, problems = {}, []
+    for category, entries in (systemMsgs or {}).items():
+        for key, texts in entries.items():
+            if not isinstance(texts, list) or not texts:
+                problems.append(f"{category}.{key}: expected a non-empty list of strings")
+                continue
+            templates = []
+            for text in texts:
+                try:
+                    templates.append(MessageTemplate(text))
+                except ValueError as e:
+                    problems.append(f"{category}.{key}: {e}")
+            compiled[(category, key)] = MessageGroup(templates)
+
+    for (category, key), params in MESSAGE_PARAMS.items():
+        group = compiled.get((category, key))
+        if group is None:
+            problems.append(f"{category}.{key}: missing from system.json")
+            continue
+        for template in group.templates:
+            unknown = template.fields - set(params)
+            if unknown:
+                problems.append(f"{category}.{key}: unknown placeholder(s) {sorted(unknown)}")
+
+    if problems:
+        raise ValueError("Invalid system.json:\n  " + "\n  ".join(problems))
+    return compiled
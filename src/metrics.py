@@ -0,0 +1,312 @@
+import functools
+import glob
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from src.backgroundLoop import BackgroundLoop
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 지연(초) / 크기(바이트) 히스토그램 버킷
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# 이름 -> (타입, 설명). 여기 등록된 지표만 기록/노출된다.
+METRICS = {
+    'greycity_http_request_seconds': ('histogram', "HTTP request latency by route"),
+    'greycity_http_response_bytes': ('histogram', "HTTP response body size by route"),
+    'greycity_http_requests_total': ('counter', "HTTP requests by route and status"),
+    'greycity_db_method_seconds': ('histogram', "FirebaseManager method latency"),
+    'greycity_db_method_errors_total': ('counter', "FirebaseManager method calls that hit a storage error"),
+    'greycity_storage_seconds': ('histogram', "Storage backend call latency by operation"),
+    'greycity_storage_payload_bytes': ('histogram', "Storage backend payload size by operation (sampled calls)"),
+    'greycity_storage_errors_total': ('counter', "Storage backend errors by operation and calling method"),
+    'greycity_write_conflicts_total': ('counter', "Player document writes rejected by a revision check, by outcome"),
+    'greycity_actions_total': ('counter', "Game actions processed by type"),
+    'greycity_combats_started_total': ('counter', "Combats started"),
+    'greycity_deaths_total': ('counter', "Player deaths"),
+    'greycity_level_ups_total': ('counter', "Player level ups"),
+}
+
+class Metrics:
+    """워커 단위 카운터/히스토그램 저장소.
+
+    dirPath 가 지정되면 각 워커가 자기 스냅샷을 `{dirPath}/{pid}-{시작 nonce}.json` 으로 주기적으로 기록하고,
+    render 는 디렉터리의 모든 스냅샷을 합산한다. 그래서 gunicorn 워커 여럿 중 어느 워커가
+    /metrics 요청을 받아도 같은 합계가 나온다. 파일 이름에 nonce 가 있으므로 같은 pid 를 다시 받은
+    새 워커가 그 파일을 덮어쓰지 않는다. 종료된 워커의 파일은 collect 때 ARCHIVE_FILE 하나로 합친 뒤 지워
+    카운터는 줄어들지 않고 디렉터리도 재시작마다 늘어나지 않는다 (같은 호스트의 워커끼리 쓰는 디렉터리 기준).
+    """
+
+    ARCHIVE_FILE = 'archive.json'
+
+    def __init__(self):
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.buckets = {}     # name -> buckets
+        self.lock = threading.Lock()
+        self.dirPath = None
+        self.snapshotName = None  # (pid, 파일 이름)
+        self.payloadSample = 0.05
+        self.flusher = BackgroundLoop('Metrics Flush', 5, self.flush, onFork=self.dropInherited)
+        self.local = threading.local()
+
+    def configure(self, dirPath=None, flushInterval=5, payloadSample=0.05):
+        self.dirPath = dirPath
+        self.flusher.interval = flushInterval
+        self.payloadSample = payloadSample
+        if dirPath: os.makedirs(dirPath, exist_ok=True)
+
+    @staticmethod
+    def labelKey(labels):
+        return tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, self.labelKey(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.ensureFlusher()
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, self.labelKey(labels))
+        with self.lock:
+            self.buckets.setdefault(name, buckets)
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[i] += 1
+                    break
+            hist[-2] += value
+            hist[-1] += 1
+        self.ensureFlusher()
+
+    # --- 워커 간 공유 ---
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [[name, list(labels), v] for (name, labels), v in self.counters.items()],
+                "histograms": [[name, list(labels), list(h)] for (name, labels), h in self.histograms.items()],
+                "buckets": {name: list(b) for name, b in self.buckets.items()}
+            }
+
+    def flush(self):
+        if not self.dirPath: return
+        path = os.path.join(self.dirPath, self.snapshotFileName())
+        tmpPath = f"{path}.tmp"
+        try:
+            with open(tmpPath, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmpPath, path)
+        except Exception as e:
+            print(f"Metrics Flush Error: {e}")
+
+    def snapshotFileName(self):
+        # 프로세스(fork 된 워커 포함)마다 한 번 정하는 파일 이름
+        pid = os.getpid()
+        if self.snapshotName is None or self.snapshotName[0] != pid:
+            self.snapshotName = (pid, f"{pid}-{int(time.time() * 1000):x}-{os.urandom(3).hex()}.json")
+        return self.snapshotName[1]
+
+    def ensureFlusher(self):
+        if self.dirPath: self.flusher.ensureStarted()
+
+    def dropInherited(self):
+        # 부모 프로세스 값은 부모 파일에 이미 있으므로 fork 로 복사된 값은 버린다
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def collect(self):
+        if not self.dirPath: return [self.snapshot()]
+        self.flush()
+        self.compact()
+        snapshots = {}
+        for path in glob.glob(os.path.join(self.dirPath, '*.json')):
+            snap = readSnapshot(path)
+            if snap is not None: snapshots[os.path.basename(path)] = snap
+        # 합쳐진 뒤 아직 지워지지 않은 파일은 보관 파일에 이미 들어 있다
+        merged = set(snapshots.get(self.ARCHIVE_FILE, {}).get('merged', ()))
+        return [snap for name, snap in snapshots.items() if name not in merged]
+
+    def compact(self):
+        # 종료된 워커의 스냅샷을 보관 파일에 더하고 지운다. 동시에 한 워커만 하도록 잠금 파일을 쓴다
+        if fcntl is None: return
+        try:
+            with open(os.path.join(self.dirPath, '.compact.lock'), 'w') as lockFile:
+                try:
+                    fcntl.flock(lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return  # 다른 워커가 정리 중
+                archivePath = os.path.join(self.dirPath, self.ARCHIVE_FILE)
+                archive = readSnapshot(archivePath) or {}
+                # 지난번에 합쳤지만 지우기 전에 멈춘 파일은 다시 더하지 않고 지우기만 한다
+                for name in archive.get('merged', ()):
+                    removeFile(os.path.join(self.dirPath, name))
+                dead = {}
+                for path in glob.glob(os.path.join(self.dirPath, '*.json')):
+                    pid = os.path.basename(path).split('-')[0]
+                    if pid.isdigit() and int(pid) != os.getpid() and not processAlive(int(pid)):
+                        snap = readSnapshot(path)
+                        if snap is not None: dead[os.path.basename(path)] = snap
+                if not dead: return
+                merged = mergeSnapshots([archive] + list(dead.values()) if archive else list(dead.values()))
+                merged['merged'] = sorted(dead)
+                tmpPath = f"{archivePath}.tmp"
+                with open(tmpPath, 'w') as f:
+                    json.dump(merged, f)
+                os.replace(tmpPath, archivePath)
+                for name in dead:
+                    removeFile(os.path.join(self.dirPath, name))
+        except Exception as e:
+            print(f"Metrics Compact Error: {e}")
+
+    # --- Prometheus text format ---
+
+    def render(self):
+        counters, histograms, buckets = sumSnapshots(self.collect())
+        lines = []
+        for name, (kind, helpText) in METRICS.items():
+            lines.append(f"# HELP {name} {helpText}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name: lines.append(f"{name}{formatLabels(labels)} {formatValue(value)}")
+                continue
+            for (n, labels), hist in sorted(histograms.items()):
+                if n != name: continue
+                cumulative = 0
+                for bound, count in zip(buckets.get(name, ()), hist):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{formatLabels(labels + (('le', formatValue(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{formatLabels(labels + (('le', '+Inf'),))} {hist[-1]}")
+                lines.append(f"{name}_sum{formatLabels(labels)} {formatValue(hist[-2])}")
+                lines.append(f"{name}_count{formatLabels(labels)} {hist[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def sumSnapshots(snapshots):
+    # 스냅샷 목록을 (counters, histograms, buckets) 합계로
+    counters, histograms, buckets = {}, {}, {}
+    for snap in snapshots:
+        buckets.update({name: tuple(b) for name, b in snap['buckets'].items()})
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, hist in snap['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [0] * len(hist))
+            for i, v in enumerate(hist):
+                merged[i] += v
+    return counters, histograms, buckets
+
+def mergeSnapshots(snapshots):
+    # 합계를 다시 스냅샷 파일 형식으로
+    counters, histograms, buckets = sumSnapshots(snapshots)
+    return {
+        "counters": [[name, [list(l) for l in labels], v] for (name, labels), v in counters.items()],
+        "histograms": [[name, [list(l) for l in labels], h] for (name, labels), h in histograms.items()],
+        "buckets": {name: list(b) for name, b in buckets.items()}
+    }
+
+def readSnapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def removeFile(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def processAlive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 다른 사용자의 프로세스가 같은 pid 를 쓰는 중
+    return True
+
+def formatLabels(labels):
+    if not labels: return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+def formatValue(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def payloadSize(value):
+    if value is None: return 0
+    return len(json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str))
+
+
+# 프로세스 전역 레지스트리
+registry = Metrics()
+
+
+class InstrumentedBackend:
+    """저장소 호출마다 지연/페이로드 크기/오류를 기록하는 래퍼. 오류는 그대로 다시 던진다."""
+
+    OPS = ('get', 'set', 'update', 'delete', 'push', 'pushMany', 'list', 'query', 'compareAndUpdate')
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name not in self.OPS: return attr
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                registry.local.errors = getattr(registry.local, 'errors', 0) + 1
+                registry.inc('greycity_storage_errors_total',
+                             {"op": name, "method": getattr(registry.local, 'method', None) or 'unknown'})
+                raise
+            finally:
+                registry.observe('greycity_storage_seconds', time.perf_counter() - started, {"op": name})
+            # 크기 계산은 결과를 다시 직렬화하므로 일부 호출만 표본으로 잰다
+            if random.random() < registry.payloadSample:
+                payload = result if name in ('get', 'query') else (args[-1] if len(args) > 1 else None)
+                registry.observe('greycity_storage_payload_bytes', payloadSize(payload), {"op": name}, SIZE_BUCKETS)
+            return result
+        return call
+
+
+def instrumentMethods(cls):
+    """클래스의 공개 메서드마다 지연 시간과, 내부에서 삼켜진 저장소 오류 여부를 기록한다."""
+    for attrName, attr in list(vars(cls).items()):
+        if attrName.startswith('_') or not inspect.isfunction(attr): continue
+        setattr(cls, attrName, timedMethod(attr))
+    return cls
+
+def timedMethod(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        local = registry.local
+        outer = getattr(local, 'method', None)
+        errorsBefore = getattr(local, 'errors', 0)
+        local.method = fn.__name__
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            local.method = outer
+            registry.observe('greycity_db_method_seconds', time.perf_counter() - started, {"method": fn.__name__})
+            # 메서드가 예외를 잡아 print 로 끝내더라도 저장소 래퍼가 올린 local.errors 로 실패를 센다
+            if getattr(local, 'errors', 0) > errorsBefore:
+                registry.inc('greycity_db_method_errors_total', {"method": fn.__name__})
+    return wrapper
@@ -0,0 +1,123 @@
+import uuid
+
+# 플레이어 문서 스키마 버전. 새 마이그레이션을 추가하면 함께 올린다.
+SCHEMA_VERSION = 2
+
+
+def rekeyWeapon(userData, oldKey):
+    new_key = f"{oldKey}:{uuid.uuid4().hex[:8]}"
+    if oldKey in userData.get('weapon_levels', {}):
+        userData['weapon_levels'][new_key] = userData['weapon_levels'].pop(oldKey)
+    return new_key
+
+def migrateUniqueWeaponKeys(engine, userData):
+    # v1: 무기를 'base:uuid' 키로 구분 (강화 수치가 개체마다 따로 붙도록)
+    inv = userData.get('inventory')
+    if isinstance(inv, list):
+        userData['inventory'] = [
+            rekeyWeapon(userData, k) if k and ':' not in k and engine.items.get(k, {}).get('type') == 'weapon' else k
+            for k in inv
+        ]
+    eq_wpn = userData.get('equipment', {}).get('weapon')
+    if eq_wpn and ':' not in eq_wpn and eq_wpn in engine.items:
+        userData['equipment']['weapon'] = rekeyWeapon(userData, eq_wpn)
+
+def migrateCountedInventory(engine, userData):
+    # v2: 인벤토리 리스트 -> {itemKey: 개수}
+    inv = userData.get('inventory')
+    if isinstance(inv, list):
+        counted = {}
+        for itemKey in inv:
+            if itemKey: counted[itemKey] = counted.get(itemKey, 0) + 1
+        userData['inventory'] = counted
+
+# (적용 후 버전, 함수) 순서대로 실행된다
+MIGRATIONS = [
+    (1, migrateUniqueWeaponKeys),
+    (2, migrateCountedInventory),
+]
+
+
+def migrateUserData(engine, userData):
+    """schemaVersion 이후의 마이그레이션을 순서대로 적용하고 버전을 기록한다.
+
+    반환값은 문서가 변경되었는지 여부.
+    """
+    version = userData.get('schemaVersion', 0)
+    if version >= SCHEMA_VERSION: return False
+    for target, step in MIGRATIONS:
+        if version < target:
+            step(engine, userData)
+            version = target
+    userData['schemaVersion'] = SCHEMA_VERSION
+    return True
+
+
+def iterUserBatches(backend, batchSize=200):
+    # users 를 키 순 범위 쿼리로 batchSize 명씩 읽는다 (배치마다 저장소 호출 한 번)
+    after = ''
+    while True:
+        batch = backend.query('users', after=after, limit=batchSize)
+        if not batch: return
+        yield batch
+        if len(batch) < batchSize: return
+        after = batch[-1][0]
+
+
+def migrateAllUsers(fbManager, engine, batchSize=200):
+    """저장된 모든 유저 문서를 오프라인으로 최신 스키마로 올린다.
+
+    유저 문서를 batchSize 명씩 범위 쿼리로 읽고, 배치마다 한 번의 다중 경로 쓰기로 기록한다.
+    """
+    migrated = scanned = 0
+    for batch in iterUserBatches(fbManager.backend, batchSize):
+        updates = {}
+        for userId, userData in batch:
+            if not isinstance(userData, dict): continue
+            engine.fillDefaults(userData)
+            if migrateUserData(engine, userData):
+                updates[f'users/{userId}'] = userData
+                updates[f'user_index/{userId}'] = fbManager.buildUserIndexEntry(userData)
+        if updates:
+            fbManager.backend.update('', updates)
+            migrated += len(updates) // 2
+        scanned += len(batch)
+        print(f">>> Migrated {migrated} / {scanned} users")
+    return migrated
+
+
+def backfillUserIndex(fbManager, batchSize=200):
+    """user_index 항목이 없거나 문서와 다른 유저의 항목을 채운다 (색인 도입 이전 계정, 부분 항목).
+
+    항목의 존재 여부로 판단하지 않고 배치마다 문서와 색인을 같은 키 범위에서 읽어 비교한다.
+    """
+    backend, after, fixed = fbManager.backend, '', 0
+    for batch in iterUserBatches(backend, batchSize):
+        # 색인 키는 유저 키의 부분집합이므로 같은 시작점에서 batchSize 개를 읽으면 이 배치 범위를 모두 덮는다
+        index = dict(backend.query('user_index', after=after, limit=batchSize))
+        updates = {}
+        for userId, userData in batch:
+            if not isinstance(userData, dict): continue
+            entry = fbManager.buildUserIndexEntry(userData)
+            if index.get(userId) != entry:
+                updates[f'user_index/{userId}'] = entry or None
+        if updates:
+            backend.update('', updates)
+            fixed += len(updates)
+        after = batch[-1][0]
+    print(f">>> Backfilled {fixed} user_index entries")
+    return fixed
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.firebaseManager import FirebaseManager
+    from src.gameEngine import GameEngine
+
+    parser = argparse.ArgumentParser(description="GREY CITY 유저 문서 일괄 마이그레이션 + user_index / user_auth_index 보정")
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+    fbManager = FirebaseManager()
+    migrateAllUsers(fbManager, GameEngine(), batchSize=args.batch)
+    backfillUserIndex(fbManager, batchSize=args.batch)
+    print(f">>> Backfilled {fbManager.rebuildAuthIndex()} user_auth_index entries")
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HasherBusyError(Exception):
+    pass
+
+def createExecutor(workers):
+    # gevent 워커에서는 threading 이 그린렛으로 바뀌므로, 해시 계산은 gevent 의 실제 OS 스레드 풀에서 돌려
+    # 계산 중에도 허브(다른 요청들)가 멈추지 않게 한다
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+            return NativeThreadPoolExecutor(max_workers=workers)
+    except ImportError:
+        pass
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+
+class PasswordHasher:
+    """비밀번호 해시/검증 전용 워커 풀.
+
+    - 요청 스레드 대신 workers 개의 전용 스레드에서 해시를 계산한다
+      (hashlib 의 scrypt/pbkdf2 는 계산 중 GIL 을 놓는다).
+    - 대기 + 실행 중 작업이 maxPending 을 넘으면 즉시 HasherBusyError 를 던져
+      로그인 폭주가 게임 요청 스레드를 잡아먹지 못하게 한다.
+    - method 는 werkzeug 형식 ("scrypt", "pbkdf2:sha256:600000" 등).
+    """
+
+    def __init__(self, method='scrypt', workers=2, maxPending=32):
+        self.method = method
+        self.executor = createExecutor(workers)
+        self.slots = threading.BoundedSemaphore(maxPending)
+        # 저장된 해시의 'method$' 접두부와 비교하기 위해 기본 인자가 채워진 형태를 구해둔다
+        self.methodTag = generate_password_hash('', method=method).split('$', 1)[0]
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusyError("password hasher queue is full")
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def hash(self, password):
+        return self.submit(generate_password_hash, password, self.method)
+
+    def verify(self, pwHash, password):
+        return self.submit(check_password_hash, pwHash or '', password)
+
+    def needsUpgrade(self, pwHash):
+        return bool(pwHash) and pwHash.split('$', 1)[0] != self.methodTag
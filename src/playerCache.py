@@ -0,0 +1,187 @@
+import atexit
+import copy
+import threading
+import time
+from collections import OrderedDict
+from src.backgroundLoop import BackgroundLoop
+from src.metrics import registry as metrics
+from src.storageBackend import revisionNumber
+
+class PlayerCache:
+    """워커 프로세스 단위 플레이어 상태 캐시 (TTL/LRU + write-behind).
+
+    handleAction 은 캐시된 문서를 읽고 변경분을 dirty 로 표시만 한다.
+    dirty 문서는 주기적으로, 로그아웃 시, 프로세스 종료 시 한 번에 기록된다.
+    관리자 경로는 DB 를 수정하기 전에 evict()/discard() 로 캐시를 비워야 한다.
+    다른 워커의 캐시는 무효화되지 않으므로 그쪽의 최대 지연은 ttl 로 제한된다.
+
+    각 항목은 마지막으로 저장소에 반영된 문서(persisted)를 함께 보관하며,
+    flush 시 diffFn(persisted, data) 로 만든 변경 필드만 기록한다.
+
+    모든 기록은 문서의 revision 을 비교하는 CAS 로 수행된다. writeBehind=False(기본)이면 save() 가
+    즉시 기록하고 충돌 여부를 돌려주므로, 호출자가 최신 문서로 행동을 다시 처리할 수 있다.
+    writeBehind=True 는 단일 워커 전용이며, 그래도 flush 가 충돌하면 항목을 비우고
+    takeConflict() 로 호출자가 다음 요청에서 충돌을 알릴 수 있게 한다.
+    """
+
+    def __init__(self, fbManager, diffFn, ttl=30, maxSize=1000, flushInterval=5, writeBehind=False):
+        self.fbManager = fbManager
+        self.diffFn = diffFn
+        self.writeBehind = writeBehind
+        self.ttl = ttl
+        self.maxSize = maxSize
+        self.entries = OrderedDict()  # userId -> {"data", "persisted", "loadedAt", "dirty"}
+        self.conflicts = set()        # write-behind 기록이 충돌해 변경분이 버려진 유저
+        self.lock = threading.RLock()
+        self.flushLock = threading.Lock()
+        self.flusher = BackgroundLoop('PlayerCache Flush', flushInterval, self.flush)
+        atexit.register(self.flush)
+
+    def get(self, userId):
+        with self.lock:
+            entry = self.entries.get(userId)
+            expiredDirty = entry and entry['dirty'] and time.time() - entry['loadedAt'] > self.ttl
+        if expiredDirty:
+            # 만료된 항목의 변경분은 잠금 밖에서 먼저 기록한다
+            self.flush(userId)
+        with self.lock:
+            entry = self.entries.get(userId)
+            # 저장소 오류로 아직 dirty 라면 확정된 변경분을 잃지 않도록 만료되었어도 계속 사용한다
+            if entry and not entry['dirty'] and time.time() - entry['loadedAt'] > self.ttl:
+                del self.entries[userId]
+                entry = None
+            if entry:
+                self.entries.move_to_end(userId)
+                return copy.deepcopy(entry['data'])
+
+        data = self.fbManager.getUserData(userId)
+        if data is None: return None
+        with self.lock:
+            # 로딩 중 다른 스레드가 먼저 채웠다면 그쪽(더 최신)을 우선한다
+            if userId not in self.entries:
+                self._store(userId, data, dirty=False, persisted=data)
+            return copy.deepcopy(self.entries[userId]['data'])
+
+    def put(self, userId, data):
+        with self.lock:
+            entry = self.entries.get(userId)
+            if entry:
+                entry['data'], entry['dirty'] = data, True
+                self.entries.move_to_end(userId)
+            else:
+                self._store(userId, data, dirty=True, persisted=None)
+        self._ensureFlusher()
+
+    def save(self, userId, data):
+        """행동 결과를 반영한다. False 는 다른 쓰기와 충돌했다는 뜻이며 캐시 항목은 비워진다."""
+        if self.writeBehind:
+            self.put(userId, data)
+            return True
+        with self.lock:
+            entry = self.entries.get(userId)
+            persisted = entry['persisted'] if entry else None
+        result = self._write(userId, persisted, data)
+        with self.lock:
+            if result is False:
+                self.entries.pop(userId, None)
+                return False
+            if result:
+                self._store(userId, data, dirty=False, persisted=data)
+            else:
+                # 저장소 오류: dirty 로 남겨 flusher 가 다시 시도
+                self._store(userId, data, dirty=True, persisted=persisted)
+                self._ensureFlusher()
+            return True
+
+    def flush(self, userId=None):
+        # 쓰기 대상만 잠금 안에서 모으고, 네트워크 기록은 잠금 밖에서 수행한다
+        with self.flushLock:
+            with self.lock:
+                targets = [userId] if userId is not None else list(self.entries.keys())
+                pending = []
+                for uid in targets:
+                    entry = self.entries.get(uid)
+                    if entry and entry['dirty']:
+                        entry['dirty'] = False
+                        pending.append((uid, entry, entry['persisted'], entry['data']))
+            for uid, entry, persisted, data in pending:
+                result = self._write(uid, persisted, data)
+                with self.lock:
+                    if result and entry['persisted'] is persisted:
+                        entry['persisted'] = data
+                    elif result is False:
+                        self._dropStale(uid, entry)
+                    elif result is None:
+                        entry['dirty'] = True
+
+    def evict(self, userId):
+        # 대기 중인 변경분을 기록한 뒤 캐시에서 제거 (관리자 수정/로그아웃 전)
+        self.flush(userId)
+        with self.lock:
+            entry = self.entries.get(userId)
+            if entry is None: return
+            if entry['dirty']:
+                # 저장소 오류: 기록되지 않은 변경분을 버리지 않고 flusher 가 다시 시도하게 둔다
+                print(f"PlayerCache: evict of {userId} deferred (write failed)")
+                self._ensureFlusher()
+                return
+            del self.entries[userId]
+
+    def discard(self, userId):
+        # 기록 없이 제거 (계정 삭제/초기화처럼 캐시 내용이 무의미해질 때)
+        with self.lock:
+            self.entries.pop(userId, None)
+
+    def _store(self, userId, data, dirty, persisted, loadedAt=None):
+        self.entries[userId] = {"data": data, "persisted": persisted, "loadedAt": loadedAt or time.time(), "dirty": dirty}
+        self.entries.move_to_end(userId)
+        if len(self.entries) <= self.maxSize: return
+        # 잠금 안에서는 기록하지 않는다: 오래된 순으로 깨끗한 항목만 내보내고,
+        # dirty 항목은 flusher 가 기록해 깨끗해진 뒤에 내보낸다 (그동안 maxSize 를 잠시 넘을 수 있다)
+        for oldId in list(self.entries):
+            if len(self.entries) <= self.maxSize: return
+            if oldId != userId and not self.entries[oldId]['dirty']:
+                del self.entries[oldId]
+        self._ensureFlusher()
+
+    def takeConflict(self, userId):
+        # 이 유저의 write-behind 기록이 충돌로 버려졌는지 (한 번만 True)
+        with self.lock:
+            if userId not in self.conflicts: return False
+            self.conflicts.discard(userId)
+            return True
+
+    def _dropStale(self, userId, entry):
+        # 다른 워커가 먼저 기록한 문서 위에 계산된 변경분이므로 저장할 수 없다. 다음 요청에서 409 로 알린다
+        if self.entries.get(userId) is entry: del self.entries[userId]
+        entry['dirty'] = False
+        self.conflicts.add(userId)
+        metrics.inc('greycity_write_conflicts_total', {"outcome": "dropped"})
+        print(f"PlayerCache: stale write for {userId} dropped (revision conflict)")
+
+    def _write(self, userId, persisted, data):
+        # 반환: True(기록됨/변경 없음), False(revision 충돌), None(저장소 오류)
+        # 행동은 data 의 revision 시점 문서 위에서 계산되었으므로 그 값을 기대값으로 쓴다
+        expected = persisted.get('revision') if persisted is not None else data.get('revision')
+        if persisted is None:
+            # 저장소 상태를 모르는 경우에는 최상위 필드 전체를 기록
+            delta = {k: v for k, v in data.items() if k != 'revision'}
+        else:
+            delta = self.diffFn(persisted, data)
+            delta.pop('revision', None)
+        if not delta: return True
+        data['revision'] = revisionNumber(expected) + 1
+        return self.fbManager.casUserData(userId, expected, delta)
+
+    def _ensureFlusher(self):
+        self.flusher.ensureStarted()
+
+
+class LockStripes:
+    """userId 해시로 고르는 잠금 묶음. 같은 유저의 요청은 한 워커 안에서 차례로 처리된다."""
+
+    def __init__(self, count=64):
+        self.locks = [threading.Lock() for _ in range(count)]
+
+    def get(self, key):
+        return self.locks[hash(key) % len(self.locks)]
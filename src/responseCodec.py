@@ -0,0 +1,127 @@
+import gzip
+import threading
+from collections import OrderedDict
+from flask.json.provider import DefaultJSONProvider
+
+# 선택 의존성: 설치되어 있으면 사용하고, 없으면 표준 json / gzip 만 쓴다
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson 을 쓰는 Flask JSON 공급자 (없거나 처리할 수 없는 값이면 표준 json 으로 되돌아간다).
+
+    한글 문장이 대부분인 응답이므로 \\uXXXX 이스케이프를 끄고, 키 정렬도 하지 않는다.
+    """
+
+    ensure_ascii = False
+    sort_keys = False
+    compact = True
+
+    def orjsonOptions(self, indent=None):
+        # 날짜/데이터클래스는 Flask 기본 공급자와 같은 형식이 되도록 default 로 넘긴다
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent: option |= orjson.OPT_INDENT_2
+        if self.sort_keys: option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumpBytes(self, obj, **kwargs):
+        if orjson is not None and kwargs.keys() <= {'separators', 'indent'}:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self.orjsonOptions(kwargs.get('indent')))
+            except TypeError:
+                pass  # 64비트를 넘는 정수 등은 표준 json 으로
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpBytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # str 을 거치지 않고 바이트로 바로 응답 본문을 만든다
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self.dumpBytes(obj, indent=2)
+        else:
+            body = self.dumpBytes(obj, separators=(',', ':'))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+class ResponseCompressor:
+    """Accept-Encoding 에 따라 응답 본문을 br / gzip 으로 압축한다.
+
+    - minSize 미만, 스트리밍(SSE), 파일 전송, 이미 인코딩된 응답, 압축 대상이 아닌 mimetype 은 그대로 둔다.
+    - Cache-Control 이 immutable 인 응답(카탈로그 등)은 최고 압축률로 한 번만 압축해 (ETag, 인코딩) 별로 캐시한다.
+    """
+
+    MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css',
+                 'text/javascript', 'application/javascript')
+
+    def __init__(self, minSize=1024, level=6, algorithms=('br', 'gzip'), cacheSize=32):
+        self.minSize = minSize
+        self.level = level
+        self.algorithms = [a for a in algorithms if a == 'gzip' or (a == 'br' and brotli is not None)]
+        self.cacheSize = cacheSize
+        self.cache = OrderedDict()  # (etag, encoding) -> 압축된 본문
+        self.lock = threading.Lock()
+
+    def choose(self, acceptEncodings):
+        for encoding in self.algorithms:
+            if acceptEncodings.quality(encoding) > 0: return encoding
+        return None
+
+    def compress(self, data, encoding, best=False):
+        if encoding == 'br':
+            # 요청마다 압축하는 응답은 속도 우선 품질, 캐시할 응답은 최고 품질
+            return brotli.compress(data, quality=11 if best else min(self.level, 5))
+        return gzip.compress(data, compresslevel=9 if best else self.level, mtime=0)
+
+    def cachedCompress(self, etag, data, encoding):
+        key = (etag, encoding)
+        with self.lock:
+            body = self.cache.get(key)
+            if body is not None:
+                self.cache.move_to_end(key)
+                return body
+        body = self.compress(data, encoding, best=True)
+        with self.lock:
+            self.cache[key] = body
+            while len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
+        return body
+
+    def process(self, request, response):
+        if (response.is_streamed or response.direct_passthrough or response.status_code != 200
+                or 'Content-Encoding' in response.headers or response.mimetype not in self.MIMETYPES):
+            return response
+        if (response.calculate_content_length() or 0) < self.minSize:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose(request.accept_encodings)
+        if encoding is None: return response
+
+        data = response.get_data()
+        etag, weak = response.get_etag()
+        if etag and response.cache_control.immutable:
+            body = self.cachedCompress(etag, data, encoding)
+        else:
+            body = self.compress(data, encoding)
+        if len(body) >= len(data): return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # 인코딩마다 바이트가 달라지므로 ETag 는 약한 비교용으로 바꾼다
+        if etag and not weak: response.set_etag(etag, weak=True)
+        return response
@@ -1,20 +1,76 @@
-from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, Response, render_template, request, jsonify, session, redirect, url_for, stream_with_context, g
 from src.firebaseManager import FirebaseManager
-from src.gameEngine import GameEngine
+from src.gameEngine import GameEngine, LOG_LIMIT, LOG_TRIM_BATCH
+from src.playerCache import PlayerCache, LockStripes
+from src.logStream import LogStream
+from src.storageBackend import generatePushKey
+from src.eventHub import EventHub
+from src.mailDispatcher import MailDispatcher
+from src.httpClient import HttpClient, CircuitOpenError
+from src.passwordHasher import PasswordHasher, HasherBusyError
+from src.backgroundLoop import BackgroundLoop
+from src.metrics import registry as metrics, SIZE_BUCKETS
+from src.responseCodec import ResponseCompressor
 from config import Config
-import requests
 import random
 import string
-import smtplib
-from email.mime.text import MIMEText
 import time
 import re
 import html
+import json
+import queue
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 
 gameBP = Blueprint('gameBP', __name__)
+# 멀티 워커(gunicorn)에서는 METRICS_DIR 을 공유 디렉터리로 지정해야 /metrics 가 전체 합계를 보여준다
+metrics.configure(getattr(Config, 'METRICS_DIR', None), getattr(Config, 'METRICS_FLUSH_INTERVAL', 5),
+                  payloadSample=getattr(Config, 'METRICS_PAYLOAD_SAMPLE', 0.05))
 fbManager = FirebaseManager()
 gameEngine = GameEngine()
+# 기본은 행동마다 revision CAS 로 즉시 기록 (충돌은 재처리 또는 409).
+# True 로 켜는 write-behind 는 단일 워커 전용이다 (gunicorn.conf.py 가 여러 워커와 함께 쓰면 시작을 거부)
+WRITE_BEHIND = getattr(Config, 'PLAYER_WRITE_BEHIND', False)
+playerCache = PlayerCache(
+    fbManager,
+    gameEngine.diffUserData,
+    ttl=getattr(Config, 'PLAYER_CACHE_TTL', 30),
+    maxSize=getattr(Config, 'PLAYER_CACHE_SIZE', 1000),
+    flushInterval=getattr(Config, 'PLAYER_CACHE_FLUSH_INTERVAL', 5),
+    writeBehind=WRITE_BEHIND
+)
+logStream = LogStream(
+    fbManager,
+    limit=LOG_LIMIT,
+    trimBatch=LOG_TRIM_BATCH,
+    maxUsers=getattr(Config, 'PLAYER_CACHE_SIZE', 1000),
+    writeBehind=WRITE_BEHIND,
+    flushInterval=getattr(Config, 'PLAYER_CACHE_FLUSH_INTERVAL', 5)
+)
+userLocks = LockStripes(getattr(Config, 'USER_LOCK_STRIPES', 64))
+eventHub = EventHub(fbManager)
+mailDispatcher = MailDispatcher(
+    getattr(Config, 'SMTP_HOST', "smtp.gmail.com"),
+    getattr(Config, 'SMTP_PORT', 587),
+    username=getattr(Config, 'SMTP_EMAIL', None),
+    password=getattr(Config, 'SMTP_PASSWORD', None),
+    useTls=getattr(Config, 'SMTP_USE_TLS', True),
+    queueSize=getattr(Config, 'MAIL_QUEUE_SIZE', 100)
+)
+passwordHasher = PasswordHasher(
+    method=getattr(Config, 'PASSWORD_HASH_METHOD', 'scrypt'),
+    workers=getattr(Config, 'PASSWORD_HASH_WORKERS', 2),
+    maxPending=getattr(Config, 'PASSWORD_HASH_QUEUE', 32)
+)
+discordClient = HttpClient(
+    Config.DISCORD_API_BASE_URL,
+    connectTimeout=getattr(Config, 'HTTP_CONNECT_TIMEOUT', 3),
+    readTimeout=getattr(Config, 'HTTP_READ_TIMEOUT', 10)
+)
+compressor = ResponseCompressor(
+    minSize=getattr(Config, 'COMPRESS_MIN_SIZE', 1024),
+    level=getattr(Config, 'COMPRESS_LEVEL', 6),
+    algorithms=getattr(Config, 'COMPRESS_ALGORITHMS', ('br', 'gzip'))
+)
 
 # ==========================================
 # SECURITY MODULE: 입력값 검증 로직
@@ -75,16 +131,9 @@ def send_code():
             else:
                 html_content = Config.SendEmail.format(code=code)
 
-            msg = MIMEText(html_content, 'html', 'utf-8')
-            msg['Subject'] = "GREY CITY: ACCESS CODE"
-            msg['From'] = sender_email
-            msg['To'] = email
-
-            server = smtplib.SMTP("smtp.gmail.com", 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, email, msg.as_string())
-            server.quit()
+            # 실제 발송은 백그라운드 발송기가 담당하고, 요청은 대기열 등록 즉시 반환
+            if not mailDispatcher.enqueue(sender_email, email, "GREY CITY: ACCESS CODE", html_content):
+                return jsonify({"success": False, "msg": "메일 발송 대기열이 가득 찼습니다. 잠시 후 다시 시도하십시오."})
             return jsonify({"success": True, "msg": "보안 코드가 전송되었습니다. 이메일을 확인하십시오."})
         except Exception as e:
             print(f"Email error: {e}")
@@ -119,19 +168,25 @@ def register_local():
     if session.get('verification_code') != code or session.get('verification_email') != email:
         return jsonify({"success": False, "msg": "보안 코드가 일치하지 않거나 만료되었습니다."})
 
+    # 해시 계산과 중복 ID 조회를 겹쳐서 진행
+    try:
+        hash_future = passwordHasher.hash(password)
+    except HasherBusyError:
+        return jsonify({"success": False, "msg": "접속 요청이 많습니다. 잠시 후 다시 시도하십시오."}), 503
+
     if fbManager.getAuthData(username):
+        hash_future.cancel()
         return jsonify({"success": False, "msg": "이미 존재하는 생존자 ID입니다."})
 
     random_num = random.randrange(10**17, 10**18)
     new_user_id = f"gc-{random_num}"
 
-    pw_hash = generate_password_hash(password)
-    fbManager.registerUserAuth(username, pw_hash, new_user_id)
+    fbManager.registerUserAuth(username, hash_future.result(), new_user_id)
 
     userData = gameEngine.initNewPlayer()
     userData['username'] = username
     userData['email'] = email 
-    fbManager.setUserData(new_user_id, userData)
+    create_player(new_user_id, userData)
 
     session.pop('verification_code', None)
     session.pop('verification_email', None)
@@ -155,16 +210,25 @@ def login_local():
         return jsonify({"success": False, "msg": "존재하지 않는 생존자입니다."})
 
     userId = auth_data.get('userId')
+    stored_hash = auth_data.get('password', '')
+    try:
+        verify_future = passwordHasher.verify(stored_hash, password)
+    except HasherBusyError:
+        return jsonify({"success": False, "msg": "접속 요청이 많습니다. 잠시 후 다시 시도하십시오."}), 503
+
+    # 해시 검증이 워커에서 도는 동안 유저 문서를 읽어온다
+    playerCache.evict(userId)
     userData = fbManager.getUserData(userId)
-    
+
     if userData and userData.get('banned_until', 0) > time.time():
         remain = int((userData['banned_until'] - time.time()) / 86400) + 1
         return jsonify({"success": False, "msg": f"<br>시스템 접근이 차단되었습니다. (정지 해제까지 약 {remain}일)"})
 
-    if check_password_hash(auth_data.get('password', ''), password):
+    if verify_future.result():
+        if passwordHasher.needsUpgrade(stored_hash):
+            upgrade_hash_async(username, password)
         if userData and userData.get('force_logout'):
-            userData['force_logout'] = False
-            fbManager.setUserData(userId, userData)
+            fbManager.patchUserData(userId, {'force_logout': False})
 
         session['user_id'] = userId
         session['username'] = username
@@ -172,6 +236,32 @@ def login_local():
     else:
         return jsonify({"success": False, "msg": "암호 코드가 일치하지 않습니다."})
 
+# 해시 교체 기록은 해시 풀 스레드가 아니라 워커의 백그라운드 스레드가 맡는다 (해시 풀은 계산만 한다)
+hashUpgrades = queue.Queue(maxsize=getattr(Config, 'PASSWORD_HASH_QUEUE', 32))
+
+def write_hash_upgrade():
+    username, future = hashUpgrades.get()
+    try:
+        pwHash = future.result()
+    except CancelledError:
+        return
+    fbManager.updatePasswordHash(username, pwHash)
+
+hashUpgradeWriter = BackgroundLoop('Hash Upgrade Writer', None, write_hash_upgrade)
+
+def upgrade_hash_async(username, password):
+    # 설정된 비용보다 약한 해시는 로그인 성공 시 백그라운드에서 다시 계산해 교체한다
+    try:
+        future = passwordHasher.hash(password)
+    except HasherBusyError:
+        return  # 다음 로그인 때 다시 시도
+    try:
+        hashUpgrades.put_nowait((username, future))
+    except queue.Full:
+        future.cancel()
+        return
+    hashUpgradeWriter.ensureStarted()
+
 @gameBP.route('/login/discord')
 def login_discord():
     discord_auth_url = (
@@ -198,16 +288,17 @@ def callback():
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     
     try:
-        token_res = requests.post(f"{Config.DISCORD_API_BASE_URL}/oauth2/token", data=token_data, headers=headers)
+        token_res = discordClient.post("/oauth2/token", data=token_data, headers=headers)
         token_json = token_res.json()
         access_token = token_json.get('access_token')
 
-        user_res = requests.get(f"{Config.DISCORD_API_BASE_URL}/users/@me", headers={'Authorization': f"Bearer {access_token}"})
+        user_res = discordClient.get("/users/@me", headers={'Authorization': f"Bearer {access_token}"})
         user_data = user_res.json()
         
         userId = user_data['id']
         username = sanitize_input(user_data['username'])
         
+        playerCache.evict(userId)
         userData = fbManager.getUserData(userId)
         
         if userData and userData.get('banned_until', 0) > time.time():
@@ -215,18 +306,21 @@ def callback():
             return f"<script>alert('접근 차단: 계정이 정지되었습니다. (약 {remain}일 남음)'); window.location.href='/';</script>"
 
         if userData and userData.get('force_logout'):
-            userData['force_logout'] = False
-            fbManager.setUserData(userId, userData)
+            fbManager.patchUserData(userId, {'force_logout': False})
 
         session['user_id'] = userId
         session['username'] = username
 
         return redirect(url_for('gameBP.index'))
+    except CircuitOpenError:
+        return "<script>alert('Discord 인증 서버가 응답하지 않습니다. 잠시 후 다시 시도하십시오.'); window.location.href='/';</script>", 503
     except Exception as e:
         return f"Login Error: {str(e)}"
 
 @gameBP.route('/logout')
 def logout():
+    if 'user_id' in session:
+        playerCache.evict(session['user_id'])
     session.clear()
     return redirect(url_for('gameBP.index'))
 
@@ -236,23 +330,122 @@ def loadGame():
         return jsonify({"error": "Unauthorized"}), 401
 
     userId = session['user_id']
-    userData = fbManager.getUserData(userId)
+    userData = playerCache.get(userId)
     
     if not userData:
         userData = gameEngine.initNewPlayer()
         userData['username'] = session.get('username', 'Unknown')
-        fbManager.setUserData(userId, userData)
+        create_player(userId, userData)
     
     if userData.get('banned_until', 0) > time.time() or userData.get('force_logout'):
         if userData.get('force_logout'):
-            userData['force_logout'] = False
-            fbManager.setUserData(userId, userData)
+            fbManager.patchUserData(userId, {'force_logout': False})
+        playerCache.discard(userId)
         session.clear()
         return jsonify({"error": "Force Logout"}), 401
 
-    responsePayload = gameEngine.getGameResponse(userData)
+    if 'logs' in userData:
+        # 로그가 문서 안에 있던 구버전 플레이어: 첫 접속 때 로그 스트림으로 옮긴다
+        with userLocks.get(userId):
+            commit_player(userId, userData)
+
+    responsePayload = gameEngine.getGameResponse(gameEngine.validateUserData(userData))
+    attach_logs(userId, responsePayload, refresh=True)
     return jsonify(responsePayload)
 
+@gameBP.route('/api/catalog', methods=['GET'])
+def get_catalog():
+    # 정적 게임 데이터(지역/아이템/적)는 내용 해시로 버전이 매겨지므로 클라이언트가 영구 캐시할 수 있음
+    data = gameEngine.current  # 버전과 본문을 같은 스냅샷에서 읽는다
+    version = data.catalogVersion
+    requested = request.args.get('v')
+    if requested is not None and requested != version:
+        # 다른 워커가 먼저 새 데이터를 읽은 경우: 이 URL 에 다른 버전 본문이 캐시되지 않도록 거절
+        response = jsonify({"error": "Catalog version not available", "version": version})
+        response.status_code = 404
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    # 압축된 응답은 약한 ETag(W/"...") 로 나가므로 약한 비교로 확인
+    if request.if_none_match.contains_weak(version):
+        response = Response(status=304)
+    else:
+        response = Response(data.catalogJson, mimetype='application/json')
+    response.set_etag(version)
+    # ?v= 가 본문 버전과 같을 때만 영구 캐시, 버전 없는 요청은 매번 ETag 로 재검증
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable' if requested else 'no-cache'
+    return response
+
+@gameBP.route('/api/catalog/version', methods=['GET'])
+def get_catalog_version():
+    data = gameEngine.current
+    return jsonify({"version": data.catalogVersion, "loadedAt": int(data.loadedAt)})
+
+def load_active_player(userId):
+    # 정지/강제 로그아웃 대상이면 (None, 에러 응답)을 반환
+    currentUserData = playerCache.get(userId)
+    
+    if currentUserData.get('banned_until', 0) > time.time() or currentUserData.get('force_logout'):
+        if currentUserData.get('force_logout'):
+            fbManager.patchUserData(userId, {'force_logout': False})
+        playerCache.discard(userId)
+        session.clear()
+        return None, (jsonify({"error": "Force Logout"}), 401)
+    return currentUserData, None
+
+# 계정 초기화 후에도 남기는 필드 (정지/강제 로그아웃이 초기화로 풀리지 않도록)
+RESET_KEPT_FIELDS = ('email', 'banned_until', 'force_logout')
+
+def reset_player_data(username, previous):
+    # previous: 기존 문서 또는 색인 항목
+    new_data = gameEngine.initNewPlayer()
+    new_data['username'] = username
+    new_data['email'] = ''
+    for k in RESET_KEPT_FIELDS:
+        if previous.get(k) is not None: new_data[k] = previous[k]
+    return new_data
+
+def create_player(userId, userData, reset=False):
+    # 신규 문서의 환영 메시지 등은 문서가 아닌 로그 스트림에 기록 (reset 이면 이전 로그를 비운다)
+    lines = userData.pop('logs', None) or []
+    if reset: logStream.clear(userId)
+    fbManager.setUserData(userId, userData)
+    logStream.append(userId, lines)
+
+def commit_player(userId, userData):
+    # 이번 요청에서 생긴 로그 줄을 문서에서 떼어 내고, 문서 저장이 성공했을 때만 스트림에 덧붙인다
+    lines = userData.pop('logs', None) or []
+    if not playerCache.save(userId, userData): return False
+    logStream.append(userId, lines)
+    return True
+
+def attach_logs(userId, responsePayload, after=None, refresh=False):
+    # 클라이언트가 마지막으로 받은 로그 키(after) 이후의 줄만 응답에 싣는다
+    lines, reset, cursor = logStream.since(userId, after, refresh=refresh)
+    responsePayload['logs'] = [list(line) for line in lines]
+    responsePayload['logReset'] = reset
+    responsePayload['logCursor'] = cursor
+    return responsePayload
+
+def run_player_action(userId, apply, logAfter=None):
+    # 같은 유저의 요청은 워커 안에서 줄을 세우고, 다른 워커와 revision 이 충돌하면
+    # 최신 문서를 다시 읽어 행동을 재처리한다. 재시도가 모두 충돌하면 409 로 거절.
+    with userLocks.get(userId):
+        if playerCache.takeConflict(userId):
+            # write-behind 기록이 충돌해 버려진 행동이 있었음을 알리고 클라이언트가 다시 불러오게 한다
+            return jsonify({"error": "Conflict"}), 409
+        for _ in range(getattr(Config, 'ACTION_CONFLICT_RETRIES', 3)):
+            currentUserData, errorResponse = load_active_player(userId)
+            if errorResponse: return errorResponse
+            responsePayload = apply(currentUserData)
+            if commit_player(userId, responsePayload['userData']):
+                return jsonify(attach_logs(userId, responsePayload, logAfter))
+            metrics.inc('greycity_write_conflicts_total', {"outcome": "retried"})
+    metrics.inc('greycity_write_conflicts_total', {"outcome": "rejected"})
+    return jsonify({"error": "Conflict"}), 409
+
+def is_valid_action(actionType, target):
+    return isinstance(actionType, str) and (target is None or isinstance(target, str))
+
 @gameBP.route('/api/action', methods=['POST'])
 def handleAction():
     if 'user_id' not in session:
@@ -263,21 +456,32 @@ def handleAction():
     
     actionType = data.get('type')
     target = data.get('target')
-    if not isinstance(actionType, str) or (target is not None and not isinstance(target, str)):
+    if not is_valid_action(actionType, target):
         return jsonify({"error": "Invalid payload data type"}), 400
 
-    currentUserData = fbManager.getUserData(userId)
-    
-    if currentUserData.get('banned_until', 0) > time.time() or currentUserData.get('force_logout'):
-        if currentUserData.get('force_logout'):
-            currentUserData['force_logout'] = False
-            fbManager.setUserData(userId, currentUserData)
-        session.clear()
-        return jsonify({"error": "Force Logout"}), 401
+    return run_player_action(userId, lambda userData: gameEngine.processAction(userData, actionType, target),
+                             data.get('logAfter'))
 
-    responsePayload = gameEngine.processAction(currentUserData, actionType, target)
-    fbManager.updateUserData(userId, responsePayload['userData'])
-    return jsonify(responsePayload)
+@gameBP.route('/api/action/batch', methods=['POST'])
+def handleActionBatch():
+    if 'user_id' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.json or {}
+    userId = session['user_id']
+
+    actions = data.get('actions')
+    if not isinstance(actions, list) or not actions or len(actions) > getattr(Config, 'BATCH_ACTION_LIMIT', 20):
+        return jsonify({"error": "Invalid payload data type"}), 400
+    parsed = []
+    for action in actions:
+        if not isinstance(action, dict) or not is_valid_action(action.get('type'), action.get('target')):
+            return jsonify({"error": "Invalid payload data type"}), 400
+        parsed.append((action['type'], action.get('target')))
+
+    # 한 번 읽고, 순서대로 처리한 뒤, 한 번 기록
+    return run_player_action(userId, lambda userData: gameEngine.processBatch(userData, parsed),
+                             data.get('logAfter'))
 
 @gameBP.route('/api/reset_account', methods=['POST'])
 def reset_account():
@@ -287,17 +491,16 @@ def reset_account():
     user_id = session['user_id']
     username = session.get('username')
     
-    # 기존 유저 데이터에서 이메일 정보만 보존
-    old_data = fbManager.getUserData(user_id)
-    email = old_data.get('email', '') if old_data else ''
+    playerCache.discard(user_id)
+
+    # 기존 유저 데이터에서 이메일과 제재 상태만 보존
+    old_data = fbManager.getUserData(user_id) or {}
 
     # 게임 엔진을 통해 완전 초기화된 새 데이터 생성
-    new_data = gameEngine.initNewPlayer()
-    new_data['username'] = username
-    new_data['email'] = email
+    new_data = reset_player_data(username, old_data)
     
-    # DB 덮어쓰기
-    fbManager.setUserData(user_id, new_data)
+    # DB 덮어쓰기 (이전 로그 스트림도 비운다)
+    create_player(user_id, new_data, reset=True)
     
     return jsonify({"success": True})
 
@@ -309,6 +512,8 @@ def delete_account():
     user_id = session['user_id']
     
     # Firebase Manager의 완전 삭제 메서드 호출 (인증 정보 + 유저 데이터 모두 삭제)
+    playerCache.discard(user_id)
+    logStream.discard(user_id)
     success = fbManager.deleteUserComplete(user_id)
     
     if success:
@@ -331,7 +536,29 @@ def admin_panel():
 @gameBP.route('/api/admin/users', methods=['GET'])
 def admin_get_users():
     if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
-    return jsonify(fbManager.getAllUsers())
+    playerCache.flush()
+    limit = request.args.get('limit', 50, type=int)
+    limit = max(1, min(limit, 200))
+    sort = request.args.get('sort', 'username')
+    if sort not in ('username', 'level', 'banned'): sort = 'username'
+    order = 'desc' if request.args.get('order') == 'desc' else 'asc'
+    return jsonify(fbManager.listUsers(
+        search=request.args.get('q', ''), sort=sort, order=order,
+        cursor=request.args.get('cursor'), limit=limit
+    ))
+
+@gameBP.route('/api/admin/mail_stats', methods=['GET'])
+def admin_mail_stats():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(mailDispatcher.getStats())
+
+@gameBP.route('/api/admin/user/<user_id>', methods=['GET'])
+def admin_get_user(user_id):
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    playerCache.flush(user_id)
+    userData = fbManager.getUserData(user_id)
+    if not userData: return jsonify({"error": "Not Found"}), 404
+    return jsonify(userData)
 
 @gameBP.route('/api/admin/user/<user_id>', methods=['POST'])
 def admin_update_user(user_id):
@@ -339,54 +566,247 @@ def admin_update_user(user_id):
     new_data = request.json
     if not new_data or not isinstance(new_data, dict):
         return jsonify({"error": "Invalid payload"}), 400
+    playerCache.discard(user_id)
     fbManager.setUserData(user_id, new_data)
     return jsonify({"success": True, "msg": "유저 데이터가 업데이트되었습니다."})
 
 @gameBP.route('/api/admin/user/<user_id>', methods=['DELETE'])
 def admin_delete_user(user_id):
     if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    playerCache.discard(user_id)
+    logStream.discard(user_id)
     success = fbManager.deleteUserComplete(user_id)
     return jsonify({"success": success})
 
 @gameBP.route('/api/admin/user/<user_id>/logout', methods=['POST'])
 def admin_force_logout(user_id):
     if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
-    userData = fbManager.getUserData(user_id)
-    if userData:
-        userData['force_logout'] = True
-        fbManager.setUserData(user_id, userData)
-    return jsonify({"success": True})
+    return single_admin_response(user_id, run_bulk_admin(
+        [user_id], lambda uid, entry: fbManager.userFieldPaths(uid, {'force_logout': True})
+    ))
 
 @gameBP.route('/api/admin/user/<user_id>/suspend', methods=['POST'])
 def admin_suspend_user(user_id):
     if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
-    days = request.json.get('days', 0)
+    days = (request.json or {}).get('days', 0)
     if not isinstance(days, int):
         return jsonify({"error": "Invalid data type"}), 400
-        
-    userData = fbManager.getUserData(user_id)
-    if userData:
-        if days > 0:
-            userData['banned_until'] = time.time() + (days * 86400)
-            userData['force_logout'] = True 
-        else:
-            userData['banned_until'] = 0 
-        fbManager.setUserData(user_id, userData)
-    return jsonify({"success": True})
+    fields = suspend_fields(days)
+    return single_admin_response(user_id, run_bulk_admin([user_id], lambda uid, entry: fbManager.userFieldPaths(uid, fields)))
+
+# ------------------------------------------
+# 다중 유저 관리 (스팸/레이드 대응)
+#   요청: {"userIds": [...], ...}  응답: {"results": {userId: ok|not_found|invalid|error}, "counts": {...}}
+#   정지/로그아웃은 banned_until/force_logout 필드만 다중 경로로 기록하므로 진행 중인 게임 저장을 덮어쓰지 않는다.
+# ------------------------------------------
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def suspend_fields(days):
+    if days > 0:
+        return {'banned_until': time.time() + (days * 86400), 'force_logout': True}
+    return {'banned_until': 0}
+
+def read_bulk_user_ids(data):
+    # 중복을 제거한 userId 목록 (형식이 잘못된 요청이면 None)
+    userIds = data.get('userIds')
+    if not isinstance(userIds, list) or not userIds or len(userIds) > getattr(Config, 'ADMIN_BULK_LIMIT', 500):
+        return None
+    if not all(isinstance(uid, str) for uid in userIds): return None
+    return list(dict.fromkeys(userIds))
+
+def check_bulk_targets(userIds):
+    # user_index 로 존재 여부를 확인: (대상 {userId: 색인 항목}, 제외된 유저의 결과)
+    results = {userId: 'invalid' for userId in userIds if not USER_ID_PATTERN.match(userId)}
+    index = fbManager.getUserIndexEntries([userId for userId in userIds if userId not in results])
+    targets = {}
+    for userId in userIds:
+        if userId in results: continue
+        if userId in index: targets[userId] = index[userId]
+        else: results[userId] = 'not_found'
+    return targets, results
+
+def run_bulk_admin(userIds, build_paths, drop_cache=None):
+    """대상 유저마다 build_paths(userId, 색인 항목) 로 만든 경로를 청크 단위 다중 경로 쓰기로 반영한다.
+
+    drop_cache 가 없으면 기록 후 캐시를 evict 해(대기 중인 게임 변경분은 먼저 기록) 다음 요청이 새 값을 읽게 한다.
+    """
+    targets, results = check_bulk_targets(userIds)
+    pathsByUser = {userId: build_paths(userId, entry) for userId, entry in targets.items()}
+    if drop_cache:
+        for userId in pathsByUser: drop_cache(userId)
+    written = fbManager.bulkUpdate(pathsByUser, getattr(Config, 'ADMIN_BULK_CHUNK', 100))
+    for userId, ok in written.items():
+        results[userId] = 'ok' if ok else 'error'
+        if ok: (drop_cache or playerCache.evict)(userId)
+    return results
+
+def single_admin_response(userId, results):
+    # 단일 유저 관리 요청: 그 유저의 결과를 그대로 돌려준다 (ok 가 아니면 실패 상태 코드)
+    result = results.get(userId, 'error')
+    status = {'ok': 200, 'not_found': 404, 'invalid': 400}.get(result, 500)
+    return jsonify({"success": result == 'ok', "result": result}), status
+
+def drop_player_state(userId):
+    # 초기화/삭제 대상: 캐시된 문서와 로그 링을 기록 없이 버린다
+    playerCache.discard(userId)
+    logStream.discard(userId)
+
+def bulk_response(results):
+    counts = {}
+    for outcome in results.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return jsonify({"success": counts.get('ok', 0) == len(results), "results": results, "counts": counts})
+
+@gameBP.route('/api/admin/users/suspend', methods=['POST'])
+def admin_bulk_suspend():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    data = request.json or {}
+    userIds, days = read_bulk_user_ids(data), data.get('days', 0)
+    if userIds is None or not isinstance(days, int):
+        return jsonify({"error": "Invalid payload"}), 400
+    fields = suspend_fields(days)
+    return bulk_response(run_bulk_admin(userIds, lambda uid, entry: fbManager.userFieldPaths(uid, fields)))
+
+@gameBP.route('/api/admin/users/logout', methods=['POST'])
+def admin_bulk_logout():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    userIds = read_bulk_user_ids(request.json or {})
+    if userIds is None: return jsonify({"error": "Invalid payload"}), 400
+    return bulk_response(run_bulk_admin(userIds, lambda uid, entry: fbManager.userFieldPaths(uid, {'force_logout': True})))
+
+@gameBP.route('/api/admin/users/message', methods=['POST'])
+def admin_bulk_message():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    data = request.json or {}
+    userIds, message = read_bulk_user_ids(data), data.get('message')
+    if userIds is None or not isinstance(message, dict):
+        return jsonify({"error": "Invalid payload"}), 400
+    message['timestamp'] = int(time.time())
+    targets, results = check_bulk_targets(userIds)
+    sent = fbManager.sendPrivateMessages(list(targets), message, getattr(Config, 'ADMIN_BULK_CHUNK', 100))
+    results.update({userId: 'ok' if ok else 'error' for userId, ok in sent.items()})
+    return bulk_response(results)
+
+@gameBP.route('/api/admin/users/reset', methods=['POST'])
+def admin_bulk_reset():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    userIds = read_bulk_user_ids(request.json or {})
+    if userIds is None: return jsonify({"error": "Invalid payload"}), 400
+
+    # 문서 전체를 덮어쓰므로 유저마다 저장된 revision 을 기준으로 CAS 기록한다 (청크 다중 경로 쓰기를 쓰지 않음).
+    # 새 문서는 이미 읽은 색인 항목으로 만들고(문서 조회 없음), 유저별 기록은 몇 개씩 동시에 보낸다
+    targets, results = check_bulk_targets(userIds)
+
+    def reset_one(userId):
+        new_data = reset_player_data(targets[userId].get('username', 'Unknown'), targets[userId])
+        lines = new_data.pop('logs', None) or []
+        drop_player_state(userId)
+        return fbManager.setUserData(userId, new_data, extraPaths={
+            f'player_logs/{userId}': {generatePushKey(): line for line in lines} or None
+        })
+
+    if targets:
+        with ThreadPoolExecutor(max_workers=getattr(Config, 'ADMIN_BULK_CONCURRENCY', 8)) as pool:
+            for userId, ok in zip(targets, pool.map(reset_one, targets)):
+                results[userId] = 'ok' if ok else 'error'
+    return bulk_response(results)
+
+@gameBP.route('/api/admin/users/delete', methods=['POST'])
+def admin_bulk_delete():
+    if not is_admin(): return jsonify({"error": "Unauthorized"}), 403
+    userIds = read_bulk_user_ids(request.json or {})
+    if userIds is None: return jsonify({"error": "Invalid payload"}), 400
+    usernames = fbManager.getAuthUsernames([uid for uid in userIds if USER_ID_PATTERN.match(uid)])
+    return bulk_response(run_bulk_admin(
+        userIds, lambda uid, entry: fbManager.userDeletionPaths(uid, usernames.get(uid)),
+        drop_cache=drop_player_state
+    ))
 
 # ==========================================
 # COMMUNICATION API
 # ==========================================
 
+def is_valid_comm_key(key):
+    # push 키 형식만 허용 (경로 조작 방지)
+    return isinstance(key, str) and bool(re.match(r"^[-0-9A-Za-z_]{1,40}$", key))
+
+def read_page_args():
+    # ?after=KEY 는 그 이후의 새 항목, ?before=KEY 는 그 이전의 오래된 항목 페이지
+    after = request.args.get('after')
+    before = request.args.get('before')
+    if after is not None and not is_valid_comm_key(after): after = None
+    if before is not None and not is_valid_comm_key(before): before = None
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    return after, before, limit
+
+def comm_page_response(items, hasMore, channel):
+    readCursor = None
+    if 'user_id' in session:
+        readCursor = fbManager.getReadCursors(session['user_id']).get(channel)
+    return jsonify({"items": dict(items), "hasMore": hasMore, "readCursor": readCursor})
+
 @gameBP.route('/api/notices', methods=['GET'])
 def get_notices():
-    return jsonify(fbManager.getGlobalNotices())
+    after, before, limit = read_page_args()
+    items, hasMore = fbManager.queryGlobalNotices(after=after, before=before, limit=limit)
+    return comm_page_response(items, hasMore, 'notices')
 
 @gameBP.route('/api/messages', methods=['GET'])
 def get_messages():
     if 'user_id' not in session: 
         return jsonify({"error": "Unauthorized"}), 401
-    return jsonify(fbManager.getPrivateMessages(session['user_id']))
+    after, before, limit = read_page_args()
+    items, hasMore = fbManager.queryPrivateMessages(session['user_id'], after=after, before=before, limit=limit)
+    return comm_page_response(items, hasMore, 'messages')
+
+@gameBP.route('/api/<channel>/read', methods=['POST'])
+def mark_comm_read(channel):
+    if 'user_id' not in session: 
+        return jsonify({"error": "Unauthorized"}), 401
+    if channel not in ('notices', 'messages'):
+        return jsonify({"error": "Not Found"}), 404
+    key = (request.json or {}).get('key')
+    if not is_valid_comm_key(key):
+        return jsonify({"error": "Invalid payload data type"}), 400
+    # 읽음 커서는 앞으로만 이동
+    current = fbManager.getReadCursors(session['user_id']).get(channel)
+    if not current or key > current:
+        fbManager.setReadCursor(session['user_id'], channel, key)
+    return jsonify({"success": True})
+
+# 장시간 열어 두는 SSE 연결은 협력형(gevent) 워커에서만 제공한다 (gunicorn.conf.py 참고)
+SSE_ENABLED = getattr(Config, 'SSE_ENABLED', getattr(Config, 'SERVING_MODE', 'sync') == 'gevent')
+
+@gameBP.route('/api/stream', methods=['GET'])
+def event_stream():
+    # 새 공지/개인 메세지를 Server-Sent Events 로 전달
+    if 'user_id' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    if not SSE_ENABLED:
+        # 동기 워커에서는 연결 하나가 워커 하나를 점유하고 timeout 에 끊기므로 열지 않는다
+        # (204 를 받은 EventSource 는 재연결하지 않고, 클라이언트는 ?after= 폴링으로 전환한다)
+        return '', 204
+    userId = session['user_id']
+    heartbeat = getattr(Config, 'SSE_HEARTBEAT', 15)
+
+    def generate():
+        q = eventHub.subscribe(userId)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event, data = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            eventHub.unsubscribe(userId, q)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @gameBP.route('/api/admin/notice', methods=['POST'])
 def admin_send_notice():
@@ -404,4 +824,37 @@ def admin_send_message(user_id):
     data = request.json or {}
     data['timestamp'] = int(time.time())
     fbManager.sendPrivateMessage(user_id, data)
-    return jsonify({"success": True})
\ No newline at end of file
+    return jsonify({"success": True})
+# ==========================================
+# METRICS
+# ==========================================
+@gameBP.before_request
+def start_request_timer():
+    g.requestStarted = time.perf_counter()
+    # data/ 변경 감지 스레드 (워커마다 한 번만 시작, 0 이면 비활성)
+    gameEngine.startWatching(getattr(Config, 'DATA_RELOAD_INTERVAL', 5))
+
+@gameBP.after_request
+def record_request_metrics(response):
+    started = g.pop('requestStarted', None)
+    if started is None: return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    labels = {"route": route, "method": request.method}
+    metrics.observe('greycity_http_request_seconds', time.perf_counter() - started, labels)
+    metrics.inc('greycity_http_requests_total', dict(labels, status=str(response.status_code)))
+    # 스트리밍 응답(SSE)은 길이를 알 수 없으므로 크기를 기록하지 않는다
+    if not response.is_streamed:
+        metrics.observe('greycity_http_response_bytes', response.calculate_content_length() or 0, labels, SIZE_BUCKETS)
+    return response
+
+# after_request 는 등록 역순으로 실행되므로 압축이 먼저 돌고, 위 지표에는 압축 후 크기와 시간이 잡힌다
+@gameBP.after_request
+def compress_response(response):
+    return compressor.process(request, response)
+
+@gameBP.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    token = getattr(Config, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,770 @@
+import copy
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+class StorageBackend:
+    """FirebaseManager 가 사용하는 경로 기반 저장소 인터페이스.
+
+    경로는 Firebase Realtime Database 와 같은 '/' 구분 문자열이며,
+    update() 의 키에도 '/' 를 넣어 여러 하위 경로를 한 번에 갱신할 수 있다.
+    """
+
+    def get(self, path):
+        raise NotImplementedError
+
+    def set(self, path, value):
+        raise NotImplementedError
+
+    def update(self, path, values):
+        raise NotImplementedError
+
+    def delete(self, path):
+        raise NotImplementedError
+
+    def push(self, path, value):
+        raise NotImplementedError
+
+    def pushMany(self, path, values):
+        """values 의 {상대경로: 값} 마다 path/상대경로 아래에 push 키로 항목을 추가한다.
+
+        기본 구현은 한 번의 다중 경로 update 이며, 반환값은 {상대경로: 새 키}.
+        """
+        keys = {relPath: generatePushKey() for relPath in values}
+        self.update(path, {f"{relPath}/{keys[relPath]}": value for relPath, value in values.items()})
+        return keys
+
+    def list(self, path):
+        raise NotImplementedError
+
+    def listen(self, path, callback):
+        """path 바로 아래에 push 로 새로 추가되는 항목마다 callback(키, 값)을 호출한다.
+
+        구독 전에 있던 항목은 전달하지 않는다. 반환값의 close() 로 구독을 끝낸다.
+        """
+        raise NotImplementedError
+
+    def compareAndUpdate(self, path, key, expected, values):
+        """path/key 의 현재 값이 expected 일 때만 values(path 기준 다중 경로, key 의 새 값 포함)를 기록한다.
+
+        기록했으면 True, 값이 달라 건너뛰었으면 False.
+        Firebase 백엔드는 key 하나에만 조건부 쓰기를 걸어 기록 중 표시(pendingMarker)를 남긴 뒤
+        values 를 다중 경로 update 한 번으로 보낸다. 그 사이에 읽힌 값은 표시이므로 그 위의 비교는 실패한다.
+        """
+        raise NotImplementedError
+
+    def query(self, path, after=None, before=None, limit=None):
+        """키 순으로 정렬된 하위 항목 중 after < key < before 인 것을 반환한다.
+
+        after 가 없으면 가장 최근(키가 큰) limit 개를, 있으면 after 바로 다음부터 limit 개를 돌려준다.
+        반환값은 키 오름차순의 (key, value) 리스트.
+        """
+        raise NotImplementedError
+
+
+class FirebaseBackend(StorageBackend):
+    def __init__(self, keyPath, dbUrl):
+        import firebase_admin
+        from firebase_admin import credentials, db
+        self.firebaseAdmin = firebase_admin
+        self.db = db
+        self.dbUrl = dbUrl
+        self.streamClient = None
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(keyPath)
+            firebase_admin.initialize_app(cred, {
+                'databaseURL': dbUrl
+            })
+            print(">>> Firebase Connected")
+
+    def get(self, path):
+        return self.db.reference(path).get()
+
+    def set(self, path, value):
+        self.db.reference(path).set(value)
+
+    def update(self, path, values):
+        # 루트('')에 대한 다중 경로 업데이트도 허용
+        self.db.reference(path or '/').update(values)
+
+    def delete(self, path):
+        self.db.reference(path).delete()
+
+    def push(self, path, value):
+        return self.db.reference(path).push(value).key
+
+    def list(self, path):
+        return list((self.db.reference(path).get(shallow=True) or {}).keys())
+
+    def compareAndUpdate(self, path, key, expected, values):
+        # 트랜잭션은 비교 대상(revision) 하나에만 걸어 문서 전체를 주고받지 않는다
+        ref = self.db.reference(joinPath(path, key))
+        marker = pendingMarker(valueAt(values, key))
+        def claim(current):
+            if not canClaim(current, expected): raise CompareMismatch()
+            return marker
+        try:
+            ref.transaction(claim)
+        except CompareMismatch:
+            return False
+        try:
+            self.update(path, values)
+        except Exception:
+            # 표시를 되돌려 다른 쓰기가 PENDING_TIMEOUT 을 기다리지 않게 한다
+            try:
+                ref.transaction(lambda current: expected if current == marker else current)
+            except Exception:
+                pass
+            raise
+        return True
+
+    def listen(self, path, callback):
+        return PushStream(self, path, callback)
+
+    def openStream(self, path, params):
+        # SDK 의 Reference.listen 은 쿼리(orderBy/startAt)를 붙일 수 없으므로 같은 인증으로 REST 스트림을 연다
+        if self.streamClient is None:
+            from src.httpClient import HttpClient
+            self.streamClient = HttpClient(self.dbUrl, retries=0)
+        token = self.firebaseAdmin.get_app().credential.get_access_token().access_token
+        response = self.streamClient.request('GET', f"/{path.strip('/')}.json", params=params, stream=True,
+                                             headers={"Accept": "text/event-stream", "Authorization": f"Bearer {token}"},
+                                             timeout=(self.streamClient.timeout[0], PushStream.READ_TIMEOUT))
+        response.raise_for_status()
+        return response
+
+    def query(self, path, after=None, before=None, limit=None):
+        ref = self.db.reference(path).order_by_key()
+        if after is not None: ref = ref.start_at(after)
+        if before is not None: ref = ref.end_at(before)
+        # start_at/end_at 은 경계를 포함하므로 한 개 더 받아서 걸러낸다
+        extra = (after is not None) + (before is not None)
+        if limit is not None:
+            if after is None: ref = ref.limit_to_last(limit + extra)
+            else: ref = ref.limit_to_first(limit + extra)
+        items = [(k, v) for k, v in (ref.get() or {}).items() if k != after and k != before]
+        items.sort(key=lambda kv: kv[0])
+        if limit is not None:
+            items = items[-limit:] if after is None else items[:limit]
+        return items
+
+
+class FirebaseRestBackend(StorageBackend):
+    """Realtime Database REST API 백엔드 (firebase_admin SDK 대신 공유 커넥션 풀로 직접 호출).
+
+    모든 호출이 HttpClient 의 requests 세션을 거치므로 gevent 워커(SERVING_MODE = 'gevent')에서는
+    DB 대기 중에 다른 요청으로 양보하고, 워커 하나의 동시 요청들이 같은 커넥션 풀을 나눠 쓴다.
+    keyPath 가 없으면 인증 없이 호출한다 (로컬 에뮬레이터용).
+    """
+
+    SCOPES = ("https://www.googleapis.com/auth/firebase.database",
+              "https://www.googleapis.com/auth/userinfo.email")
+    CAS_RETRIES = 5
+
+    def __init__(self, dbUrl, keyPath=None, poolSize=100, timeout=10):
+        from src.httpClient import HttpClient
+        self.credentials = None
+        if keyPath:
+            from google.oauth2 import service_account
+            from google.auth.transport.requests import Request
+            self.credentials = service_account.Credentials.from_service_account_file(keyPath, scopes=self.SCOPES)
+            self.authRequest = Request()
+        self.authLock = threading.Lock()
+        self.client = HttpClient(dbUrl, readTimeout=timeout, poolSize=poolSize)
+        print(">>> Firebase REST Connected")
+
+    def authHeaders(self):
+        if self.credentials is None: return {}
+        with self.authLock:
+            if not self.credentials.valid:
+                self.credentials.refresh(self.authRequest)
+            return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    def call(self, method, path, params=None, headers=None, **kwargs):
+        headers = dict(self.authHeaders(), **(headers or {}))
+        response = self.client.request(method, f"/{path.strip('/')}.json", params=params, headers=headers, **kwargs)
+        # 412 는 조건부 쓰기(compareAndUpdate)의 정상적인 실패
+        if response.status_code != 412: response.raise_for_status()
+        return response
+
+    def get(self, path):
+        return self.call('GET', path).json()
+
+    def set(self, path, value):
+        self.call('PUT', path, json=value, params={"print": "silent"})
+
+    def update(self, path, values):
+        # 루트('')에 대한 다중 경로 업데이트도 허용
+        self.call('PATCH', path, json=values, params={"print": "silent"})
+
+    def delete(self, path):
+        self.call('DELETE', path)
+
+    def push(self, path, value):
+        return self.call('POST', path, json=value).json()['name']
+
+    def list(self, path):
+        return list((self.call('GET', path, params={"shallow": "true"}).json() or {}).keys())
+
+    def compareAndUpdate(self, path, key, expected, values):
+        # 비교 대상(revision) 하나만 ETag 조건부 PUT 으로 선점하고, 변경분은 다중 경로 PATCH 한 번으로 보낸다
+        keyPath = joinPath(path, key)
+        marker = pendingMarker(valueAt(values, key))
+        if not self.conditionalSwap(keyPath, lambda current: canClaim(current, expected), marker):
+            return False
+        try:
+            self.update(path, values)
+        except Exception:
+            try:
+                self.conditionalSwap(keyPath, lambda current: current == marker, expected)
+            except Exception:
+                pass
+            raise
+        return True
+
+    def conditionalSwap(self, path, check, value):
+        # check(현재 값) 가 참일 때만 value 로 교체. 읽은 뒤 다른 쓰기가 끼어들면(412) 다시 읽는다
+        for _ in range(self.CAS_RETRIES):
+            response = self.call('GET', path, headers={"X-Firebase-ETag": "true"})
+            if not check(response.json()): return False
+            written = self.call('PUT', path, json=value, params={"print": "silent"},
+                                headers={"if-match": response.headers.get('ETag', '')})
+            if written.status_code != 412: return True
+        return False
+
+    def listen(self, path, callback):
+        return PushStream(self, path, callback)
+
+    def openStream(self, path, params):
+        return self.call('GET', path, params=params, headers={"Accept": "text/event-stream"}, stream=True,
+                         timeout=(self.client.timeout[0], PushStream.READ_TIMEOUT))
+
+    def query(self, path, after=None, before=None, limit=None):
+        params = {"orderBy": json.dumps("$key")}
+        if after is not None: params['startAt'] = json.dumps(after)
+        if before is not None: params['endAt'] = json.dumps(before)
+        # startAt/endAt 은 경계를 포함하므로 한 개 더 받아서 걸러낸다
+        extra = (after is not None) + (before is not None)
+        if limit is not None:
+            params['limitToLast' if after is None else 'limitToFirst'] = limit + extra
+        items = [(k, v) for k, v in (self.call('GET', path, params=params).json() or {}).items()
+                 if k != after and k != before]
+        items.sort(key=lambda kv: kv[0])
+        if limit is not None:
+            items = items[-limit:] if after is None else items[:limit]
+        return items
+
+
+class CompareMismatch(Exception):
+    pass
+
+# 기록 중 표시가 이 시간(초)보다 오래되면 기록 도중 실패한 것으로 보고 같은 값을 기대하는 쓰기가 가져갈 수 있다
+PENDING_TIMEOUT = 10
+
+def pendingMarker(nextValue):
+    return {"pending": nextValue, "at": time.time()}
+
+def isPending(value):
+    return isinstance(value, dict) and 'pending' in value
+
+def canClaim(current, expected):
+    if current != expected: return False
+    return not isPending(current) or time.time() - current.get('at', 0) > PENDING_TIMEOUT
+
+def revisionNumber(value):
+    # 저장된 revision(정수 또는 기록 중 표시)의 숫자 값
+    if isPending(value): value = value.get('pending')
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+def joinPath(*parts):
+    return '/'.join(p.strip('/') for p in parts if p and p.strip('/'))
+
+def valueAt(values, path):
+    # 다중 경로 values 안에서 path 위치에 기록될 값 (상위 경로에 통째로 들어 있어도 찾는다)
+    if path in values: return values[path]
+    for prefix, value in values.items():
+        if path.startswith(f"{prefix}/"):
+            for part in path[len(prefix) + 1:].split('/'):
+                if not isinstance(value, dict): return None
+                value = value.get(part)
+            return value
+    return None
+
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+pushState = {"lastTime": 0, "lastRand": [0] * 12}
+pushLock = threading.Lock()
+
+def generatePushKey():
+    # Firebase push ID 와 같은 형식: 시간순 정렬되는 20자 키 (같은 ms 안에서는 난수부를 1 증가)
+    with pushLock:
+        now = int(time.time() * 1000)
+        if now == pushState['lastTime']:
+            rand = pushState['lastRand']
+            i = 11
+            while i >= 0 and rand[i] == 63:
+                rand[i] = 0
+                i -= 1
+            if i >= 0: rand[i] += 1
+        else:
+            pushState['lastTime'] = now
+            pushState['lastRand'] = [random.randrange(64) for _ in range(12)]
+        rand = pushState['lastRand']
+
+    timeChars = []
+    for _ in range(8):
+        timeChars.append(PUSH_CHARS[now % 64])
+        now //= 64
+    return ''.join(reversed(timeChars)) + ''.join(PUSH_CHARS[r] for r in rand)
+
+
+class PushStream:
+    """Realtime Database 스트림(SSE)으로 path 바로 아래의 새 push 항목을 받아 callback(키, 값)을 호출한다.
+
+    경로 전체가 아니라 마지막으로 본 push 키부터(orderBy $key + startAt) 구독하므로, 연결 직후의 첫 스냅샷에는
+    그 키 이후의 항목만 담긴다. 처음 기준은 구독 시점의 최신 키이고, 재연결 사이에 추가된 항목은
+    다음 연결의 첫 스냅샷에서 전달한다. 끊기거나 토큰이 만료되면 1초 뒤 다시 연결한다.
+    """
+
+    READ_TIMEOUT = 90
+
+    def __init__(self, backend, path, callback):
+        self.backend = backend
+        self.path = path
+        self.callback = callback
+        # 기준 키를 못 읽으면 여기서 예외가 나므로 호출자가 나중에 다시 구독할 수 있다
+        newest = backend.query(path, limit=1)
+        self.lastKey = newest[-1][0] if newest else None
+        self.closed = False
+        self.response = None
+        self.thread = threading.Thread(target=self.run, name=f"PushStream {path}", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.closed = True
+        response = self.response
+        if response is not None: response.close()
+
+    def run(self):
+        while not self.closed:
+            try:
+                params = {"orderBy": json.dumps("$key")}
+                if self.lastKey is not None: params['startAt'] = json.dumps(self.lastKey)
+                self.response = self.backend.openStream(self.path, params)
+                self.read(self.response)
+            except Exception as e:
+                if not self.closed: print(f"Firebase Stream Error ({self.path}): {e}")
+            time.sleep(1)
+
+    def read(self, response):
+        initial, event, data = True, None, None
+        for line in response.iter_lines(decode_unicode=True):
+            if self.closed: return
+            if line.startswith('event:'):
+                event = line[6:].strip()
+            elif line.startswith('data:'):
+                data = line[5:].strip()
+            elif not line and event:
+                if event in ('cancel', 'auth_revoked'): return
+                if event in ('put', 'patch') and data and data != 'null':
+                    payload = json.loads(data)
+                    self.deliver(payload.get('path', '').strip('/'), payload.get('data'), initial)
+                    initial = False
+                event, data = None, None
+
+    def deliver(self, relPath, data, initial):
+        if data is None: return
+        if relPath:
+            # 새 항목 하나 (더 깊은 경로는 기존 항목의 필드 변경이므로 무시)
+            items = {} if '/' in relPath else {relPath: data}
+        else:
+            items = data if isinstance(data, dict) else {}
+        for key in sorted(items):
+            # 첫 스냅샷은 startAt 경계(이미 본 키)를 포함하므로 그 이후 키만 전달한다
+            if items[key] is None or (initial and self.lastKey is not None and key <= self.lastKey): continue
+            if self.lastKey is None or key > self.lastKey: self.lastKey = key
+            self.callback(key, items[key])
+
+
+class Subscription:
+    """SQLite/메모리 백엔드 listen() 의 반환값. close() 로 리스너 목록에서 뺀다."""
+
+    def __init__(self, backend, entry):
+        self.backend = backend
+        self.entry = entry
+
+    def close(self):
+        with self.backend.listenLock:
+            self.backend.listeners = [l for l in self.backend.listeners if l is not self.entry]
+
+
+class SQLiteBackend(StorageBackend):
+    """단일 노드용 내장 저장소 (SQLite WAL 모드).
+
+    dict 와 리스트는 잎 노드 단위로 펼쳐 `경로 -> JSON 값` 행으로 저장한다
+    (리스트는 Firebase 처럼 인덱스를 키로 사용). 덕분에 `inventory/potion` 같은
+    하위 경로 쓰기가 가능하고, 하위 트리 조회는 기본키 범위 검색 한 번으로 끝난다.
+    """
+
+    def __init__(self, dbPath):
+        self.dbPath = dbPath
+        self.local = threading.local()
+        self.writeLock = threading.Lock()
+        conn = self.conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        # push 로 추가된 경로의 순번 기록. 다른 프로세스의 push 도 listen 으로 감지하기 위함
+        conn.execute("CREATE TABLE IF NOT EXISTS pushes (seq INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL)")
+        conn.commit()
+        self.listeners = []
+        self.listenLock = threading.Lock()
+        self.listenWake = threading.Event()
+        self.listenThread = None
+
+    def conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            dirName = os.path.dirname(os.path.abspath(self.dbPath))
+            os.makedirs(dirName, exist_ok=True)
+            conn = sqlite3.connect(self.dbPath, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @staticmethod
+    def normalize(path):
+        return '/'.join(part for part in str(path).split('/') if part)
+
+    @staticmethod
+    def flatten(path, value, rows):
+        if isinstance(value, list):
+            value = {str(i): v for i, v in enumerate(value)}
+        if isinstance(value, dict):
+            for k, v in value.items():
+                SQLiteBackend.flatten(f"{path}/{k}" if path else str(k), v, rows)
+        elif value is not None:
+            rows.append((path, json.dumps(value, ensure_ascii=False)))
+
+    @staticmethod
+    def arrayify(node):
+        # Firebase 와 같은 규칙: 키가 모두 정수이고 절반 이상 채워져 있으면 리스트로 복원
+        if not isinstance(node, dict): return node
+        for k, v in node.items():
+            node[k] = SQLiteBackend.arrayify(v)
+        if node and all(k.isdigit() for k in node):
+            indexes = [int(k) for k in node]
+            if max(indexes) < 2 * len(indexes):
+                arr = [None] * (max(indexes) + 1)
+                for k, v in node.items():
+                    arr[int(k)] = v
+                return arr
+        return node
+
+    def subtreeRange(self, path):
+        # '/' 다음 문자가 '0' 이므로 [path/, path0) 구간이 정확히 하위 트리다
+        return (f"{path}/", f"{path}0") if path else ("", "\U0010ffff")
+
+    def get(self, path):
+        path = self.normalize(path)
+        lo, hi = self.subtreeRange(path)
+        conn = self.conn()
+        row = conn.execute("SELECT value FROM nodes WHERE path = ?", (path,)).fetchone()
+        if row: return json.loads(row[0])
+
+        result = None
+        offset = len(lo)
+        for subPath, raw in conn.execute("SELECT path, value FROM nodes WHERE path >= ? AND path < ? ORDER BY path", (lo, hi)):
+            parts = subPath[offset:].split('/')
+            if result is None: result = {}
+            node = result
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = json.loads(raw)
+        return self.arrayify(result)
+
+    def _deleteTree(self, conn, path):
+        lo, hi = self.subtreeRange(path)
+        conn.execute("DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+        # 상위 경로가 잎 노드로 저장돼 있으면 하위 쓰기와 충돌하므로 제거
+        parts = path.split('/')
+        ancestors = ['/'.join(parts[:i]) for i in range(1, len(parts))]
+        if ancestors:
+            conn.executemany("DELETE FROM nodes WHERE path = ?", [(a,) for a in ancestors])
+
+    def _write(self, conn, path, value):
+        self._deleteTree(conn, path)
+        rows = []
+        self.flatten(path, value, rows)
+        if rows:
+            conn.executemany("INSERT OR REPLACE INTO nodes (path, value) VALUES (?, ?)", rows)
+
+    def _transaction(self, fn):
+        conn = self.conn()
+        with self.writeLock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def set(self, path, value):
+        path = self.normalize(path)
+        self._transaction(lambda conn: self._write(conn, path, value))
+
+    def update(self, path, values):
+        path = self.normalize(path)
+        def apply(conn):
+            for key, value in values.items():
+                self._write(conn, self.normalize(f"{path}/{key}"), value)
+        self._transaction(apply)
+
+    def delete(self, path):
+        path = self.normalize(path)
+        self._transaction(lambda conn: self._deleteTree(conn, path))
+
+    def compareAndUpdate(self, path, key, expected, values):
+        path = self.normalize(path)
+        def apply(conn):
+            # BEGIN IMMEDIATE 로 쓰기 잠금을 잡은 상태라 다른 프로세스와도 원자적으로 비교된다
+            row = conn.execute("SELECT value FROM nodes WHERE path = ?", (self.normalize(f"{path}/{key}"),)).fetchone()
+            if (json.loads(row[0]) if row else None) != expected: return False
+            for k, value in values.items():
+                self._write(conn, self.normalize(f"{path}/{k}"), value)
+            return True
+        return self._transaction(apply)
+
+    def push(self, path, value):
+        key = generatePushKey()
+        fullPath = f"{self.normalize(path)}/{key}"
+        def apply(conn):
+            self._write(conn, fullPath, value)
+            conn.execute("INSERT INTO pushes (path) VALUES (?)", (fullPath,))
+        self._transaction(apply)
+        self.listenWake.set()
+        return key
+
+    def pushMany(self, path, values):
+        # 한 트랜잭션으로 기록하고 push 순번도 함께 남겨 다른 프로세스의 listen 에도 전달되게 한다
+        path = self.normalize(path)
+        keys = {relPath: generatePushKey() for relPath in values}
+        def apply(conn):
+            for relPath, value in values.items():
+                fullPath = self.normalize(f"{path}/{relPath}/{keys[relPath]}")
+                self._write(conn, fullPath, value)
+                conn.execute("INSERT INTO pushes (path) VALUES (?)", (fullPath,))
+        self._transaction(apply)
+        self.listenWake.set()
+        return keys
+
+    def list(self, path):
+        path = self.normalize(path)
+        lo, hi = self.subtreeRange(path)
+        keys = []
+        offset = len(lo)
+        for (subPath,) in self.conn().execute("SELECT path FROM nodes WHERE path >= ? AND path < ? ORDER BY path", (lo, hi)):
+            key = subPath[offset:].split('/', 1)[0]
+            if not keys or keys[-1] != key: keys.append(key)
+        return keys
+
+
+    def query(self, path, after=None, before=None, limit=None):
+        # push 키처럼 길이가 같은 키를 기준으로 한 범위 검색
+        path = self.normalize(path)
+        prefix = f"{path}/" if path else ""
+        lo = prefix + after if after is not None else prefix
+        hi = prefix + before if before is not None else (f"{path}0" if path else "\U0010ffff")
+        newestFirst = after is None
+        sql = "SELECT path FROM nodes WHERE path >= ? AND path < ? ORDER BY path" + (" DESC" if newestFirst else "")
+        keys = []
+        for (subPath,) in self.conn().execute(sql, (lo, hi)):
+            key = subPath[len(prefix):].split('/', 1)[0]
+            if key == after or key == before or (keys and keys[-1] == key): continue
+            if limit is not None and len(keys) >= limit: break
+            keys.append(key)
+        keys.sort()
+        return [(k, self.get(f"{prefix}{k}")) for k in keys]
+
+    def listen(self, path, callback, interval=0.5):
+        path = self.normalize(path)
+        row = self.conn().execute("SELECT COALESCE(MAX(seq), 0) FROM pushes").fetchone()
+        entry = {"prefix": f"{path}/", "callback": callback, "lastSeq": row[0]}
+        with self.listenLock:
+            self.listeners = self.listeners + [entry]
+            if self.listenThread is None:
+                self.listenThread = threading.Thread(target=self._listenLoop, args=(interval,), daemon=True)
+                self.listenThread.start()
+        return Subscription(self, entry)
+
+    def _listenLoop(self, interval):
+        while True:
+            self.listenWake.wait(interval)
+            self.listenWake.clear()
+            try:
+                # 리스너가 유저마다 있을 수 있으므로 새 push 는 한 번만 읽어 나눠 준다
+                listeners = self.listeners
+                if not listeners: continue
+                since = min(listener['lastSeq'] for listener in listeners)
+                rows = self.conn().execute("SELECT seq, path FROM pushes WHERE seq > ? ORDER BY seq", (since,)).fetchall()
+                for seq, pushedPath in rows:
+                    for listener in listeners:
+                        if seq <= listener['lastSeq']: continue
+                        listener['lastSeq'] = seq
+                        if pushedPath.startswith(listener['prefix']):
+                            value = self.get(pushedPath)
+                            if value is not None:
+                                listener['callback'](pushedPath[len(listener['prefix']):], value)
+            except Exception as e:
+                print(f"SQLite Listen Error: {e}")
+
+
+class MemoryBackend(StorageBackend):
+    """프로세스 메모리 안의 저장소 (벤치마크/부하 테스트용, 재시작하면 사라짐).
+
+    SQLiteBackend 와 같은 규칙으로 리스트를 인덱스 키 dict 로 저장하고, 읽을 때 복원한다.
+    """
+
+    def __init__(self):
+        self.root = {}
+        self.lock = threading.RLock()
+        self.listenLock = self.lock
+        self.listeners = []
+
+    @staticmethod
+    def normalizeValue(value):
+        if isinstance(value, list):
+            value = {str(i): v for i, v in enumerate(value)}
+        if isinstance(value, dict):
+            node = {}
+            for k, v in value.items():
+                v = MemoryBackend.normalizeValue(v)
+                if v is not None: node[str(k)] = v
+            return node or None
+        return value
+
+    def _write(self, path, value):
+        path = SQLiteBackend.normalize(path)
+        parts = path.split('/') if path else []
+        value = self.normalizeValue(copy.deepcopy(value))
+        if not parts:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        trail, node = [], self.root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            trail.append((node, part))
+            node = child
+        if value is None:
+            node.pop(parts[-1], None)
+            # 비어버린 상위 노드는 Firebase 처럼 제거
+            for parent, key in reversed(trail):
+                if parent[key]: break
+                del parent[key]
+        else:
+            node[parts[-1]] = value
+
+    def _node(self, path):
+        node = self.root
+        for part in SQLiteBackend.normalize(path).split('/'):
+            if not part: continue
+            if not isinstance(node, dict) or part not in node: return None
+            node = node[part]
+        return node
+
+    def get(self, path):
+        with self.lock:
+            node = self._node(path)
+            return SQLiteBackend.arrayify(copy.deepcopy(node)) if node is not None else None
+
+    def set(self, path, value):
+        with self.lock:
+            self._write(path, value)
+
+    def update(self, path, values):
+        path = SQLiteBackend.normalize(path)
+        with self.lock:
+            for key, value in values.items():
+                self._write(f"{path}/{key}", value)
+
+    def delete(self, path):
+        with self.lock:
+            self._write(path, None)
+
+    def compareAndUpdate(self, path, key, expected, values):
+        path = SQLiteBackend.normalize(path)
+        with self.lock:
+            if self._node(f"{path}/{key}") != expected: return False
+            for k, value in values.items():
+                self._write(f"{path}/{k}", value)
+            return True
+
+    def push(self, path, value):
+        key = generatePushKey()
+        path = SQLiteBackend.normalize(path)
+        with self.lock:
+            self._write(f"{path}/{key}", value)
+            listeners = list(self.listeners)
+        for prefix, callback in listeners:
+            fullPath = f"{path}/{key}"
+            if fullPath.startswith(prefix):
+                callback(fullPath[len(prefix):], copy.deepcopy(value))
+        return key
+
+    def pushMany(self, path, values):
+        path = SQLiteBackend.normalize(path)
+        keys = {relPath: generatePushKey() for relPath in values}
+        written = []
+        with self.lock:
+            for relPath, value in values.items():
+                fullPath = SQLiteBackend.normalize(f"{path}/{relPath}/{keys[relPath]}")
+                self._write(fullPath, value)
+                written.append((fullPath, value))
+            listeners = list(self.listeners)
+        for fullPath, value in written:
+            for prefix, callback in listeners:
+                if fullPath.startswith(prefix):
+                    callback(fullPath[len(prefix):], copy.deepcopy(value))
+        return keys
+
+    def list(self, path):
+        with self.lock:
+            node = self._node(path)
+            return sorted(node) if isinstance(node, dict) else []
+
+    def listen(self, path, callback):
+        entry = (f"{SQLiteBackend.normalize(path)}/", callback)
+        with self.lock:
+            self.listeners = self.listeners + [entry]
+        return Subscription(self, entry)
+
+    def query(self, path, after=None, before=None, limit=None):
+        with self.lock:
+            node = self._node(path)
+            if not isinstance(node, dict): return []
+            keys = [k for k in sorted(node) if (after is None or k > after) and (before is None or k < before)]
+            if limit is not None:
+                keys = keys[-limit:] if after is None else keys[:limit]
+            return [(k, SQLiteBackend.arrayify(copy.deepcopy(node[k]))) for k in keys]
+
+
+def createBackend(config):
+    backendType = getattr(config, 'STORAGE_BACKEND', 'firebase')
+    if backendType == 'sqlite':
+        return SQLiteBackend(getattr(config, 'SQLITE_DB_PATH', 'greycity.db'))
+    if backendType == 'memory':
+        return MemoryBackend()
+    if backendType == 'firebase_rest':
+        return FirebaseRestBackend(
+            config.FIREBASE_DB_URL,
+            keyPath=getattr(config, 'FIREBASE_KEY_PATH', None),
+            poolSize=getattr(config, 'FIREBASE_POOL_SIZE', 100),
+            timeout=getattr(config, 'FIREBASE_TIMEOUT', 10)
+        )
+    return FirebaseBackend(config.FIREBASE_KEY_PATH, config.FIREBASE_DB_URL)
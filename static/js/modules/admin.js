@@ -1,9 +1,14 @@
 document.addEventListener('DOMContentLoaded', () => {
-    let allUsers = {};
+    const PAGE_SIZE = 50;
+    let users = [];
+    let nextCursor = null;
+    let totalCount = 0;
     let currentUserId = null;
+    let currentUserName = '';
 
     const userListEl = document.getElementById('userList');
     const searchInput = document.getElementById('searchInput');
+    const sortSelect = document.getElementById('sortSelect');
     const userCountInfo = document.getElementById('userCountInfo');
     const editorTitle = document.getElementById('editorTitle');
     const jsonEditor = document.getElementById('jsonEditor');
@@ -27,10 +32,23 @@ document.addEventListener('DOMContentLoaded', () => {
     
     let composeContext = { type: null, targetId: null };
 
-    async function fetchUsers() {
+    async function fetchUsers(reset = true) {
+        if (reset) {
+            users = [];
+            nextCursor = null;
+        }
+        const params = new URLSearchParams({ q: searchInput.value.trim(), limit: PAGE_SIZE });
+        const [sort, order] = sortSelect.value.split(':');
+        params.set('sort', sort);
+        params.set('order', order || 'asc');
+        if (nextCursor) params.set('cursor', nextCursor);
+
         try {
-            const res = await fetch('/api/admin/users');
-            allUsers = await res.json();
+            const res = await fetch(`/api/admin/users?${params.toString()}`);
+            const page = await res.json();
+            users = users.concat(page.users || []);
+            nextCursor = page.nextCursor;
+            totalCount = page.total || 0;
             renderUserList();
         } catch(e) { 
             console.error(e); 
@@ -38,60 +56,72 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function renderUserList(filterText = '') {
+    function renderUserList() {
         userListEl.innerHTML = '';
-        const lowerFilter = filterText.toLowerCase();
-        let count = 0;
         const now = Date.now() / 1000; 
 
-        for (const [userId, data] of Object.entries(allUsers)) {
-            const username = (data.username || 'Unknown').toLowerCase();
-            const email = (data.email || 'No Email Registered').toLowerCase();
-            const uid = userId.toLowerCase();
+        users.forEach(data => {
+            const userId = data.id;
+            const div = document.createElement('div');
+            div.className = 'user-item';
+            if (userId === currentUserId) div.classList.add('active');
+            
+            let banTag = "";
+            if (data.banned_until && data.banned_until > now) {
+                let remainDays = Math.ceil((data.banned_until - now) / 86400);
+                banTag = `<span style="color:#ff9900; font-weight:bold; font-size:10px; border:1px solid #ff9900; padding:2px 4px; border-radius:3px; margin-left:5px;">[정지됨: ${remainDays}일 남음]</span>`;
+            }
 
-            if (username.includes(lowerFilter) || email.includes(lowerFilter) || uid.includes(lowerFilter)) {
-                count++;
-                const div = document.createElement('div');
-                div.className = 'user-item';
-                if (userId === currentUserId) div.classList.add('active');
-                
-                let banTag = "";
-                if (data.banned_until && data.banned_until > now) {
-                    let remainDays = Math.ceil((data.banned_until - now) / 86400);
-                    banTag = `<span style="color:#ff9900; font-weight:bold; font-size:10px; border:1px solid #ff9900; padding:2px 4px; border-radius:3px; margin-left:5px;">[정지됨: ${remainDays}일 남음]</span>`;
-                }
+            div.innerHTML = `
+                <div class="user-item-name">
+                    <span>${data.username || 'Unknown'} ${banTag}</span>
+                    <span style="font-size:10px; color:#555;">Lv.${data.level || 1}</span>
+                </div>
+                <div class="user-item-stats">
+                    ID: ${userId} <br>
+                    STATUS: ${data.status || 'normal'}
+                </div>
+            `;
+            div.addEventListener('click', () => selectUser(data, div));
+            userListEl.appendChild(div);
+        });
 
-                div.innerHTML = `
-                    <div class="user-item-name">
-                        <span>${data.username || 'Unknown'} ${banTag}</span>
-                        <span style="font-size:10px; color:#555;">Lv.${data.level || 1}</span>
-                    </div>
-                    <div class="user-item-email">✉️ ${data.email || 'No Email'}</div>
-                    <div class="user-item-stats">
-                        ID: ${userId} <br>
-                        HP: <span style="color:#ff2a2a">${data.hp || 0}</span> / ${data.maxHp || 0} | 🫀: ${data.heart_fragments || 0}
-                    </div>
-                `;
-                div.addEventListener('click', () => selectUser(userId, div));
-                userListEl.appendChild(div);
-            }
+        if (nextCursor) {
+            const more = document.createElement('button');
+            more.className = 'panel-btn return-btn';
+            more.style.width = '100%';
+            more.innerText = '더 불러오기';
+            more.addEventListener('click', () => fetchUsers(false));
+            userListEl.appendChild(more);
         }
 
-        userCountInfo.innerText = `총 ${count}명의 생존자 발견`;
-        if (count === 0) {
+        userCountInfo.innerText = `총 ${totalCount}명의 생존자 발견 (${users.length}명 표시)`;
+        if (users.length === 0) {
             userListEl.innerHTML = `<div style="text-align:center; margin-top:30px; color:#555;">검색 결과가 없습니다.</div>`;
         }
     }
 
-    searchInput.addEventListener('input', (e) => renderUserList(e.target.value));
+    // 입력이 멈춘 뒤에만 서버 검색 요청
+    let searchTimer = null;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => fetchUsers(true), 300);
+    });
+    sortSelect.addEventListener('change', () => fetchUsers(true));
 
-    function selectUser(userId, el) {
+    async function selectUser(summary, el) {
         document.querySelectorAll('.user-item').forEach(d => d.classList.remove('active'));
         el.classList.add('active');
         
-        currentUserId = userId;
-        editorTitle.innerText = `선택된 유저 : ${allUsers[userId].username}`;
-        jsonEditor.value = JSON.stringify(allUsers[userId], null, 4);
+        currentUserId = summary.id;
+        currentUserName = summary.username;
+        editorTitle.innerText = `선택된 유저 : ${summary.username}`;
+        jsonEditor.value = '불러오는 중...';
+        jsonEditor.disabled = true;
+
+        const res = await fetch(`/api/admin/user/${summary.id}`);
+        if (!res.ok || currentUserId !== summary.id) return;
+        jsonEditor.value = JSON.stringify(await res.json(), null, 4);
         jsonEditor.disabled = false;
         
         btnSave.disabled = false;
@@ -167,7 +197,7 @@ document.addEventListener('DOMContentLoaded', () => {
     
     btnSendMessage.addEventListener('click', () => {
         if(!currentUserId) return;
-        openComposeModal('message', currentUserId, allUsers[currentUserId].username);
+        openComposeModal('message', currentUserId, currentUserName);
     });
 
     btnSave.addEventListener('click', async () => {
@@ -187,8 +217,7 @@ document.addEventListener('DOMContentLoaded', () => {
             if(result.success) {
                 statusMsg.innerText = "업데이트 완료!";
                 statusMsg.style.color = "#00e5ff";
-                allUsers[currentUserId] = newData; 
-                renderUserList(searchInput.value); 
+                fetchUsers(true); 
             }
         } catch(e) {
             statusMsg.innerText = "JSON 형식 오류";
@@ -199,7 +228,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     btnForceLogout.addEventListener('click', async () => {
         if(!currentUserId) return;
-        if(confirm(`[ ${allUsers[currentUserId].username} ] 유저를 즉시 로그아웃 시키겠습니까?\n접속 중이라면 즉시 메인 화면으로 튕겨납니다.`)) {
+        if(confirm(`[ ${currentUserName} ] 유저를 즉시 로그아웃 시키겠습니까?\n접속 중이라면 즉시 메인 화면으로 튕겨납니다.`)) {
             statusMsg.innerText = "로그아웃 처리 중...";
             statusMsg.style.color = "#ff9900";
             const res = await fetch(`/api/admin/user/${currentUserId}/logout`, { method: 'POST' });
@@ -207,13 +236,15 @@ document.addEventListener('DOMContentLoaded', () => {
             if(result.success) {
                 statusMsg.innerText = "강제 로그아웃 명령 전송됨!";
                 statusMsg.style.color = "#00e5ff";
+            } else {
+                statusMsg.innerText = `강제 로그아웃 실패 (${result.result || res.status})`;
             }
         }
     });
 
     btnSuspend.addEventListener('click', async () => {
         if(!currentUserId) return;
-        let days = prompt(`[ ${allUsers[currentUserId].username} ] 유저를 며칠 동안 정지하시겠습니까? (숫자만 입력)\n※ 정지 해제를 원하시면 0 을 입력하세요.`);
+        let days = prompt(`[ ${currentUserName} ] 유저를 며칠 동안 정지하시겠습니까? (숫자만 입력)\n※ 정지 해제를 원하시면 0 을 입력하세요.`);
         if (days !== null && !isNaN(days) && days.trim() !== "") {
             days = parseInt(days);
             statusMsg.innerText = "정지 처리 중...";
@@ -229,6 +260,8 @@ document.addEventListener('DOMContentLoaded', () => {
                 statusMsg.innerText = "계정 정지 적용됨!";
                 statusMsg.style.color = "#00e5ff";
                 fetchUsers(); 
+            } else {
+                statusMsg.innerText = `계정 정지 실패 (${result.result || res.status})`;
             }
         }
     });
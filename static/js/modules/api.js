@@ -2,25 +2,96 @@
  * 서버와의 비동기 통신을 담당하는 모듈
  */
 export class GameAPI {
+    static catalog = null;
+    static catalogVersion = null;
+    // 마지막으로 받은 로그 줄의 키: 행동 응답에는 이 키 이후의 로그만 실려 온다
+    static logCursor = null;
+
+    static trackLogCursor(result) {
+        if (result && result.logCursor !== undefined) GameAPI.logCursor = result.logCursor;
+        return result;
+    }
+
+    // 정적 게임 데이터는 버전이 바뀔 때만 다시 받아온다
+    static async getCatalog(version) {
+        if (GameAPI.catalog && GameAPI.catalogVersion === version) return GameAPI.catalog;
+        try {
+            const response = await fetch(`/api/catalog?v=${encodeURIComponent(version)}`);
+            if (response.ok) {
+                GameAPI.catalog = await response.json();
+                GameAPI.catalogVersion = version;
+            } else if (!GameAPI.catalog) {
+                // 이 워커가 아직 해당 버전을 읽지 않은 경우: 현재 본문을 받아 두고 다음 호출에서 다시 맞춘다
+                const current = await fetch('/api/catalog');
+                if (current.ok) GameAPI.catalog = await current.json();
+            }
+            return GameAPI.catalog;
+        } catch (error) {
+            console.error("API Catalog Error:", error);
+            return GameAPI.catalog;
+        }
+    }
+
     static async loadGame() {
         try {
             const response = await fetch('/api/loadGame', { method: 'POST' });
-            return await response.json();
+            return GameAPI.trackLogCursor(await response.json());
         } catch (error) {
             console.error("API Load Error:", error);
             return null;
         }
     }
 
+    // 짧은 시간 안에 들어온 입력을 모아 /api/action/batch 한 번으로 전송
+    static BATCH_WINDOW_MS = 120;
+    static BATCH_LIMIT = 20;
+    static pendingActions = [];
+    static batchTimer = null;
+
+    static queueAction(type, target = null) {
+        return new Promise(resolve => {
+            GameAPI.pendingActions.push({ action: { type: type, target: target }, resolve: resolve });
+            if (GameAPI.pendingActions.length >= GameAPI.BATCH_LIMIT) {
+                GameAPI.flushActions();
+            } else if (!GameAPI.batchTimer) {
+                GameAPI.batchTimer = setTimeout(() => GameAPI.flushActions(), GameAPI.BATCH_WINDOW_MS);
+            }
+        });
+    }
+
+    // 배치의 최종 응답은 마지막 입력의 Promise 로만 전달되고, 나머지는 null 로 끝난다
+    static async flushActions() {
+        clearTimeout(GameAPI.batchTimer);
+        GameAPI.batchTimer = null;
+        const queued = GameAPI.pendingActions.splice(0, GameAPI.BATCH_LIMIT);
+        if (queued.length === 0) return;
+        if (GameAPI.pendingActions.length > 0) {
+            GameAPI.batchTimer = setTimeout(() => GameAPI.flushActions(), GameAPI.BATCH_WINDOW_MS);
+        }
+
+        let result = null;
+        try {
+            const response = await fetch('/api/action/batch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ actions: queued.map(q => q.action), logAfter: GameAPI.logCursor })
+            });
+            result = GameAPI.trackLogCursor(await response.json());
+        } catch (error) {
+            console.error("API Batch Error:", error);
+        }
+        queued.forEach((q, i) => q.resolve(i === queued.length - 1 ? result : null));
+    }
+
     static async sendAction(type, target = null) {
         try {
-            const payload = { type: type, target: target };
+            const payload = { type: type, target: target, logAfter: GameAPI.logCursor };
             const response = await fetch('/api/action', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(payload)
             });
-            return await response.json();
+            return GameAPI.trackLogCursor(await response.json());
         } catch (error) {
             console.error("API Action Error:", error);
             return null;
@@ -1,4 +1,5 @@
 import { UIManager } from './ui.js';
+import { GameAPI } from './api.js';
 
 export class Main {
     constructor() {
@@ -25,7 +26,8 @@ export class Main {
                 throw new Error(`HTTP Error: ${res.status}`);
             }
 
-            const data = await res.json();
+            const data = GameAPI.trackLogCursor(await res.json());
+            await this.syncCatalog(data);
             this.ui.update(data, (type, target) => this.handleAction(type, target));
             
         } catch (e) {
@@ -35,16 +37,26 @@ export class Main {
         }
     }
 
+    // 응답의 카탈로그 버전이 바뀌었을 때만 정적 게임 데이터 재요청
+    async syncCatalog(data) {
+        if (!data || !data.catalogVersion) return;
+        const catalog = await GameAPI.getCatalog(data.catalogVersion);
+        if (catalog) this.ui.setCatalog(catalog);
+    }
+
     // 사용자 행동 처리
     async handleAction(type, target) {
         try {
-            const res = await fetch('/api/action', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ type, target })
-            });
-
-            const data = await res.json();
+            // 연타 입력은 GameAPI 가 배치로 묶어 전송하며, 배치 마지막 입력만 결과를 받는다
+            const data = await GameAPI.queueAction(type, target);
+            if (!data) return;
+            if (data.error) {
+                if (data.error === 'Force Logout' || data.error === 'Unauthorized') window.location.href = '/';
+                // 다른 탭/기기의 입력과 충돌한 경우 최신 상태로 다시 그린다
+                if (data.error === 'Conflict') await this.loadGame();
+                return;
+            }
+            await this.syncCatalog(data);
             this.ui.update(data, (t, tgt) => this.handleAction(t, tgt));
 
         } catch (e) {
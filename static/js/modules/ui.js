@@ -45,6 +45,8 @@ export class UIManager {
         this.currentInvCategory = 'all';
         this.latestData = null;
         this.latestActionCallback = null;
+        this.logLines = []; // [키, 문장] 최근 로그 (서버 응답에는 새 줄만 온다)
+        this.catalog = { allLocations: {}, itemData: {}, enemyData: {} };
 
         document.querySelectorAll('.inv-tab').forEach(tab => {
             tab.addEventListener('click', (e) => {
@@ -54,17 +56,22 @@ export class UIManager {
                 this.currentInvCategory = target.dataset.category;
                 
                 if (this.latestData) {
-                    this.renderInventory(this.latestData.userData, this.latestData.itemData, this.latestActionCallback, this.latestData.allLocations);
+                    this.renderInventory(this.latestData.userData, this.catalog.itemData, this.latestActionCallback, this.catalog.allLocations);
                 }
             });
         });
     }
 
+    setCatalog(catalog) {
+        this.catalog = catalog;
+    }
+
     update(data, actionCallback) {
         this.latestData = data;
         this.latestActionCallback = actionCallback;
 
-        const { userData, stats, locationInfo, connectedLocations, allLocations, itemData, enemyData, archiveData } = data;
+        const { userData, stats, locationInfo, connectedLocations, archiveData } = data;
+        const { allLocations, itemData, enemyData } = this.catalog;
 
         if (userData.status === 'combat') {
              this.els.locName.innerHTML = `<span class="status-combat-text">⚠ [ BATTLE ] ${userData.combatData.name}</span>`;
@@ -95,7 +102,8 @@ export class UIManager {
         const expPercent = Math.min((userData.exp / userData.maxExp) * 100, 100);
         this.els.expBar.style.width = `${expPercent}%`;
 
-        this.els.gameLog.innerHTML = (userData.logs || []).join('<br>');
+        this.mergeLogs(data);
+        this.els.gameLog.innerHTML = this.logLines.map(line => line[1]).join('<br>');
         setTimeout(() => {
             this.els.gameLog.scrollTop = this.els.gameLog.scrollHeight;
         }, 10);
@@ -107,6 +115,19 @@ export class UIManager {
         this.renderUpgrade(userData, actionCallback);
     }
 
+    static LOG_LIMIT = 30;
+
+    // logReset 이면 전체 교체, 아니면 가진 줄보다 뒤의 키만 덧붙인다 (키는 시간순)
+    mergeLogs(data) {
+        if (!Array.isArray(data.logs)) return;
+        if (data.logReset) this.logLines = [];
+        for (const line of data.logs) {
+            const last = this.logLines[this.logLines.length - 1];
+            if (!last || line[0] > last[0]) this.logLines.push(line);
+        }
+        this.logLines = this.logLines.slice(-UIManager.LOG_LIMIT);
+    }
+
     renderUpgrade(userData, callback) {
         if (!this.els.upgradeList) return;
         
@@ -179,8 +200,8 @@ export class UIManager {
 
         if (userData.status === 'dead') {
             const fragCost = (userData.level || 1) * 5;
-            const inventory = userData.inventory || [];
-            const hasKit = inventory.includes('first_aid_kit');
+            const inventory = userData.inventory || {};
+            const hasKit = (inventory['first_aid_kit'] || 0) > 0;
             const fragments = userData.heart_fragments || 0;
 
             const fragBtn = document.createElement('button');
@@ -280,7 +301,8 @@ export class UIManager {
 
     renderInventory(userData, itemData, callback, allLocations) {
         this.els.invList.innerHTML = '';
-        const allItems = [...userData.inventory];
+        // 인벤토리는 { itemKey: 개수 } 형태
+        const allItems = Object.entries(userData.inventory || {});
         
         let filteredItems = [];
         let showEquipped = false;
@@ -294,12 +316,12 @@ export class UIManager {
             }
         }
 
-        allItems.forEach(itemKey => {
+        allItems.forEach(([itemKey, count]) => {
             const baseKey = itemKey.split(':')[0];
             const item = itemData[baseKey];
-            if (item) {
+            if (item && count > 0) {
                 if (this.currentInvCategory === 'all' || item.type === this.currentInvCategory) {
-                    filteredItems.push({ key: itemKey, data: item });
+                    filteredItems.push({ key: itemKey, data: item, count: count });
                 }
             }
         });
@@ -342,7 +364,8 @@ export class UIManager {
             else if (item.type === 'important') dotColor = '#ffd700';
             else if (item.type === 'material') dotColor = '#b0bec5';
 
-            el.innerHTML = `<span><span style="color:${dotColor}; font-size:10px; margin-right:6px;">■</span><span class="name">${item.name}${lvlStr}</span></span>`;
+            const countStr = filtered.count > 1 ? ` <span style="color:#888; font-size:11px;">x${filtered.count}</span>` : '';
+            el.innerHTML = `<span><span style="color:${dotColor}; font-size:10px; margin-right:6px;">■</span><span class="name">${item.name}${lvlStr}${countStr}</span></span>`;
             
             el.onclick = () => this.openItemModal(item, itemKey, callback, false, allLocations, userData, itemData);
             this.els.invList.appendChild(el);
@@ -511,10 +534,10 @@ export class UIManager {
             const matNeeded = (lvl + 1) * 2;
             const fragNeeded = (lvl + 1) * 5;
             
-            const matCount = userData.inventory.filter(i => {
+            const matCount = Object.entries(userData.inventory || {}).reduce((sum, [i, count]) => {
                 const bKey = i.split(':')[0];
-                return itemData[bKey] && itemData[bKey].type === 'material';
-            }).length;
+                return (itemData[bKey] && itemData[bKey].type === 'material') ? sum + count : sum;
+            }, 0);
             const fragCount = userData.heart_fragments || 0;
             const canUpgrade = matCount >= matNeeded && fragCount >= fragNeeded;
             
@@ -735,65 +758,137 @@ document.addEventListener('DOMContentLoaded', () => {
         return `${d.getFullYear()}.${String(d.getMonth()+1).padStart(2,'0')}.${String(d.getDate()).padStart(2,'0')} ${String(d.getHours()).padStart(2,'0')}:${String(d.getMinutes()).padStart(2,'0')}`;
     };
 
-    if (btnOpenNotice) {
-        btnOpenNotice.addEventListener('click', async () => {
-            noticeList.innerHTML = '<div class="comm-empty">Loading...</div>';
-            window.openModalAnimation('noticeModal');
-            
-            try {
-                const res = await fetch('/api/notices');
-                const data = await res.json();
-                noticeList.innerHTML = '';
-                
-                const keys = Object.keys(data).reverse();
-                if(keys.length === 0) {
-                    noticeList.innerHTML = '<div class="comm-empty">등록된 공지사항이 없습니다.</div>';
-                    return;
-                }
-                
-                keys.forEach(k => {
-                    const n = data[k];
-                    // 마크다운 파싱 (줄바꿈 허용)
-                    const parsedContent = typeof marked !== 'undefined' ? marked.parse(n.content, {breaks: true}) : n.content;
-                    noticeList.innerHTML += `
-                        <div class="comm-item">
-                            <div class="comm-item-title"><span>📢 ${n.title}</span> <span class="comm-item-date">${formatDate(n.timestamp)}</span></div>
-                            <div class="comm-item-content">${parsedContent}</div>
-                        </div>
-                    `;
-                });
-            } catch(e) { noticeList.innerHTML = '<div class="comm-empty text-danger">통신 오류가 발생했습니다.</div>'; }
+    // 채널별로 받아온 페이지를 합쳐 두고, 오래된 항목은 "더 보기"로, 새 항목은 SSE 로 받는다
+    const channels = {
+        notice: { url: '/api/notices', btn: btnOpenNotice, list: noticeList, modal: 'noticeModal', items: null, hasMore: false, readCursor: null,
+                  icon: '📢', itemClass: 'comm-item', titleClass: 'comm-item-title', empty: '등록된 공지사항이 없습니다.' },
+        message: { url: '/api/messages', btn: btnOpenMessage, list: messageList, modal: 'messageModal', items: null, hasMore: false, readCursor: null,
+                   icon: '✉️', itemClass: 'comm-item comm-item-msg', titleClass: 'comm-item-title msg-text', empty: '수신된 메세지가 없습니다.' }
+    };
+
+    const newestKey = (ch) => Object.keys(ch.items || {}).sort().pop();
+
+    const fetchPage = async (ch, before = null) => {
+        const params = new URLSearchParams({ limit: 20 });
+        if (before) params.set('before', before);
+        const res = await fetch(`${ch.url}?${params.toString()}`);
+        const page = await res.json();
+        ch.items = Object.assign(ch.items || {}, page.items || {});
+        if (!before) ch.readCursor = page.readCursor;
+        ch.hasMore = page.hasMore;
+    };
+
+    const updateBadge = (ch) => {
+        const newest = newestKey(ch);
+        if (ch.btn) ch.btn.classList.toggle('comm-has-new', !!newest && (!ch.readCursor || newest > ch.readCursor));
+    };
+
+    const markRead = (ch) => {
+        const newest = newestKey(ch);
+        if (!newest || (ch.readCursor && newest <= ch.readCursor)) return;
+        ch.readCursor = newest;
+        updateBadge(ch);
+        fetch(`${ch.url}/read`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ key: newest })
+        }).catch(() => {});
+    };
+
+    const renderChannel = (ch) => {
+        const data = ch.items || {};
+        ch.list.innerHTML = '';
+        
+        const keys = Object.keys(data).sort().reverse();
+        if(keys.length === 0) {
+            ch.list.innerHTML = `<div class="comm-empty">${ch.empty}</div>`;
+            return;
+        }
+        
+        keys.forEach(k => {
+            const n = data[k];
+            // 마크다운 파싱 (줄바꿈 허용)
+            const parsedContent = typeof marked !== 'undefined' ? marked.parse(n.content, {breaks: true}) : n.content;
+            ch.list.innerHTML += `
+                <div class="${ch.itemClass}">
+                    <div class="${ch.titleClass}"><span>${ch.icon} ${n.title}</span> <span class="comm-item-date">${formatDate(n.timestamp)}</span></div>
+                    <div class="comm-item-content">${parsedContent}</div>
+                </div>
+            `;
         });
-    }
 
-    if (btnOpenMessage) {
-        btnOpenMessage.addEventListener('click', async () => {
-            messageList.innerHTML = '<div class="comm-empty">Loading...</div>';
-            window.openModalAnimation('messageModal');
-            
-            try {
-                const res = await fetch('/api/messages');
-                const data = await res.json();
-                messageList.innerHTML = '';
-                
-                const keys = Object.keys(data).reverse();
-                if(keys.length === 0) {
-                    messageList.innerHTML = '<div class="comm-empty">수신된 메세지가 없습니다.</div>';
-                    return;
-                }
-                
-                keys.forEach(k => {
-                    const m = data[k];
-                    // 마크다운 파싱 (줄바꿈 허용)
-                    const parsedContent = typeof marked !== 'undefined' ? marked.parse(m.content, {breaks: true}) : m.content;
-                    messageList.innerHTML += `
-                        <div class="comm-item comm-item-msg">
-                            <div class="comm-item-title msg-text"><span>✉️ ${m.title}</span> <span class="comm-item-date">${formatDate(m.timestamp)}</span></div>
-                            <div class="comm-item-content">${parsedContent}</div>
-                        </div>
-                    `;
-                });
-            } catch(e) { messageList.innerHTML = '<div class="comm-empty text-danger">통신 오류가 발생했습니다.</div>'; }
+        if (ch.hasMore) {
+            const more = document.createElement('button');
+            more.className = 'settings-btn comm-more-btn';
+            more.innerText = '이전 항목 더 보기';
+            more.addEventListener('click', async () => {
+                more.disabled = true;
+                try {
+                    await fetchPage(ch, keys[keys.length - 1]);
+                    renderChannel(ch);
+                } catch(e) { more.disabled = false; }
+            });
+            ch.list.appendChild(more);
+        }
+    };
+
+    Object.values(channels).forEach(ch => {
+        if (!ch.btn) return;
+        ch.btn.addEventListener('click', async () => {
+            window.openModalAnimation(ch.modal);
+            if (!ch.items) {
+                ch.list.innerHTML = '<div class="comm-empty">Loading...</div>';
+                try { await fetchPage(ch); }
+                catch(e) { ch.list.innerHTML = '<div class="comm-empty text-danger">통신 오류가 발생했습니다.</div>'; return; }
+            }
+            renderChannel(ch);
+            markRead(ch);
         });
+
+        // 접속 시 최신 페이지만 받아 안 읽은 항목이 있으면 표시
+        fetchPage(ch).then(() => updateBadge(ch)).catch(() => {});
+    });
+
+    const receiveItems = (ch, items) => {
+        if (!items || Object.keys(items).length === 0) return;
+        ch.items = Object.assign(ch.items || {}, items);
+        updateBadge(ch);
+        if (ch.list && ch.list.offsetParent !== null) {
+            renderChannel(ch);
+            markRead(ch);
+        }
+    };
+
+    // SSE 를 쓸 수 없으면(서버가 204 로 거절하거나 브라우저 미지원) 마지막 키 이후 항목만 주기적으로 받는다
+    let pollTimer = null;
+    const startPolling = () => {
+        if (pollTimer) return;
+        pollTimer = setInterval(() => {
+            if (document.hidden) return;
+            Object.values(channels).forEach(async ch => {
+                if (!ch.btn || !ch.items) return;
+                const newest = newestKey(ch);
+                const params = new URLSearchParams({ limit: 20 });
+                if (newest) params.set('after', newest);
+                try {
+                    const res = await fetch(`${ch.url}?${params.toString()}`);
+                    if (res.ok) receiveItems(ch, (await res.json()).items);
+                } catch(e) {}
+            });
+        }, 30000);
+    };
+
+    if (btnOpenNotice || btnOpenMessage) {
+        if (window.EventSource) {
+            const stream = new EventSource('/api/stream');
+            ['notice', 'message'].forEach(type => {
+                stream.addEventListener(type, (e) => receiveItems(channels[type], JSON.parse(e.data)));
+            });
+            stream.addEventListener('error', () => {
+                if (stream.readyState === EventSource.CLOSED) startPolling();
+            });
+        } else {
+            startPolling();
+        }
     }
 });
\ No newline at end of file
@@ -0,0 +1,19 @@
+import sys
+import types
+
+# 저장소는 메모리 백엔드로 고정한다 (bench/loadTest.py 와 같은 방식).
+# 로컬 config.py 가 없는 환경에서는 테스트용 Config 모듈을 만든다
+try:
+    from config import Config
+except ImportError:
+    class Config:
+        SECRET_KEY = 'test'
+        SendEmail = "{code}"
+        DISCORD_API_BASE_URL = 'http://127.0.0.1:9'
+        DISCORD_CLIENT_ID = DISCORD_CLIENT_SECRET = DISCORD_REDIRECT_URI = ''
+        ADMIN_ACCOUNTS = []
+    sys.modules['config'] = types.SimpleNamespace(Config=Config)
+
+Config.STORAGE_BACKEND = 'memory'
+Config.DATA_RELOAD_INTERVAL = 0
+Config.METRICS_DIR = None
@@ -0,0 +1,23 @@
+import pytest
+
+from src.balanceSim import buildPlayer, crossCheck, simulateFights
+from src.gameEngine import GameEngine
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return GameEngine()
+
+
+# 초반/중반/보스급 적을 고루 골라 벡터화 시뮬레이터가 스칼라 엔진과 같은 결과를 내는지 본다
+@pytest.mark.parametrize('enemyId', ['mutated_rat', 'wild_dog', 'security_bot', 'armored_infected',
+                                     'failed_alpha', 'origin_core'])
+def test_vectorized_fights_match_scalar_engine(engine, enemyId):
+    player = buildPlayer(engine, level=10)
+    assert crossCheck(engine, player, enemyId, n=1000, seed=0) == []
+
+
+def test_simulate_fights_is_reproducible_with_seed(engine):
+    player = buildPlayer(engine)
+    assert simulateFights(engine, player, 'mutated_rat', n=5000, seed=7) == \
+        simulateFights(engine, player, 'mutated_rat', n=5000, seed=7)
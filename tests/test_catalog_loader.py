@@ -0,0 +1,38 @@
+import json
+import shutil
+
+import pytest
+
+from src.catalogLoader import DEFAULT_DATA_DIR, loadGameData
+from src.gameEngine import GameEngine
+
+
+@pytest.fixture
+def dataDir(tmp_path):
+    target = tmp_path / 'data'
+    shutil.copytree(DEFAULT_DATA_DIR, target)
+    return target
+
+
+def editEntry(dataDir, fileName, edit):
+    path = dataDir / fileName
+    data = json.loads(path.read_text(encoding='utf-8'))
+    edit(data)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+def test_wrong_field_type_names_file_and_field(dataDir):
+    itemKey = next(iter(json.loads((dataDir / 'items.json').read_text(encoding='utf-8'))))
+    editEntry(dataDir, 'items.json', lambda items: items[itemKey].update(dropRate='0.5'))
+    with pytest.raises(ValueError) as e:
+        loadGameData(str(dataDir))
+    assert f"items.{itemKey}.dropRate: must be a number, got str" in str(e.value)
+
+
+def test_reload_keeps_current_snapshot_on_invalid_data(dataDir):
+    engine = GameEngine(str(dataDir))
+    before = engine.current
+    editEntry(dataDir, 'enemies.json', lambda enemies: enemies.update(broken={'hp': [1]}))
+    ok, error = engine.reload()
+    assert not ok and 'enemies.broken.hp' in error
+    assert engine.current is before
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+from src.metrics import Metrics
+
+
+def deadPid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def writeWorkerSnapshot(dirPath, pid, value):
+    worker = Metrics()
+    worker.inc('greycity_deaths_total', value=value)
+    worker.observe('greycity_storage_seconds', 0.01, {"op": "get"})
+    with open(os.path.join(dirPath, f"{pid}-{value:x}-abcdef.json"), 'w') as f:
+        json.dump(worker.snapshot(), f)
+
+
+def test_dead_worker_snapshots_are_folded_into_archive(tmp_path):
+    registry = Metrics()
+    registry.configure(str(tmp_path))
+    registry.inc('greycity_deaths_total')
+    pid = deadPid()
+    writeWorkerSnapshot(tmp_path, pid, 2)
+    writeWorkerSnapshot(tmp_path, pid, 3)
+
+    assert 'greycity_deaths_total 6' in registry.render()
+    names = sorted(os.listdir(tmp_path))
+    assert Metrics.ARCHIVE_FILE in names and not any(n.startswith(f"{pid}-") for n in names)
+
+    # 다음 재시작의 죽은 워커도 같은 보관 파일에 더해진다
+    writeWorkerSnapshot(tmp_path, deadPid(), 4)
+    rendered = registry.render()
+    assert 'greycity_deaths_total 10' in rendered
+    assert 'greycity_storage_seconds_count{op="get"} 3' in rendered
+    assert len([n for n in os.listdir(tmp_path) if n.endswith('.json')]) == 2
+
+
+def test_files_merged_but_not_yet_removed_are_not_counted_twice(tmp_path):
+    registry = Metrics()
+    registry.configure(str(tmp_path))
+    pid = deadPid()
+    writeWorkerSnapshot(tmp_path, pid, 2)
+    registry.render()
+    # 보관 파일을 쓴 뒤 원본을 지우기 전에 멈춘 경우
+    writeWorkerSnapshot(tmp_path, pid, 2)
+    assert 'greycity_deaths_total 2' in registry.render()
+    assert not any(n.startswith(f"{pid}-") for n in os.listdir(tmp_path))
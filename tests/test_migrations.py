@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+from src.migrations import (SCHEMA_VERSION, backfillUserIndex, migrateAllUsers, migrateCountedInventory,
+                            migrateUniqueWeaponKeys, migrateUserData)
+from src.storageBackend import MemoryBackend
+
+ITEMS = {
+    'rusty_pipe': {'type': 'weapon'},
+    'bandage': {'type': 'consumable'},
+}
+
+
+def makeEngine():
+    return SimpleNamespace(items=ITEMS, fillDefaults=lambda userData: None)
+
+
+def test_unique_weapon_keys_rekeys_weapons_only():
+    userData = {
+        'inventory': ['rusty_pipe', 'bandage', 'rusty_pipe:abcd1234', None],
+        'equipment': {'weapon': 'rusty_pipe'},
+        'weapon_levels': {'rusty_pipe': 3},
+    }
+    migrateUniqueWeaponKeys(makeEngine(), userData)
+
+    inv = userData['inventory']
+    assert inv[0].startswith('rusty_pipe:') and inv[1] == 'bandage'
+    assert inv[2] == 'rusty_pipe:abcd1234' and inv[3] is None
+    # 장착 무기는 인벤토리와 다른 개체 키를 받고, 기존 강화 수치는 먼저 바뀐 키로 옮겨진다
+    weapon = userData['equipment']['weapon']
+    assert weapon.startswith('rusty_pipe:') and weapon != inv[0]
+    assert userData['weapon_levels'] == {inv[0]: 3}
+
+
+def test_counted_inventory_counts_and_skips_empty_slots():
+    userData = {'inventory': ['bandage', 'bandage', None, 'rusty_pipe:abcd1234', '']}
+    migrateCountedInventory(makeEngine(), userData)
+    assert userData['inventory'] == {'bandage': 2, 'rusty_pipe:abcd1234': 1}
+
+    # 이미 개수 형식이면 그대로 둔다
+    migrateCountedInventory(makeEngine(), userData)
+    assert userData['inventory'] == {'bandage': 2, 'rusty_pipe:abcd1234': 1}
+
+
+def test_migrate_user_data_applies_pending_steps_in_order():
+    userData = {'inventory': ['rusty_pipe', 'bandage'], 'equipment': {}, 'weapon_levels': {}}
+    assert migrateUserData(makeEngine(), userData) is True
+    assert userData['schemaVersion'] == SCHEMA_VERSION
+    keys = sorted(userData['inventory'])
+    assert keys[0] == 'bandage' and keys[1].startswith('rusty_pipe:')
+
+
+def test_migrate_user_data_skips_completed_versions():
+    # v1 까지 끝난 문서는 무기 키를 다시 만들지 않고 v2 만 적용한다
+    userData = {'schemaVersion': 1, 'inventory': ['rusty_pipe', 'rusty_pipe']}
+    assert migrateUserData(makeEngine(), userData) is True
+    assert userData['inventory'] == {'rusty_pipe': 2}
+
+    current = {'schemaVersion': SCHEMA_VERSION, 'inventory': ['rusty_pipe']}
+    assert migrateUserData(makeEngine(), current) is False
+    assert current['inventory'] == ['rusty_pipe']
+
+
+class CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def get(self, path):
+        self.reads.append(('get', path))
+        return super().get(path)
+
+    def query(self, path, after=None, before=None, limit=None):
+        self.reads.append(('query', path))
+        return super().query(path, after=after, before=before, limit=limit)
+
+
+def test_migrate_all_users_reads_one_range_per_batch():
+    backend = CountingBackend()
+    for i in range(5):
+        backend.set(f'users/gc-{i}', {'username': f'user_{i}', 'level': 1, 'inventory': ['bandage']})
+    backend.set('users/gc-9', {'username': 'done', 'schemaVersion': SCHEMA_VERSION, 'inventory': {}})
+    fbManager = SimpleNamespace(backend=backend,
+                                buildUserIndexEntry=lambda data: {'username': data['username']})
+
+    assert migrateAllUsers(fbManager, makeEngine(), batchSize=4) == 5
+    assert backend.reads == [('query', 'users')] * 2
+    assert backend.get('users/gc-3/inventory') == {'bandage': 1}
+    assert backend.get('user_index/gc-0') == {'username': 'user_0'}
+    assert backend.get('user_index/gc-9') is None
+
+
+def test_backfill_user_index_fills_missing_and_partial_entries():
+    backend = CountingBackend()
+    backend.set('users/gc-0', {'username': 'indexed', 'level': 2})
+    backend.set('users/gc-1', {'username': 'legacy', 'level': 5})
+    backend.set('users/gc-2', {'username': 'partial', 'level': 7})
+    backend.set('user_index/gc-0', {'username': 'indexed', 'level': 2})
+    # CAS 기록이 남긴 부분 항목 (username 없음)
+    backend.set('user_index/gc-2', {'level': 7})
+    fbManager = SimpleNamespace(backend=backend,
+                                buildUserIndexEntry=lambda data: {k: data[k] for k in ('username', 'level')})
+
+    assert backfillUserIndex(fbManager, batchSize=2) == 2
+    assert backend.get('user_index') == {
+        'gc-0': {'username': 'indexed', 'level': 2},
+        'gc-1': {'username': 'legacy', 'level': 5},
+        'gc-2': {'username': 'partial', 'level': 7},
+    }
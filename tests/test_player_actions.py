@@ -0,0 +1,108 @@
+import pytest
+
+import src.routes as routes
+from app import app
+
+USER_ID = 'gc-test'
+
+
+@pytest.fixture
+def player():
+    routes.playerCache.discard(USER_ID)
+    userData = routes.gameEngine.initNewPlayer()
+    userData['username'] = 'tester'
+    routes.create_player(USER_ID, userData)
+    yield USER_ID
+    routes.playerCache.discard(USER_ID)
+    routes.fbManager.deleteUserComplete(USER_ID)
+
+
+@pytest.fixture
+def otherWorker(monkeypatch):
+    """처음 n 번의 CAS 직전에 다른 워커가 같은 문서를 먼저 기록한 것처럼 revision 을 올린다."""
+    storage = routes.fbManager.backend.backend
+    realCas = storage.compareAndUpdate
+    state = {"remaining": 0, "cas": 0}
+
+    def compareAndUpdate(path, key, expected, values):
+        state['cas'] += 1
+        if state['remaining'] > 0:
+            state['remaining'] -= 1
+            revisionPath = f"users/{USER_ID}/revision"
+            storage.set(revisionPath, (storage.get(revisionPath) or 0) + 1)
+        return realCas(path, key, expected, values)
+
+    monkeypatch.setattr(storage, 'compareAndUpdate', compareAndUpdate)
+    return state
+
+
+def gainExp(userData):
+    userData['exp'] = userData.get('exp', 0) + 1
+    return {"userData": userData}
+
+
+def runAction():
+    with app.test_request_context():
+        response = routes.run_player_action(USER_ID, gainExp)
+    if isinstance(response, tuple): return response[0], response[1]
+    return response, response.status_code
+
+
+def storedExp():
+    return routes.fbManager.getUserData(USER_ID).get('exp', 0)
+
+
+def test_action_is_written_through(player, otherWorker):
+    before = storedExp()
+    response, status = runAction()
+    assert status == 200
+    assert storedExp() == before + 1
+    assert otherWorker['cas'] == 1
+
+
+def test_conflict_is_retried_on_the_fresh_document(player, otherWorker):
+    before = storedExp()
+    otherWorker['remaining'] = 1
+    response, status = runAction()
+    assert status == 200
+    # 충돌한 첫 시도는 버려지고 최신 문서 위에서 한 번만 반영된다
+    assert storedExp() == before + 1
+    assert otherWorker['cas'] == 2
+
+
+def test_conflict_is_rejected_after_retries(player, otherWorker):
+    before = storedExp()
+    otherWorker['remaining'] = 100
+    response, status = runAction()
+    assert status == 409
+    assert response.get_json() == {"error": "Conflict"}
+    assert storedExp() == before
+
+
+def test_dropped_write_behind_flush_is_reported(player, otherWorker, monkeypatch):
+    monkeypatch.setattr(routes.playerCache, 'writeBehind', True)
+    response, status = runAction()
+    assert status == 200
+    otherWorker['remaining'] = 1
+    routes.playerCache.flush(USER_ID)
+    # 응답을 받은 행동이 저장되지 못했으므로 다음 요청은 409 로 다시 불러오게 한다
+    response, status = runAction()
+    assert status == 409
+    response, status = runAction()
+    assert status == 200
+
+
+def test_bulk_reset_keeps_suspension(player, monkeypatch):
+    monkeypatch.setattr(routes.Config, 'ADMIN_ACCOUNTS', ['admin'], raising=False)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = 'admin'
+    runAction()
+    assert client.post('/api/admin/users/suspend', json={'userIds': [USER_ID], 'days': 3}).status_code == 200
+
+    response = client.post('/api/admin/users/reset', json={'userIds': [USER_ID]})
+    assert response.get_json()['results'] == {USER_ID: 'ok'}
+    # 초기화는 진행 상황만 지우고 정지/강제 로그아웃은 그대로 둔다
+    userData = routes.fbManager.getUserData(USER_ID)
+    assert userData.get('exp', 0) == 0 and userData['username'] == 'tester'
+    assert userData['banned_until'] > 0 and userData['force_logout'] is True
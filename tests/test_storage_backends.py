@@ -0,0 +1,152 @@
+import hashlib
+import json
+import threading
+import time
+
+import pytest
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+from src.storageBackend import (MemoryBackend, SQLiteBackend, FirebaseRestBackend, PENDING_TIMEOUT,
+                                pendingMarker)
+
+
+def fakeRealtimeDatabase():
+    """MemoryBackend 위에 RTDB REST 의 GET/PUT(if-match)/PATCH/DELETE 만 흉내낸 서버."""
+    store = MemoryBackend()
+    server = Flask('fake-rtdb')
+
+    def etag(value):
+        return hashlib.md5(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+    @server.route('/.json', methods=['GET', 'PUT', 'PATCH', 'DELETE'], defaults={'path': ''})
+    @server.route('/<path:path>.json', methods=['GET', 'PUT', 'PATCH', 'DELETE'])
+    def node(path):
+        if request.method == 'GET':
+            value = store.get(path)
+            response = Response(json.dumps(value), mimetype='application/json')
+            if request.headers.get('X-Firebase-ETag'): response.headers['ETag'] = etag(value)
+            return response
+        if request.method == 'PUT':
+            if 'if-match' in request.headers and request.headers['if-match'] != etag(store.get(path)):
+                return Response('null', status=412)
+            store.set(path, request.get_json())
+        elif request.method == 'PATCH':
+            store.update(path, request.get_json())
+        else:
+            store.delete(path)
+        return Response('null', mimetype='application/json')
+
+    return store, server
+
+
+@pytest.fixture
+def restBackend():
+    store, server = fakeRealtimeDatabase()
+    httpd = make_server('127.0.0.1', 0, server, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield FirebaseRestBackend(f"http://127.0.0.1:{httpd.server_port}")
+    httpd.shutdown()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'rest'])
+def backend(request, tmp_path):
+    if request.param == 'memory': return MemoryBackend()
+    if request.param == 'sqlite': return SQLiteBackend(str(tmp_path / 'test.db'))
+    return request.getfixturevalue('restBackend')
+
+
+def test_compare_and_update_writes_when_expected_matches(backend):
+    backend.set('users/u1', {'revision': 3, 'hp': 10, 'level': 1})
+    ok = backend.compareAndUpdate('', 'users/u1/revision', 3, {
+        'users/u1/revision': 4, 'users/u1/hp': 7, 'user_index/u1/level': 1
+    })
+    assert ok is True
+    assert backend.get('users/u1') == {'revision': 4, 'hp': 7, 'level': 1}
+    assert backend.get('user_index/u1') == {'level': 1}
+
+
+def test_compare_and_update_rejects_stale_revision(backend):
+    backend.set('users/u1', {'revision': 5, 'hp': 10})
+    assert backend.compareAndUpdate('', 'users/u1/revision', 4, {'users/u1/revision': 5, 'users/u1/hp': 1}) is False
+    assert backend.get('users/u1') == {'revision': 5, 'hp': 10}
+
+
+def test_compare_and_update_relative_to_path(backend):
+    backend.set('users/u1', {'revision': 1, 'inventory': {'potion': 1}})
+    assert backend.compareAndUpdate('users/u1', 'revision', 1, {'revision': 2, 'inventory/potion': None})
+    assert backend.get('users/u1') == {'revision': 2}
+
+
+def test_compare_and_update_creates_missing_document(backend):
+    assert backend.compareAndUpdate('', 'users/new/revision', None, {'users/new': {'revision': 1, 'hp': 3}})
+    assert backend.get('users/new') == {'revision': 1, 'hp': 3}
+    assert backend.compareAndUpdate('', 'users/new/revision', None, {'users/new': {'revision': 1}}) is False
+
+
+def test_rest_pending_marker_blocks_until_it_expires(restBackend):
+    # 다른 워커가 revision 을 선점한 채 기록 중이면 같은 값을 기대하는 쓰기는 실패한다
+    marker = pendingMarker(2)
+    restBackend.set('users/u1', {'revision': marker})
+    assert restBackend.compareAndUpdate('', 'users/u1/revision', marker, {'users/u1/revision': 3}) is False
+
+    # 기록 도중 멈춘 워커의 표시는 PENDING_TIMEOUT 뒤에 가져갈 수 있다
+    stale = dict(marker, at=time.time() - PENDING_TIMEOUT - 1)
+    restBackend.set('users/u1/revision', stale)
+    assert restBackend.compareAndUpdate('', 'users/u1/revision', stale, {'users/u1/revision': 3})
+    assert restBackend.get('users/u1/revision') == 3
+
+
+class ScriptedStream:
+    """PushStream 이 여는 SSE 응답을 연결마다 미리 정한 이벤트로 흉내낸다."""
+
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.params = []
+        self.done = threading.Event()
+
+    def query(self, path, after=None, before=None, limit=None):
+        return [('-key2', {'n': 2})]
+
+    def openStream(self, path, params):
+        self.params.append(params)
+        if not self.connections:
+            self.done.set()
+            raise ConnectionError('closed')
+        lines = []
+        for event, relPath, data in self.connections.pop(0):
+            lines += [f'event: {event}', 'data: ' + json.dumps({'path': relPath, 'data': data}), '']
+        return type('Response', (), {'iter_lines': lambda self, decode_unicode: iter(lines), 'close': lambda self: None})()
+
+
+def test_push_stream_starts_at_newest_key_and_resumes_after_reconnect():
+    from src.storageBackend import PushStream
+    backend = ScriptedStream([
+        # 첫 스냅샷에는 startAt 경계인 기존 최신 항목만 온다
+        [('put', '/', {'-key2': {'n': 2}}), ('put', '/-key3', {'n': 3}), ('patch', '/-key3', {'read': True})],
+        # 재연결 사이에 추가된 -key4 는 다음 연결의 첫 스냅샷으로 전달된다
+        [('put', '/', {'-key3': {'n': 3}, '-key4': {'n': 4}}), ('patch', '/', {'-key5': {'n': 5}})],
+    ])
+    received = []
+    stream = PushStream(backend, 'messages/gc-1', lambda key, value: received.append((key, value['n'])))
+    assert backend.done.wait(5)
+    stream.close()
+
+    assert received == [('-key3', 3), ('-key4', 4), ('-key5', 5)]
+    assert [p.get('startAt') for p in backend.params[:2]] == ['"-key2"', '"-key3"']
+    assert all(p['orderBy'] == '"$key"' for p in backend.params)
+
+
+def test_listen_delivers_only_new_pushes_until_closed(backend):
+    if isinstance(backend, FirebaseRestBackend): pytest.skip('fake server does not stream')
+    backend.push('messages/gc-1', {'n': 1})
+    received = []
+    subscription = backend.listen('messages/gc-1', lambda key, value: received.append(value['n']))
+    backend.push('messages/gc-1', {'n': 2})
+    backend.push('messages/gc-2', {'n': 3})
+    deadline = time.time() + 5
+    while not received and time.time() < deadline: time.sleep(0.05)
+    subscription.close()
+    backend.push('messages/gc-1', {'n': 4})
+    time.sleep(1)
+    assert received == [2]